@@ -24,7 +24,7 @@ call .\build_components.bat
 @REM pip will also install the deps into the target 
 @REM that've now been refactored own repos, 
 @REM and are now distributed via PyPi (no more static linking):
-@REM IronPyShp, toml_tools, Mapclassif-Iron, Cheetah_GH and Anteater_GH
+@REM IronPyShp, toml_tools, Cheetah_GH and Anteater_GH
 @REM
 @REM This loop should only find one wheel (as we deleted dist above).
 For %%A in (%dist%"\*.whl") do python -m pip install --target=%target% %%~fA --upgrade --upgrade-strategy=eager
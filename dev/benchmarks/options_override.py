@@ -0,0 +1,87 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+# MIT License
+
+# Copyright (c) [2021] [Cardiff University, a body incorporated
+# by Royal Charter and a registered charity (number:
+# 1136855) whose administrative offices are at 7th floor 30-
+# 36 Newport Road, University CF24 0DE, Wales, UK]
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+""" Microbenchmark of options_manager.override_namedtuple_with_dict on 
+    options with 60 fields, creating a new namedtuple class for every 
+    override (as before options_manager.namedtuple_classes), and reusing 
+    the registered classes.  
+    
+    options_manager only needs toml_tools (not skel or clr), so this runs 
+    with Rhino's IronPython, or any Python with toml_tools installed, 
+    e.g. python options_override.py
+"""
+
+__authors__ = {'James Parrott', 'Crispin Cooper'}
+__version__ = '3.0.5'
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__))
+                               ,'..'
+                               ,'..'
+                               ,'src'
+                               )
+               )
+
+from sDNA_GH import options_manager
+
+
+class Options(object):
+    pass
+for i in range(60):
+    setattr(Options, 'field_%s' % i, float(i))
+del i
+
+
+def main(n = 200):
+    nt = options_manager.namedtuple_from_class(Options, 'Options')
+
+    def override():
+        options_manager.override_namedtuple_with_dict(
+                                          nt
+                                         ,{'field_1' : 2.0, 'field_7' : 3.0}
+                                         ,check_types = True
+                                         )
+
+    def override_with_new_class():
+        options_manager.namedtuple_classes.clear()
+        override()
+
+    secs_new = min(timeit.repeat(override_with_new_class, number = n, repeat = 3))
+    secs_reused = min(timeit.repeat(override, number = n, repeat = 3))
+    print('override_namedtuple_with_dict: %s per sec with new classes, '
+          '%s per sec with reused classes' % (n / secs_new, n / secs_reused)
+         )
+
+
+if __name__ == '__main__':
+    main()
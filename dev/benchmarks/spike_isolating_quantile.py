@@ -0,0 +1,97 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+# MIT License
+
+# Copyright (c) [2021] [Cardiff University, a body incorporated
+# by Royal Charter and a registered charity (number:
+# 1136855) whose administrative offices are at 7th floor 30-
+# 36 Newport Road, University CF24 0DE, Wales, UK]
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+
+""" Benchmark of data_cruncher.spike_isolating_quantile's pure Python 
+    engine, on spiky data of 10k to 1M values.  A quadratic time 
+    algorithm would take ~100 times as long per value for 1M values as 
+    for 10k.  
+    
+    data_cruncher imports skel's helpers, which import clr, so run this 
+    with Rhino's IronPython (e.g. from Rhino's script editor).  Plain 
+    CPython can only run it with clr and Microsoft.VisualBasic modules 
+    stubbed out.
+"""
+
+__authors__ = {'James Parrott', 'Crispin Cooper'}
+__version__ = '3.0.5'
+
+import os
+import sys
+import timeit
+from itertools import chain, repeat
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__))
+                               ,'..'
+                               ,'..'
+                               ,'src'
+                               )
+               )
+
+from sDNA_GH import data_cruncher
+
+
+class PurePythonOptions(data_cruncher.SpikeIsolatingQuantileOptions):
+    use_numpy = False
+
+
+def spiky_data(n):
+    #type(int) -> list
+    quarter = n // 4
+    return [float(x) for x in chain(range(quarter)
+                                   ,repeat(quarter, 2 * quarter)
+                                   ,range(quarter + 1, 2 * quarter + 1)
+                                   )
+           ]
+
+
+def main(sizes = (10000, 100000, 1000000), num_classes = 15):
+    secs_per_value = {}
+    for n in sizes:
+        data = spiky_data(n)
+        secs = min(timeit.repeat(
+                        lambda: data_cruncher.spike_isolating_quantile(
+                                               data
+                                              ,num_classes
+                                              ,options = PurePythonOptions
+                                              )
+                       ,number = 1
+                       ,repeat = 3
+                       ))
+        secs_per_value[n] = secs / n
+        print('spike_isolating_quantile: %s values in %s secs' % (n, secs))
+
+    ratio = secs_per_value[sizes[-1]] / secs_per_value[sizes[0]]
+    print('Time per value for %s values / time per value for %s values: %s'
+         % (sizes[-1], sizes[0], ratio)
+         )
+
+
+if __name__ == '__main__':
+    main()
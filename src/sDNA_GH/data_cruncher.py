@@ -33,7 +33,9 @@
     functions and classes used by DataParser and ObjectsRecolourer, 
     plus a type coercer and a format string 'inverter'.
     They rely only on core Python modules, and are independent of Grasshopper
-    and of other sDNA_GH modules.
+    and of other sDNA_GH modules.  If NumPy is importable (e.g. in Rhino 8's
+    CPython 3) the quantile methods classify sorted ndarrays instead, 
+    falling back to the pure Python versions in IronPython.  
 """
 
 __authors__ = {'James Parrott', 'Crispin Cooper'}
@@ -43,10 +45,15 @@ import logging
 import warnings
 import itertools
 import math
+import heapq
+import bisect
 from numbers import Number
 import collections
 
-from mapclassif_Iron.classifiers import _fisher_jenks_means_without_numpy
+try:
+    import numpy as np
+except ImportError:
+    np = None # e.g. IronPython 2.7
 
 from .skel.tools.helpers.funcs import itertools # for pairwise if Python < 3.10
 
@@ -196,6 +203,94 @@ def three_point_quad_spline(x, x_min, x_mid, x_max, y_min, y_mid, y_max):
     return z   
 
 
+def as_floats(xs):
+    #type(Iterable[Number]) -> numpy.ndarray
+    return np.asarray(list(xs), dtype = float)
+
+
+def linearly_interpolate_all(xs, x_min, x_mid, x_max, y_min, y_max, options = None):
+    # type(Iterable[Number], Number, Number, Number, Number, Number, NamedTuple) -> list
+    """ linearly_interpolate of each x in xs, with the gradient 
+        calculated once.  
+    """
+    check_strictly_less_than(x_min, x_max, 'x_min', 'x_max')
+    gradient = (y_max - y_min) / float(x_max - x_min)
+    if use_numpy_engine(options):
+        return (y_min + gradient * (as_floats(xs) - x_min)).tolist()
+    return [y_min + gradient * (x - x_min) for x in xs]
+
+
+def log_spline_all(xs, x_min, base, x_max, y_min, y_max, options = None):
+    # type(Iterable[Number], Number, Number, Number, Number, Number, NamedTuple) -> list
+    """ log_spline of each x in xs, with its constants calculated once.  """
+    check_strictly_less_than(x_min, x_max, 'x_min', 'x_max')
+    # log(u, base) == log(u) / log(base), so  
+    # (y_max / log(2, base)) * log(u, base) == (y_max / log(2)) * log(u)
+    scale = y_max / math.log(2)
+    inv_width = 1.0 / (x_max - x_min)
+    if use_numpy_engine(options):
+        return (y_min + scale * np.log(1 + (as_floats(xs) - x_min) * inv_width)).tolist()
+    log = math.log
+    return [y_min + scale * log(1 + (x - x_min) * inv_width) for x in xs]
+
+
+def exp_spline_all(xs, x_min, base, x_max, y_min, y_max, options = None):
+    # type(Iterable[Number], Number, Number, Number, Number, Number, NamedTuple) -> list
+    """ exp_spline of each x in xs, with its constants calculated once.  """
+    check_strictly_less_than(x_min, x_max, 'x_min', 'x_max')
+    # pow(base, t * log(c, base)) == exp(t * log(c))
+    log_c = math.log(1 + y_max - y_min)
+    inv_width = 1.0 / (x_max - x_min)
+    if use_numpy_engine(options):
+        return (y_min - 1 + np.exp((as_floats(xs) - x_min) * inv_width * log_c)).tolist()
+    exp = math.exp
+    return [y_min - 1 + exp((x - x_min) * inv_width * log_c) for x in xs]
+
+
+def three_point_quad_spline_all(xs
+                               ,x_min
+                               ,x_mid
+                               ,x_max
+                               ,y_min
+                               ,y_mid
+                               ,y_max
+                               ,options = None
+                               ):
+    # type(Iterable[Number], Number, Number, Number, Number, Number, Number, NamedTuple) -> list
+    """ three_point_quad_spline of each x in xs, with the Lagrange 
+        basis polynomials' denominators calculated once.  
+    """
+    check_strictly_less_than(x_min, x_mid, 'x_min', 'x_mid')
+    check_strictly_less_than(x_mid, x_max, 'x_mid', 'x_max')
+
+    k_min = y_min / float((x_min - x_mid) * (x_min - x_max))
+    k_mid = y_mid / float((x_mid - x_min) * (x_mid - x_max))
+    k_max = y_max / float((x_max - x_min) * (x_max - x_mid))
+
+    if use_numpy_engine(options):
+        xs = as_floats(xs)
+        d_min, d_mid, d_max = xs - x_min, xs - x_mid, xs - x_max
+        return (k_min * d_mid * d_max 
+               +k_mid * d_min * d_max 
+               +k_max * d_min * d_mid
+               ).tolist()
+    return [k_min * (x - x_mid) * (x - x_max) 
+           +k_mid * (x - x_min) * (x - x_max)
+           +k_max * (x - x_min) * (x - x_mid)
+            for x in xs
+           ]
+
+
+# Versions of splines that re-normalise a whole field at once.
+batch_splines = dict(zip(VALID_RE_NORMALISERS[1:] 
+                        ,[linearly_interpolate_all
+                         ,exp_spline_all
+                         ,log_spline_all
+                         ]
+                        )
+                    )
+
+
 def map_f_to_tuples(f, x, x_min, x_max, tuples_min, tuples_max): 
     # type(function, Number, Number, Number, tuple, tuple) -> list
     """A generalisation of map that returns a list of calls to the 
@@ -221,9 +316,67 @@ def map_f_to_three_tuples(f
        taking their values from the specified 3 iterable. 
     """
 
-    return [f(x, x_min, x_med, x_max, a, b, c) 
+    return [f(x, x_min, x_med, x_max, a, b, c)
             for (a, b, c) in zip(tuple_min, tuple_med, tuple_max)]
 
+
+def evenly_spaced(x_min, x_max, num):
+    #type(Number, Number, int) -> list
+    """ num evenly spaced points from x_min to x_max inclusive.  A single
+        point is placed at the midpoint.
+    """
+    check_strictly_less_than(0, num, '0', 'num')
+    check_strictly_less_than(x_min, x_max, 'x_min', 'x_max')
+    if num == 1:
+        return [0.5*(x_min + x_max)]
+    step = (x_max - x_min) / float(num - 1)
+    return [x_min + i * step for i in range(num - 1)] + [x_max]
+
+
+def three_point_quad_spline_colours(x_min
+                                   ,x_max
+                                   ,rgb_min
+                                   ,rgb_mid
+                                   ,rgb_max
+                                   ,num_colours
+                                   ,options = None
+                                   ):
+    #type(Number, Number, tuple, tuple, tuple, int, NamedTuple) -> list
+    """ The colours of the three point quadratic spline through
+        rgb_min, rgb_mid and rgb_max, at num_colours evenly spaced points
+        from x_min to x_max inclusive, with each channel clamped to
+        [0, 255].
+    """
+    channels = [three_point_quad_spline_all(evenly_spaced(x_min, x_max, num_colours)
+                                           ,x_min
+                                           ,0.5*(x_min + x_max)
+                                           ,x_max
+                                           ,a
+                                           ,b
+                                           ,c
+                                           ,options = options
+                                           )
+                for (a, b, c) in zip(rgb_min, rgb_mid, rgb_max)
+               ]
+    return [tuple(max(0, min(255, channel)) for channel in rgb)
+            for rgb in zip(*channels)
+           ]
+
+
+def look_up_table(table, x_min, x_max):
+    #type(list, Number, Number) -> function
+    """ Returns a function that maps x to the entry of table nearest to it,
+        treating the entries as evenly spaced from x_min to x_max
+        inclusive.  Values of x outside [x_min, x_max] get the end entries.
+    """
+    check_strictly_less_than(x_min, x_max, 'x_min', 'x_max')
+    last = len(table) - 1
+    scale = last / float(x_max - x_min)
+    def look_up(x):
+        #type(Number) -> type[any]
+        return table[min(last, max(0, int(round((x - x_min) * scale))))]
+    return look_up
+
    
 
 
@@ -237,25 +390,57 @@ def class_bounds_at_max_deltas(data
         to have been sorted based on them.
         This method is prone to over-classify extreme 
         outlying values. 
+
+        The num_classes - 1 largest gaps are found in a single pass, with
+        heapq.nlargest (or np.partition in the NumPy engine).  Of equal 
+        gaps, the lowest are used first.  Gaps no wider than options.tol 
+        (e.g. between repeated values) are not used, so fewer classes may 
+        be returned.
     """
     if options is None:
         options = SpikeIsolatingQuantileOptions
-    deltas = [(i, b - a )
-              for i, (b, a) in enumerate(itertools.pairwise(data))
-             ]
-    class_bounds = []
-    for _ in range(num_classes - 1):
-        max_delta = max(deltas)
-        for index, delta in deltas: 
-            if math.abs(max_delta - delta) < options.tol:
-                max_index = index
-                break
-        deltas.remove(deltas[max_index])
-        
-        class_bounds += [ data[max_index] + 0.5 * max_delta] #midpoint
+
+    num_bounds = min(num_classes - 1, len(data) - 1)
+    if num_bounds <= 0:
+        return []
+
+    data = sorted_array_if_numpy(data, options)
+
+    if np is not None and isinstance(data, np.ndarray):
+        deltas = np.diff(data)
+        threshold = np.partition(deltas, -num_bounds)[-num_bounds]
+        above = np.flatnonzero(deltas > threshold)
+        at_threshold = np.flatnonzero(deltas == threshold)[:num_bounds - len(above)]
+        indices = np.sort(np.concatenate((above, at_threshold)))
+        indices = indices[deltas[indices] > options.tol]
+        return [float(0.5 * (data[i] + data[i + 1])) for i in indices]
+
+    indices = heapq.nlargest(num_bounds
+                            ,range(len(data) - 1)
+                            ,key = lambda i: data[i + 1] - data[i]
+                            )
+    class_bounds = [0.5 * (data[i] + data[i + 1]) #midpoint
+                    for i in sorted(indices)
+                    if data[i + 1] - data[i] > options.tol
+                   ]
     return class_bounds
 
 
+def class_indices(data, inter_class_bounds, options = None):
+    #type(Iterable[Number], Iterable[Number], NamedTuple) -> list
+    """ The index of the class of each data point, by binary search of 
+        the sorted inter-class bounds (classes include their lower bound).  
+        Data points below the first bound are in class 0.  
+    """
+    bounds = sorted(inter_class_bounds)
+    if use_numpy_engine(options):
+        return np.searchsorted(np.asarray(bounds, dtype = float)
+                              ,np.asarray(list(data), dtype = float)
+                              ,side = 'right'
+                              ).tolist()
+    return [bisect.bisect_right(bounds, x) for x in data]
+
+
 class InclusiveInterval:
     
     def __init__(self, a, i_a, b, i_b, num_data_points):
@@ -407,6 +592,55 @@ def indexed_lowest_strict_UB(a, b, tol = TOL):
 def indexed_highest_strict_LB(a, b, tol = TOL):
     return tol + a < b
 
+
+def use_numpy_engine(options = None):
+    #type(NamedTuple) -> bool
+    """ True if NumPy was imported, unless options.use_numpy is False. """
+    return np is not None and getattr(options, 'use_numpy', True)
+
+
+def sorted_array_if_numpy(data, options = None):
+    #type(Sequence[Number], NamedTuple) -> numpy.ndarray / Sequence[Number]
+    """ Returns already sorted data as an ndarray of floats for the NumPy
+        engine of the quantile methods, or data as a list or tuple if NumPy 
+        is not in use (e.g. from a dict's values view).
+    """
+    if not use_numpy_engine(options):
+        return data if isinstance(data, (list, tuple)) else list(data)
+    if isinstance(data, np.ndarray):
+        return data
+    if not isinstance(data, (list, tuple)):
+        data = list(data) # np.asarray can't convert views or generators.
+    return np.asarray(data, dtype = float)
+
+
+def np_indexed_lowest_strict_UB(data_point, data, index, tol = TOL):
+    #type(Number, numpy.ndarray, int, float) -> bool, Number, int
+    """ As indexed_lowest_strict_UB, but by binary search of an ndarray
+        sorted in ascending order.
+    """
+    i = max(index + 1, int(np.searchsorted(data, data_point + tol, side = 'right')))
+    if i >= len(data):
+        return False, None, None
+    return True, data[i], i
+
+
+def np_indexed_highest_strict_LB(data_point, data, index, tol = TOL):
+    #type(Number, numpy.ndarray, int, float) -> bool, Number, int
+    """ As indexed_highest_strict_LB, but by binary search of an ndarray
+        sorted in ascending order.
+    """
+    i = int(np.searchsorted(data, data_point - tol, side = 'left')) - 1
+    # data_point - tol may round differently to tol + data[i] < data_point,
+    # so step (a run of repeated values at a time) to the exact boundary.
+    while i + 1 < index and tol + data[i + 1] < data_point:
+        i = int(np.searchsorted(data, data[i + 1], side = 'right')) - 1
+    while i >= 0 and not tol + data[i] < data_point:
+        i = int(np.searchsorted(data, data[i], side = 'left')) - 1
+    if i < 0:
+        return False, None, None
+    return True, data[i], i
+
 def data_point_midpoint_and_next(data, index):
     #type(Sequence, int) -> Number, float, Number
     """ A support function defining the logic for calculating the midpoint
@@ -468,6 +702,13 @@ def quantile_l_to_r(data
     if options is None:
         options = SpikeIsolatingQuantileOptions
 
+    data = sorted_array_if_numpy(data, options)
+    if np is not None and isinstance(data, np.ndarray):
+        highest_strict_LB = np_indexed_highest_strict_LB
+        lowest_strict_UB = np_indexed_lowest_strict_UB
+    else:
+        highest_strict_LB = indexed_highest_strict_LB
+        lowest_strict_UB = indexed_lowest_strict_UB
 
     # n-1 is number of gaps between data points. max num of bounds
     class_bounds = []
@@ -518,7 +759,7 @@ def quantile_l_to_r(data
             # data_point_below is in the class for this candidate bound
             # so we don't need to test it against candidate_bound
             # if previous_bound is not None:
-            hlb_found, hlb, hlb_index = indexed_highest_strict_LB(
+            hlb_found, hlb, hlb_index = highest_strict_LB(
                                                         data_point_below
                                                     ,data
                                                     ,data_point_below_index
@@ -530,7 +771,7 @@ def quantile_l_to_r(data
                 data_point_below - previous_bound < options.tol):
                 # the data point just below candidate_bound, not the one just
                 # below previous_bound
-                lub_found, lub, lub_index = indexed_lowest_strict_UB(
+                lub_found, lub, lub_index = lowest_strict_UB(
                                                          data_point_below
                                                         ,data
                                                         ,data_point_below_index
@@ -640,7 +881,7 @@ def quantile_l_to_r(data
         num_classes_left = num_classes_wanted - (len(class_bounds))
 
 
-    return class_bounds
+    return [float(bound) for bound in class_bounds]
 
 
 
@@ -702,10 +943,75 @@ def pro_rata(n, N_1, N_2, tol = TOL):
 
 
 
+def cumulative_counts(counts):
+    #type(Iterable[int]) -> list
+    """ Returns [0, c_0, c_0 + c_1, ...].  For the counts of the sorted keys
+        of a sorted data Sequence, the data points equal to keys[i] are 
+        data[cum_counts[i]:cum_counts[i + 1]].  
+    """
+    cum_counts = [0]
+    for count in counts:
+        cum_counts.append(cum_counts[-1] + count)
+    return cum_counts
+
+
+def max_interval_in_key_range(keys, cum_counts, lo, hi, min_num_of_data_pts, w = TOL):
+    #type(Sequence[Number], Sequence[int], int, int, int, float) -> tuple / None
+    """ As max_interval_lt_width_w_with_most_data_points, but only 
+        considering keys[lo:hi], and counting data points using 
+        cumulative_counts instead of an OrderedCounter (so slices of the keys 
+        need not be copied or recounted).  Returns the indices in keys of the 
+        lowest and highest keys in the interval (or None).
+    """
+    if hi <= lo:
+        return None
+    i_a = lo
+    best_i_a, best_i_b = lo, lo
+    best_num = cum_counts[lo + 1] - cum_counts[lo]
+    for i_b in range(lo + 1, hi):
+        b = keys[i_b]
+        while b - keys[i_a] > w:
+            i_a += 1
+        num_data_points = cum_counts[i_b + 1] - cum_counts[i_a]
+        if num_data_points > best_num: # stick with first if equal
+            best_i_a, best_i_b, best_num = i_a, i_b, num_data_points
+    if best_num > min_num_of_data_pts:
+        return best_i_a, best_i_b
+    return None
+
+
+def np_max_interval_in_key_range(keys, cum_counts, lo, hi, min_num_of_data_pts, w = TOL):
+    #type(numpy.ndarray, numpy.ndarray, int, int, int, float) -> tuple / None
+    """ NumPy equivalent of max_interval_in_key_range, vectorised over
+        keys[lo:hi].
+    """
+    if hi <= lo:
+        return None
+    keys = keys[lo:hi]
+    # For each b in keys, the index of the lowest a with b - a <= w
+    i_a = np.searchsorted(keys, keys - w, side = 'left')
+    # keys - w may round differently to b - a, so shift to the exact bounds.
+    too_wide = keys - keys[i_a] > w
+    while too_wide.any():
+        i_a[too_wide] += 1
+        too_wide = keys - keys[i_a] > w
+    can_widen = (i_a > 0) & (keys - keys[i_a - 1] <= w)
+    while can_widen.any():
+        i_a[can_widen] -= 1
+        can_widen = (i_a > 0) & (keys - keys[i_a - 1] <= w)
+
+    nums_of_data_points = cum_counts[lo + 1:hi + 1] - cum_counts[lo + i_a]
+    i_b = int(np.argmax(nums_of_data_points)) # stick with first if equal
+    if nums_of_data_points[i_b] > min_num_of_data_pts:
+        return lo + int(i_a[i_b]), lo + i_b
+    return None
+
+
 class SpikeIsolatingQuantileOptions(object):
     max_width = 200 * TOL
     min_num = None
     tol = TOL
+    use_numpy = True # Ignored if NumPy cannot be imported.
 
 
 def spike_isolating_quantile(data
@@ -721,7 +1027,7 @@ def spike_isolating_quantile(data
         Places interclass bounds in data, a Sequence (e.g. 
         list / tuple) of Numbers that has been sorted (in ascending order).  
         It first isolates the largest / narrowest spike in the frequency 
-        distribution, then calls itself on both remaining sub-Sequences 
+        distribution, then recurses on both remaining sub-Sequences 
         either side of the spike, with 
         classes allocated via pro_rata.  If there are no spikes 
         narrower than the max width, containing at least the minimum number of 
@@ -729,90 +1035,137 @@ def spike_isolating_quantile(data
         within each sub-Sequence using quantile_l_to_r.  The lists of 
         inter-class bounds returned by these recursive calls are appended 
         together and returned.  
+
+        The distinct keys of data and their cumulative counts are calculated
+        once.  Sub-Sequences are then ranges of indices of the keys, so 
+        nothing is recounted, searched for or copied during the recursion.
     """
     if ordered_counter is None:
-        ordered_counter = OrderedCounter(data)
-    logger.debug(ordered_counter)
-
-    keys = tuple(ordered_counter.keys())
+        data = sorted_array_if_numpy(data, options)
 
+    if np is not None and isinstance(data, np.ndarray):
+        keys, counts = np.unique(data, return_counts = True)
+        cum_counts = np.concatenate(([0], np.cumsum(counts)))
+        max_interval = np_max_interval_in_key_range
+    else:
+        if ordered_counter is None:
+            ordered_counter = OrderedCounter(data)
+        keys = tuple(ordered_counter.keys())
+        cum_counts = cumulative_counts(ordered_counter[key] for key in keys)
+        max_interval = max_interval_in_key_range
+
+    inter_class_bounds = spike_isolating_quantile_of_key_range(data
+                                                              ,keys
+                                                              ,cum_counts
+                                                              ,0
+                                                              ,len(keys)
+                                                              ,num_classes
+                                                              ,max_interval
+                                                              ,options
+                                                              )
+    return [float(bound) for bound in inter_class_bounds]
+
+
+def spike_isolating_quantile_of_key_range(data
+                                         ,keys
+                                         ,cum_counts
+                                         ,lo
+                                         ,hi
+                                         ,num_classes
+                                         ,max_interval
+                                         ,options
+                                         ):
+    #type(Sequence[Number], Sequence[Number], Sequence[int], int, int, int, function, NamedTuple) -> list
+    """ Recursive part of spike_isolating_quantile, classifying the 
+        data points equal to keys[lo:hi], 
+        i.e. data[cum_counts[lo]:cum_counts[hi]].  
+    """
+    start, end = int(cum_counts[lo]), int(cum_counts[hi])
 
     num_inter_class_bounds = num_classes - 1
     if num_inter_class_bounds <= 0:
         return []
     if num_inter_class_bounds == 1:
-        return quantile_l_to_r(data, num_inter_class_bounds + 1, options)
-    inter_class_bounds = []
-    if num_inter_class_bounds >= 2:
-        if options.min_num is None:
-            min_num = len(data) // num_classes
-        else:
-            min_num = options.min_num
-        logger.debug('min_num == %s' % min_num)
-        logger.debug('max_width == %s ' % options.max_width)
-        logger.debug('data == %s,...,%s' % (tuple(data[:4]), tuple(data[-4:])))
-        logger.debug('len(data) == %s ' % len(data))
-        spike_interval = max_interval_lt_width_w_with_most_data_points(ordered_counter
-                                                                      ,min_num
-                                                                      ,w = options.max_width
-                                                                      )
-        if spike_interval:
-            logger.debug('num_classes - 1 == %s' % (num_classes - 1))
-            logger.debug('index_a (in OrderedCounter)== %s' % spike_interval.index_a)
-            logger.debug('index_b (in OrderedCounter) == %s' % spike_interval.index_b)
-            spike_data_index_a = data.index(keys[spike_interval.index_a])
-            spike_data_index_b = tuple(reversed(data)).index(keys[spike_interval.index_b])
-            spike_data_index_b = len(data) - 1 - spike_data_index_b
-            logger.debug('spike_data_index_a == %s' % spike_data_index_a)
-            logger.debug('spike_data_index_b == %s' % spike_data_index_b)
-            if (num_classes - 3 <= 0 or 
-               (spike_data_index_a == 0 and spike_data_index_b == len(data)- 1)):
-                extra_classes_a, extra_classes_b = 0, 0
-            else:
-                logger.debug('n == %s, N_1 == %s, N_2 == %s ' %   (num_classes - 3
-                                                           ,spike_data_index_a
-                                                           ,len(data) - spike_data_index_b - 1
-                                                           )
-                            )
-                extra_classes_a, extra_classes_b = pro_rata(num_classes - 3
-                                                           ,spike_data_index_a
-                                                           ,len(data) - spike_data_index_b - 1
-                                                           ,tol = options.tol
-                                                           )
-            logger.debug('extra_classes_a == %s, extra_classes_b == %s' % (extra_classes_a, extra_classes_b))
-            inter_class_bounds = []
-            if spike_data_index_a >= 1:
-                __, midpoint_i_a, __ = data_point_midpoint_and_next(data
-                                                                  ,spike_data_index_a - 1
-                                                                  )
-                logger.debug('midpoint_i_a == %s' % midpoint_i_a)
-                inter_class_bounds += spike_isolating_quantile(data[:spike_data_index_a]
-                                                              ,extra_classes_a + 1
-                                                              ,options = options
-                                                              ) 
-                inter_class_bounds += [midpoint_i_a]
-                logger.debug('left of a inter_class_bounds == %s ' % inter_class_bounds)
-            if spike_data_index_b <= len(data) - 2:
-
-                __, midpoint_i_b, __ = data_point_midpoint_and_next(data
-                                                                  ,spike_data_index_b
-                                                                  )
-                logger.debug('midpoint_i_b == %s' % midpoint_i_b)
-                inter_class_bounds += [midpoint_i_b]
-                inter_class_bounds += spike_isolating_quantile(data[spike_data_index_b + 1:]
-                                                              ,extra_classes_b + 1
-                                                              ,options = options
-                                                              )
-                logger.debug('right of b inter_class_bounds == %s ' % inter_class_bounds)
-
-
+        return quantile_l_to_r(data[start:end], num_inter_class_bounds + 1, options)
 
+    if options.min_num is None:
+        min_num = (end - start) // num_classes
+    else:
+        min_num = options.min_num
+    logger.debug('min_num == %s' % min_num)
+    logger.debug('max_width == %s ' % options.max_width)
+    logger.debug('keys[lo:hi] == keys[%s:%s], data[%s:%s]' % (lo, hi, start, end))
+    spike_interval = max_interval(keys
+                                 ,cum_counts
+                                 ,lo
+                                 ,hi
+                                 ,min_num
+                                 ,w = options.max_width
+                                 )
+    if not spike_interval:
+        return quantile_l_to_r(data[start:end], num_classes, options)
+
+    logger.debug('num_classes - 1 == %s' % (num_classes - 1))
+    index_a, index_b = spike_interval
+    logger.debug('index_a (in keys)== %s' % index_a)
+    logger.debug('index_b (in keys) == %s' % index_b)
+    spike_data_index_a = int(cum_counts[index_a])
+    spike_data_index_b = int(cum_counts[index_b + 1]) - 1
+    logger.debug('spike_data_index_a == %s' % spike_data_index_a)
+    logger.debug('spike_data_index_b == %s' % spike_data_index_b)
+    if (num_classes - 3 <= 0 or 
+       (index_a == lo and index_b == hi - 1)):
+        extra_classes_a, extra_classes_b = 0, 0
+    else:
+        logger.debug('n == %s, N_1 == %s, N_2 == %s ' %   (num_classes - 3
+                                                   ,spike_data_index_a - start
+                                                   ,end - spike_data_index_b - 1
+                                                   )
+                    )
+        extra_classes_a, extra_classes_b = pro_rata(num_classes - 3
+                                                   ,spike_data_index_a - start
+                                                   ,end - spike_data_index_b - 1
+                                                   ,tol = options.tol
+                                                   )
+    logger.debug('extra_classes_a == %s, extra_classes_b == %s' % (extra_classes_a, extra_classes_b))
+    inter_class_bounds = []
+    if index_a > lo:
+        __, midpoint_i_a, __ = data_point_midpoint_and_next(data
+                                                          ,spike_data_index_a - 1
+                                                          )
+        logger.debug('midpoint_i_a == %s' % midpoint_i_a)
+        inter_class_bounds += spike_isolating_quantile_of_key_range(data
+                                                                   ,keys
+                                                                   ,cum_counts
+                                                                   ,lo
+                                                                   ,index_a
+                                                                   ,extra_classes_a + 1
+                                                                   ,max_interval
+                                                                   ,options
+                                                                   ) 
+        inter_class_bounds += [midpoint_i_a]
+        logger.debug('left of a inter_class_bounds == %s ' % inter_class_bounds)
+    if index_b < hi - 1:
+        __, midpoint_i_b, __ = data_point_midpoint_and_next(data
+                                                          ,spike_data_index_b
+                                                          )
+        logger.debug('midpoint_i_b == %s' % midpoint_i_b)
+        inter_class_bounds += [midpoint_i_b]
+        inter_class_bounds += spike_isolating_quantile_of_key_range(data
+                                                                   ,keys
+                                                                   ,cum_counts
+                                                                   ,index_b + 1
+                                                                   ,hi
+                                                                   ,extra_classes_b + 1
+                                                                   ,max_interval
+                                                                   ,options
+                                                                   )
+        logger.debug('right of b inter_class_bounds == %s ' % inter_class_bounds)
 
-        else:
-            inter_class_bounds = quantile_l_to_r(data, num_classes, options)
     return inter_class_bounds
     
             
+
 def max_and_min_are_valid(max_, min_):
     #type(type[any], type[any]) -> bool
     return (isinstance(max_, Number) and 
@@ -861,9 +1214,216 @@ def geometric(
 
 
 
+class FisherJenksOptions(object):
+    jenks_sample_size = 10000 # Max number of distinct values to classify 
+                              # exactly.  More are sampled, then refined.
+                              # None or 0 => always classify exactly.
+    jenks_max_refinements = 50
+
+
+def weighted_prefix_sums(keys, counts, shift):
+    #type(Sequence[Number], Sequence[int], Number) -> list, list, list
+    """ Cumulative sums of the counts, and of the counts times the first and 
+        second powers of (key - shift), each starting with 0.  
+        Shifting the keys (e.g. by their median) avoids catastrophic 
+        cancellation when sums of squared deviations are calculated from them.
+    """
+    W, S1, S2 = [0], [0.0], [0.0]
+    for key, count in zip(keys, counts):
+        x = key - shift
+        W.append(W[-1] + count)
+        S1.append(S1[-1] + count * x)
+        S2.append(S2[-1] + count * x * x)
+    return W, S1, S2
+
+
+def np_weighted_prefix_sums(keys, counts, shift):
+    #type(numpy.ndarray, numpy.ndarray, float) -> tuple(numpy.ndarray)
+    """ NumPy equivalent of weighted_prefix_sums. """
+    x = keys - shift
+    W = np.concatenate(([0], np.cumsum(counts)))
+    S1 = np.concatenate(([0.0], np.cumsum(counts * x)))
+    S2 = np.concatenate(([0.0], np.cumsum(counts * x * x)))
+    return W, S1, S2
+
+
+def jenks_row(prev, W, S1, S2, lo, hi, min_a):
+    #type(list, list, list, list, int, int, int) -> list, list
+    """ One row of the dynamic programme for Jenks natural breaks.  
+        For each b in [lo, hi], finds the min_a <= a < b minimising 
+        prev[a] + (sum of squared deviations of the keys in [a, b) ),
+        by divide and conquer, as the minimising a is non-decreasing in b.
+    """
+    n = len(prev) - 1
+    cur, arg = [float('inf')] * (n + 1), [0] * (n + 1)
+    stack = [(lo, hi, min_a, hi - 1)]
+    while stack:
+        lo, hi, opt_lo, opt_hi = stack.pop()
+        if lo > hi:
+            continue
+        b = (lo + hi) // 2
+        best, best_a = float('inf'), opt_lo
+        for a in range(opt_lo, min(b - 1, opt_hi) + 1):
+            s = S1[b] - S1[a]
+            val = prev[a] + (S2[b] - S2[a]) - s * s / (W[b] - W[a])
+            if val < best:
+                best, best_a = val, a
+        cur[b], arg[b] = best, best_a
+        stack.append((lo, b - 1, opt_lo, best_a))
+        stack.append((b + 1, hi, best_a, opt_hi))
+    return cur, arg
+
+
+def np_jenks_row(prev, W, S1, S2, lo, hi, min_a):
+    #type(numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray, int, int, int) -> numpy.ndarray, numpy.ndarray
+    """ NumPy equivalent of jenks_row.  The divide and conquer proceeds a 
+        level at a time, evaluating all candidates in all intervals of 
+        each level at once.
+    """
+    n = len(prev) - 1
+    cur, arg = np.full(n + 1, np.inf), np.zeros(n + 1, dtype = np.int64)
+    intervals = np.array([[lo, hi, min_a, hi - 1]], dtype = np.int64)
+    while len(intervals):
+        lo, hi, opt_lo, opt_hi = intervals.T
+        b = (lo + hi) // 2
+        num_candidates = np.minimum(b - 1, opt_hi) - opt_lo + 1
+        interval_ids = np.repeat(np.arange(len(intervals)), num_candidates)
+        starts = np.cumsum(num_candidates) - num_candidates
+        a = opt_lo[interval_ids] + np.arange(len(interval_ids)) - starts[interval_ids]
+        b_ = b[interval_ids]
+        s = S1[b_] - S1[a]
+        vals = prev[a] + (S2[b_] - S2[a]) - s * s / (W[b_] - W[a])
+        mins = np.minimum.reduceat(vals, starts)
+        # The first minimum in each interval, as in jenks_row.
+        firsts = np.flatnonzero(vals == mins[interval_ids])
+        firsts = firsts[np.concatenate(([True], np.diff(interval_ids[firsts]) > 0))]
+        best_a = a[firsts]
+        cur[b], arg[b] = mins, best_a
+        intervals = np.concatenate((np.column_stack((lo, b - 1, opt_lo, best_a))
+                                   ,np.column_stack((b + 1, hi, best_a, opt_hi))
+                                   ))
+        intervals = intervals[intervals[:, 0] <= intervals[:, 1]]
+    return cur, arg
+
+
+def jenks_split_indices(W, S1, S2, num_classes, row = jenks_row):
+    #type(Sequence, Sequence, Sequence, int, function) -> list
+    """ Jenks optimal natural breaks of sorted distinct keys, with 
+        weighted_prefix_sums W, S1 and S2.  Minimises the total sum of 
+        squared deviations from the class means, in O(k·n log n) time.  
+        Returns the index in the keys of the first key of each class after 
+        the first.
+    """
+    n = len(W) - 1
+    # One class, [0, b)
+    if row is np_jenks_row:
+        prev = S2 - S1 * S1 / np.maximum(W, 1)
+    else:
+        prev = [S2[b] - S1[b] * S1[b] / W[b] if b else 0.0 for b in range(n + 1)]
+    args = []
+    for j in range(2, num_classes + 1):
+        # The last class must end at n, so only b == n is needed in the last
+        # row, and earlier rows must leave room for num_classes - j classes.
+        lo = n if j == num_classes else j
+        prev, arg = row(prev, W, S1, S2, lo, n - (num_classes - j), j - 1)
+        args.append(arg)
+    splits = []
+    b = n
+    for arg in reversed(args):
+        b = int(arg[b])
+        splits.append(b)
+    return splits[::-1]
+
+
+def refine_split_indices(shifted_keys, W, S1, splits, max_refinements):
+    #type(Sequence[Number], Sequence, Sequence, list, int) -> list
+    """ Lloyd's (k-means) iterations, moving each split to the midpoint of 
+        the means of the classes either side of it, until no split moves or
+        a class would become empty.
+    """
+    n = len(W) - 1
+    for __ in range(max_refinements):
+        edges = [0] + splits + [n]
+        means = [(S1[e_1] - S1[e_0]) / (W[e_1] - W[e_0])
+                 for e_0, e_1 in itertools.pairwise(edges)
+                ]
+        new_splits = [bisect.bisect_left(shifted_keys, 0.5 * (mean_0 + mean_1))
+                      for mean_0, mean_1 in itertools.pairwise(means)
+                     ]
+        new_edges = [0] + new_splits + [n]
+        if (new_splits == splits or 
+            any(e_0 >= e_1 for e_0, e_1 in itertools.pairwise(new_edges))):
+            break
+        splits = new_splits
+    return splits
+
+
 def fisher_jenks(
              data
             ,num_classes
             ,options = None
             ):
-    return _fisher_jenks_means_without_numpy(data, num_classes)
\ No newline at end of file
+    #type(Sequence[Number], int, NamedTuple) -> list
+    """ Jenks optimal (natural breaks) inter-class bounds of data, sorted in 
+        ascending order.  Bounds are placed midway between the highest data 
+        point in one class and the lowest in the next.  
+
+        The classes are calculated by a dynamic programme on the distinct
+        values of data weighted by their counts, using prefix sums and 
+        divide and conquer, in O(k·n log n) time.  If there are more than 
+        options.jenks_sample_size distinct values, the classes are 
+        calculated for an evenly spaced sample of data, then refined on all 
+        of it by up to options.jenks_max_refinements k-means iterations.
+    """
+    if options is None:
+        options = FisherJenksOptions
+
+    data = sorted_array_if_numpy(data, options)
+    use_numpy = np is not None and isinstance(data, np.ndarray)
+
+    def distinct_keys_and_counts(data):
+        if use_numpy:
+            return np.unique(data, return_counts = True)
+        ordered_counter = OrderedCounter(data)
+        keys = list(ordered_counter.keys())
+        return keys, [ordered_counter[key] for key in keys]
+
+    if use_numpy:
+        prefix_sums, row = np_weighted_prefix_sums, np_jenks_row
+    else:
+        prefix_sums, row = weighted_prefix_sums, jenks_row
+
+    keys, counts = distinct_keys_and_counts(data)
+    num_classes = min(num_classes, len(keys))
+    if num_classes <= 1:
+        return []
+    shift = keys[len(keys) // 2]
+    W, S1, S2 = prefix_sums(keys, counts, shift)
+
+    sample_size = options.jenks_sample_size
+    if sample_size and len(keys) > sample_size:
+        n = len(data)
+        if use_numpy:
+            sample = data[np.arange(sample_size) * (n - 1) // (sample_size - 1)]
+        else:
+            sample = [data[i * (n - 1) // (sample_size - 1)] for i in range(sample_size)]
+        sample_keys, sample_counts = distinct_keys_and_counts(sample)
+        logger.debug('Sampled %s distinct values from %s' % (len(sample_keys), len(keys)))
+        sample_splits = jenks_split_indices(*prefix_sums(sample_keys, sample_counts, shift)
+                                           ,num_classes = min(num_classes, len(sample_keys))
+                                           ,row = row
+                                           )
+        splits = [bisect.bisect_left(keys, 0.5 * (sample_keys[i - 1] + sample_keys[i]))
+                  for i in sample_splits
+                 ]
+        shifted_keys = keys - shift if use_numpy else [key - shift for key in keys]
+        splits = refine_split_indices(shifted_keys
+                                     ,W
+                                     ,S1
+                                     ,splits
+                                     ,options.jenks_max_refinements
+                                     )
+    else:
+        splits = jenks_split_indices(W, S1, S2, num_classes, row = row)
+
+    return [float(0.5 * (keys[i - 1] + keys[i])) for i in splits]
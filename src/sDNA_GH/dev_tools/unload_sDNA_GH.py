@@ -44,7 +44,6 @@ ghenv.Component.ToggleObsolete(False)
 IMPORTS_TO_UNLOAD = {'sdna_gh'
                     ,'shapefile'
                     ,'toml_tools' 
-                    ,'mapclassif_iron'
                     ,'anteater_gh'
                     ,'cheetah_gh'
                     }   
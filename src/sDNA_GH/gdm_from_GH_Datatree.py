@@ -41,6 +41,7 @@ else:
     import collections.abc
     Iterable = collections.abc.Iterable
 import warnings
+from array import array
 
 import Rhino
 import Grasshopper
@@ -48,6 +49,7 @@ import rhinoscriptsyntax as rs
 from ghpythonlib import treehelpers as tree_helpers
 
 from .skel.tools.helpers import rhino_gh_geom
+from . import logging_wrapper
 
 
 try:
@@ -142,7 +144,7 @@ class GeomDataMapping(OrderedDict):
         # This check won't allow legend tags through. Later functions 
         # must handle invalid geometry
         # 
-        logger.debug(str(Data))
+        logger.debug('Data == %s', logging_wrapper.Truncated(Data))
         if (Data in [[], None, [None]] or
             getattr(Data,'BranchCount',999)==0):
             Data = OrderedDict()
@@ -210,6 +212,375 @@ class GeomDataMapping(OrderedDict):
 
 
 
+MISSING = object() # Placeholder in a column for an object without the field.
+
+
+def column_typecode(val):
+    #type(type[any]) -> str
+    """ The array typecode of a column that can hold val without changing 
+        its type, or None if only a list can.
+    """
+    if type(val) is float:
+        return 'd'
+    if type(val) is int: # bools and longs are kept in lists.
+        return 'l'
+    return None
+
+
+class RowView(OrderedDict):
+    """ The data of one object in a ColumnarGeomDataMapping, made only when 
+        it is looked up.  Changes to it are also made to the columns of 
+        the mapping.  A copy is a plain detached OrderedDict.
+    """
+
+    def __init__(self, gdm, key):
+        #type(ColumnarGeomDataMapping, type[any]) -> None
+        self._gdm = None # Don't write the initial items back to the gdm.
+        super(RowView, self).__init__(gdm._row_items(gdm._row(key)))
+        self._gdm = gdm
+        self._key = key
+
+    def _set_cell(self, field, val):
+        if self._gdm is not None:
+            self._gdm._set_cell(field, self._gdm._row(self._key), val)
+
+    def __setitem__(self, field, val):
+        super(RowView, self).__setitem__(field, val)
+        self._set_cell(field, val)
+
+    def __delitem__(self, field):
+        super(RowView, self).__delitem__(field)
+        self._set_cell(field, MISSING)
+
+    def update(self, *args, **kwargs):
+        for field, val in OrderedDict(*args, **kwargs).items():
+            self[field] = val
+
+    def setdefault(self, field, default = None):
+        if field not in self:
+            self[field] = default
+        return self[field]
+
+    def pop(self, field, *default):
+        if field not in self and default:
+            return default[0]
+        val = self[field]
+        del self[field]
+        return val
+
+    def popitem(self, last = True):
+        if not self:
+            raise KeyError('popitem(): dictionary is empty')
+        field = list(self.keys())[-1 if last else 0]
+        return field, self.pop(field)
+
+    def clear(self):
+        for field in list(self.keys()):
+            del self[field]
+
+    def copy(self):
+        return OrderedDict(self.items())
+
+    def __reduce__(self):
+        return OrderedDict, (list(self.items()),)
+
+
+class ColumnarGeomDataMapping(GeomDataMapping):
+    """ A GeomDataMapping that stores each field in one column (a typed 
+        array for int and float fields) instead of a dict per object, 
+        using several times less memory for large shapefiles.  
+        
+        Looking up an object returns a RowView of its data.  Values that 
+        are not dicts are stored as they are.
+
+        The OrderedDict itself maps each key to its row in the columns, 
+        so its length, order and keys are those of the mapping (methods 
+        that would return the row numbers as values are overridden).  
+        Deleted rows are left in the columns until more rows are deleted 
+        than are left, and the columns are then compacted, so deleting 
+        many entries (e.g. with pop) takes linear, not quadratic, time.
+    """
+
+    _row = collections.OrderedDict.__getitem__ # key -> row number
+
+    def __init__(self, keys_and_vals=()):
+        #type(*Iterable)-> None
+        super(GeomDataMapping, self).__init__()
+        self._reset()
+        self.update(keys_and_vals)
+
+    def _reset(self):
+        self._columns = OrderedDict()  # field -> array or list
+        self._non_dicts = {}  # row number -> non dict value
+        self._num_rows = 0  # Including deleted rows.
+        self._num_deleted = 0
+        self._in_row_order = True  # Rows are the keys' in order, none deleted.
+
+    def _compact(self):
+        #type() -> None
+        """ Removes deleted rows from the columns, and puts the rest in 
+            the order of the keys.
+        """
+        keys = list(self)
+        rows = [self._row(key) for key in keys]
+        for field, column in list(self._columns.items()):
+            cells = [column[row] for row in rows]
+            if isinstance(column, array):
+                self._columns[field] = array(column.typecode, cells)
+            elif all(cell is MISSING for cell in cells):
+                del self._columns[field]
+            else:
+                self._columns[field] = cells
+        new_rows = dict((row, i) for i, row in enumerate(rows))
+        self._non_dicts = dict((new_rows[row], val) 
+                               for row, val in self._non_dicts.items()
+                              )
+        for i, key in enumerate(keys):
+            collections.OrderedDict.__setitem__(self, key, i)
+        self._num_rows = len(rows)
+        self._num_deleted = 0
+        self._in_row_order = True
+
+    def _row_items(self, row):
+        #type(int) -> list
+        return [(field, column[row]) 
+                for field, column in self._columns.items()
+                if column[row] is not MISSING
+               ]
+
+    def _set_cell(self, field, row, val):
+        #type(str, int, type[any]) -> None
+        column = self._columns.get(field)
+        if column is None:
+            if val is MISSING:
+                return
+            column = self._columns[field] = [MISSING] * self._num_rows
+        if isinstance(column, array):
+            if column_typecode(val) == column.typecode:
+                try:
+                    column[row] = val
+                    return
+                except OverflowError:
+                    pass
+            column = self._columns[field] = list(column)
+        column[row] = val
+
+    def _append_row(self, key, val):
+        #type(type[any], type[any]) -> None
+        row = self._num_rows
+        self._num_rows += 1
+        collections.OrderedDict.__setitem__(self, key, row)
+        if not isinstance(val, dict):
+            self._non_dicts[row] = val
+            val = {}
+        for field, column in self._columns.items():
+            cell = val.get(field, MISSING)
+            if isinstance(column, array):
+                if column_typecode(cell) == column.typecode:
+                    try:
+                        column.append(cell)
+                        continue
+                    except OverflowError:
+                        pass
+                column = self._columns[field] = list(column)
+            column.append(cell)
+        for field, cell in val.items():
+            if field in self._columns:
+                continue
+            typecode = column_typecode(cell)
+            if row == 0 and typecode:
+                try:
+                    self._columns[field] = array(typecode, [cell])
+                    continue
+                except OverflowError:
+                    pass
+            self._columns[field] = [MISSING] * row + [cell]
+
+    def __setitem__(self, key, val):
+        if key not in self:
+            self._append_row(key, val)
+            return
+        row = self._row(key)
+        self._non_dicts.pop(row, None)
+        if not isinstance(val, dict):
+            self._non_dicts[row] = val
+            val = {}
+        for field in list(self._columns.keys()):
+            self._set_cell(field, row, val.get(field, MISSING))
+        for field, cell in val.items():
+            if field not in self._columns:
+                self._set_cell(field, row, cell)
+
+    def __getitem__(self, key):
+        row = self._row(key)
+        if row in self._non_dicts:
+            return self._non_dicts[row]
+        return RowView(self, key)
+
+    def __delitem__(self, key):
+        row = self._row(key)
+        collections.OrderedDict.__delitem__(self, key)
+        self._non_dicts.pop(row, None)
+        for column in self._columns.values():
+            if not isinstance(column, array):
+                column[row] = MISSING # Don't keep the deleted values.
+        self._num_deleted += 1
+        self._in_row_order = False
+        if self._num_deleted > len(self):
+            self._compact()
+
+    if hasattr(collections.OrderedDict, 'move_to_end'): # Python 3
+        def move_to_end(self, key, last = True):
+            super(GeomDataMapping, self).move_to_end(key, last)
+            self._in_row_order = False
+
+    def has_items(self, key, val):
+        #type(type[any], dict) -> bool
+        """ True if the data of key has all the fields and values in val 
+            (compared without making a RowView).  
+        """
+        row = self._row(key)
+        if row in self._non_dicts:
+            return False
+        for field in val:
+            column = self._columns.get(field)
+            if column is None:
+                return False
+            cell = column[row]
+            if cell is MISSING or cell != val[field]:
+                return False
+        return True
+
+    def has_key(self, key):
+        return key in self
+
+    def __eq__(self, other):
+        if isinstance(other, collections.OrderedDict):
+            return self.items() == list(other.items())
+        if isinstance(other, dict):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, self.items())
+
+    def __reduce__(self):
+        return self.__class__, (self.items(),)
+
+    def get(self, key, default = None):
+        return self[key] if key in self else default
+
+    def keys(self):
+        return list(self)
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def iterkeys(self):
+        return iter(self)
+
+    def itervalues(self):
+        return (self[key] for key in self)
+
+    def iteritems(self):
+        return ((key, self[key]) for key in self)
+
+    def update(self, *args, **kwargs):
+        for arg in args:
+            if hasattr(arg, 'keys'):
+                keys_and_vals = ((key, arg[key]) for key in arg.keys())
+            else:
+                keys_and_vals = arg
+            for key, val in keys_and_vals:
+                self[key] = val
+        for key, val in kwargs.items():
+            self[key] = val
+
+    def __or__(self, other):
+        new = self.copy()
+        new.update(other)
+        return new
+
+    def __ror__(self, other):
+        new = self.__class__(other)
+        new.update(self)
+        return new
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def setdefault(self, key, default = None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *default):
+        if key not in self and default:
+            return default[0]
+        val = self[key]
+        if isinstance(val, RowView):
+            val = val.copy()
+        del self[key]
+        return val
+
+    def popitem(self, last = True):
+        if not self:
+            raise KeyError('popitem(): dictionary is empty')
+        key = next(reversed(self)) if last else next(iter(self))
+        return key, self.pop(key)
+
+    def clear(self):
+        collections.OrderedDict.clear(self)
+        self._reset()
+
+    def copy(self):
+        return self.__class__(self.items())
+
+
+    def fields(self):
+        #type() -> list
+        return list(self._columns.keys())
+
+    def column(self, field):
+        #type(str) -> list
+        """ The values of field of every object in order, without making 
+            any RowViews.  Raises KeyError if any object has no value 
+            for field.
+        """
+        if not self._in_row_order:
+            self._compact()
+        column = self._columns[field]
+        if isinstance(column, array):
+            return column.tolist()
+        if self._non_dicts or any(cell is MISSING for cell in column):
+            raise KeyError('Not all objects have a value for field: %s' 
+                           % field
+                          )
+        return list(column)
+
+    def nested_lists_of_keys_and_values_or_values(self):
+        #type() -> list
+        """ As nested_lists_of_keys_and_values_or_values, from the columns.
+        """
+        if not self._in_row_order:
+            self._compact()
+        rows_items = [self._row_items(row) for row in range(self._num_rows)]
+        return [[[field for field, __ in items] for items in rows_items]
+               ,[[cell for __, cell in items] for items in rows_items]
+               ]
+
+
+
 
 def is_gdm(x):
     return isinstance(x, GeomDataMapping)
@@ -287,6 +658,8 @@ def DataTree_and_list_from_dict(nested_dict):
     #layerTree = []
 
 def keys_and_values_lists_if_nested_dict_else_values(dict_):
+    if isinstance(dict_, ColumnarGeomDataMapping) and not dict_._non_dicts:
+        return dict_.nested_lists_of_keys_and_values_or_values()
     if all(isinstance(val, dict) for val in dict_.values()):
         return nested_lists_of_keys_and_values_or_values(dict_) 
     return list(dict_.values())
@@ -323,16 +696,46 @@ def Data_Tree_and_Data_Tree_from_dicts(dicts):
 
 
 
+# Set-like views of the items of any dict (dict.items returns a list in 
+# Python 2, as does OrderedDict.items above).
+dict_items = getattr(dict, 'viewitems', dict.items)
+
+def merged_already(lesser, key, val, merge_subdicts = True):
+    #type(dict, type[any], type[any], bool) -> bool
+    """ True if merging the entry key: val into lesser would not change it.  
+    """
+    if key not in lesser:
+        return False
+    if merge_subdicts and isinstance(val, dict):
+        if isinstance(lesser, ColumnarGeomDataMapping):
+            return lesser.has_items(key, val)
+        existing = lesser[key]
+        if isinstance(existing, dict):
+            return dict_items(val) <= dict_items(existing)
+    return lesser[key] == val
+
+
 def override_gdm(lesser, override, merge_subdicts = True):  
     #type(dict, dict, dict) -> dict
+    """ Merges override into lesser (if it is not empty).  
+    
+        Entries of override that lesser already has (including any 
+        changes made in place to lesser's dicts) are compared, not 
+        merged again, so only the entries of lesser that need to change 
+        are written to.
+    """
     # overwrite ?
     # call update on the sub dicts?:
 
 
     if not lesser:
         lesser = GeomDataMapping()
+
     logger.debug('Overriding gdm with gdms.  ')
-    for key, val in override.items():
+    for key in override:
+        val = override[key]
+        if merged_already(lesser, key, val, merge_subdicts):
+            continue
         if (merge_subdicts and
             key in lesser and
             isinstance(val, dict) and
@@ -341,6 +744,7 @@ def override_gdm(lesser, override, merge_subdicts = True):
             lesser[key].update(val)
         else:
             lesser[key] = val.copy() if isinstance(val, dict) else val
+
     return lesser
 
 
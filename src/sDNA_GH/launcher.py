@@ -102,7 +102,7 @@ REPOSITORY = os.path.dirname(os.path.dirname(ghdoc.Path)) if ghdoc.Path else Non
 
 SELFTEST = 'selftest'
 APITEST_PREFIX = 'sDNA_GH_API_test_'
-DEPS = ['toml_tools', 'shapefile', 'mapclassif_Iron']
+DEPS = ['toml_tools', 'shapefile']
 
 
 def get_dir_of_python_package_containing_ghuser():
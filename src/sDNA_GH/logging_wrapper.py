@@ -34,6 +34,7 @@ import os
 import logging
 import functools
 import inspect
+import itertools
 
 try:
     basestring #type: ignore
@@ -110,6 +111,21 @@ def set_handler_level(handler, level):
         handler.setLevel(level)
 
 
+def set_logger_level_from_handlers(logger):
+    #type(logging.Logger) -> None
+    """ Sets logger's level to the lowest level of its handlers, so 
+        e.g. logger.debug returns immediately (and 
+        logger.isEnabledFor(logging.DEBUG) is False) if no handler 
+        would emit the record anyway.  
+    """
+    levels = [handler.level 
+              for handler in logger.handlers 
+              if not isinstance(handler, logging.NullHandler)
+             ]
+    if levels:
+        logger.setLevel(min(levels) or logging.DEBUG) # NOTSET == 0 => all
+
+
 def get_existing_file_handler_or_add_new_one(logger, options = LoggingOptions):
     #type:(logging.Logger, LoggingOptions | tuple) -> logging.FileHandler
     dir_name = os.path.join(options.working_folder, options.logs_dir)
@@ -187,10 +203,69 @@ def get_logger_and_handlers(stream = None
                                             )
     else:
         stream_handler = logging.NullHandler()
+
+    set_logger_level_from_handlers(logger)
     
     return logger, file_handler, console_handler, stream_handler 
 
 
+class Lazy(object):
+    """ A log message argument, that only calls func(*args, **kwargs) 
+        to make its str if a handler actually emits the message.  Pass 
+        it as an argument, instead of formatting the message eagerly, e.g.:
+            logger.debug('points == %s', Lazy(get_points, obj))
+        not:
+            logger.debug('points == %s' % get_points(obj))
+    """
+    __slots__ = ('func', 'args', 'kwargs')
+
+    def __init__(self, func, *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self):
+        return str(self.func(*self.args, **self.kwargs))
+
+    __repr__ = __str__
+
+
+def truncated_repr(x, max_items = 3, max_len = 300):
+    #type(type[any], int, int) -> str
+    """ A repr of x, that for a mapping (e.g. a GeomDataMapping) or 
+        sequence only includes its first max_items items (and its 
+        length), and that is no more than max_len characters.  
+    """
+    if hasattr(x, 'keys') and hasattr(x, '__getitem__') and hasattr(x, '__len__'):
+        items = ', '.join('%r: %r' % (key, x[key]) 
+                          for key in itertools.islice(iter(x), max_items)
+                         )
+        if len(x) > max_items:
+            items += ', ...'
+        retval = '%s({%s}) (%s items)' % (type(x).__name__, items, len(x))
+    elif isinstance(x, (list, tuple)) and len(x) > max_items:
+        retval = '%s(%r ...) (%s items)' % (type(x).__name__
+                                           ,list(x[:max_items])
+                                           ,len(x)
+                                           )
+    else:
+        retval = repr(x)
+    if len(retval) > max_len:
+        retval = retval[:max_len] + '...'
+    return retval
+
+
+class Truncated(Lazy):
+    """ A log message argument, that only makes the truncated_repr of 
+        x if a handler actually emits the message, e.g.:
+            logger.debug('gdm == %s', Truncated(gdm))
+    """
+    __slots__ = ()
+
+    def __init__(self, x, max_items = 3, max_len = 300):
+        super(Truncated, self).__init__(truncated_repr, x, max_items, max_len)
+
+
 def make_self_logger(self, logger = None, module_name = '', name = None):
     if name is None:
         name = self.__class__.__name__
@@ -67,7 +67,6 @@ deps_path = launcher.get_dir_of_python_package_containing_ghuser() or ''
 # as deps_path could not be on sys.path
 for dep in ('toml_tools'
         ,'shapefile'
-        ,'mapclassif_Iron'
         ,'Cheetah_GH'
         ,'Anteater_GH'
         ): 
@@ -345,6 +344,7 @@ class HardcodedOptions(logging_wrapper.LoggingOptions
     # write_iterable_to_shp
     field_size = 30
     cache_iterable= False
+    stream_above = 10000
     uuid_field = 'Rhino3D_' # 'object_identifier_UUID_'  
     # also in ShapefileReader, UsertextWriter  
     uuid_length = 36 # 32 in 5 blocks (2 x 6 & 2 x 5) with 4 separator characters.
@@ -362,6 +362,7 @@ class HardcodedOptions(logging_wrapper.LoggingOptions
     #30,000 characters tested.
     output_shp = ''
     prj = ''
+    reuse_unchanged_shp = False
     ###########################################################################
     #
     # Overrides for ShapefileReader
@@ -369,6 +370,11 @@ class HardcodedOptions(logging_wrapper.LoggingOptions
     bake = False
     new_geom = False
     del_after_read = True
+    read_field_only = False
+    memory_map = True
+    bulk_coordinates = True
+    cache_max_bytes = 256 * 1024**2
+    columnar_gdm = False
     sDNA_names_fmt = '{name}.shp.names.csv'  
     ###########################################################################   
     #         
@@ -480,13 +486,55 @@ output.debug('message == %s ' % module_opts['options'].message)
 
 #########################################################################
 #
+def debug_output_enabled():
+    #type() -> bool
+    """ Whether output.debug messages are used (they are all cached until 
+        output's logger is set up), so that expensive ones (e.g. of params 
+        containing a Geom Data Map) are only made if needed.
+    """
+    logger = getattr(output, 'logger', None)
+    return logger is None or logger.isEnabledFor(logging_wrapper.logging.DEBUG)
+
+
+def copy_of_opts(x):
+    #type(type[any]) -> type[any]
+    """ Copies the dicts, lists and tuples in x, e.g. a nested dict of 
+        options, so that the copy is not changed if x is mutated.  
+        Namedtuples (which are immutable), Geom Data Maps and all other 
+        objects are not copied.
+    """
+    if (options_manager.isnamedtuple(x) or 
+        isinstance(x, gdm_from_GH_Datatree.GeomDataMapping)):
+        #
+        return x
+    if isinstance(x, dict):
+        return x.__class__((key, copy_of_opts(val)) for key, val in x.items())
+    if isinstance(x, (list, tuple)):
+        return x.__class__(copy_of_opts(item) for item in x)
+    return x
+
+
+def id_of_non_option(x):
+    #type(type[any]) -> int or tuple
+    """ Identifies a non-option input (e.g. a Geom Data Map) by id, so 
+        that it need not be copied, compared entry by entry, or kept alive 
+        by a memo.  The items of lists and tuples (e.g. from Params with 
+        list access) are identified individually.
+    """
+    if isinstance(x, (list, tuple)):
+        return tuple(id(item) for item in x)
+    return id(x)
+
+
 def override_all_opts(local_opts #  mutated
                      ,overrides
                      ,params
                      ,local_metas = DEFAULT_LOCAL_METAS
                      ,not_shared = ('advanced', 'input', 'output')
+                     ,memo = None
+                     ,not_options = ('gdm', 'Data', 'Geom', 'go')
                      ):
-    #type(dict, list, dict, namedtuple, namedtuple, tuple) -> dict, namedtuple
+    #type(dict, list, dict, namedtuple, namedtuple, tuple, dict, tuple) -> dict, namedtuple
     """    
     The options override function for sDNA_GH.  
 
@@ -498,12 +546,20 @@ def override_all_opts(local_opts #  mutated
     3) The nested dict from config.toml can contain other general data 
        fields at higher levels.  These are applied to all tools below them 
        in the tree.
+
+    4) If memo (a dict) is given, the results are stored in it.  If all
+       the inputs (including module_opts and the config.toml files) are
+       equal to those of the last call with the same memo, the stored 
+       results are returned, instead of overriding all the options again.
+       Params in not_options (e.g. Geom Data Maps) are compared by id, 
+       not by contents.
    
     Mutates: local_opts
     Returns: local_metas, local_opts
     """
 
     metas = local_opts['metas']
+    original_local_opts = local_opts
 
     params = params.copy()# OrderedDict((key, value) 
     local_only = OrderedDict()
@@ -548,7 +604,35 @@ def override_all_opts(local_opts #  mutated
                  ,params
                  ]
 
-    output.debug('overrides == %s' % (overrides,))
+    if debug_output_enabled():
+        output.debug('overrides == %s' % logging_wrapper.Truncated(overrides))
+
+    if memo is not None:
+        local_opts_before = copy_of_opts(local_opts)
+        params_key = OrderedDict((key, id_of_non_option(val) 
+                                       if key in not_options 
+                                       else copy_of_opts(val)
+                                      )
+                                      for key, val in params.items()
+                                     )
+        memo_inputs = (metas
+                      ,copy_of_opts(overrides[:-1]) # all but params
+                      ,params_key
+                      ,local_metas
+                      ,copy_of_opts(module_opts)
+                      ,options_manager.file_stamp(DEFAULT_METAS.config)
+                      )
+        if (memo.get('inputs') == memo_inputs and
+            # If no_state, local_opts is reset (apart from metas).
+            (memo['no_state'] or memo['local_opts'] == local_opts_before)):
+            #
+            output.debug('Options unchanged since last override.  ')
+            opts = copy_of_opts(memo['opts'])
+            if memo['in_place']:
+                local_opts.clear()
+                local_opts.update(opts)
+                opts = local_opts
+            return opts, memo['local_metas']
 
     old_sync = local_metas.sync
 
@@ -578,9 +662,10 @@ def override_all_opts(local_opts #  mutated
 
 
 
-    output.debug('overrides == %s' 
-                % [override.keys() for override in overrides]
-                )
+    if debug_output_enabled():
+        output.debug('overrides == %s' 
+                    % [override.keys() for override in overrides]
+                    )
 
 
     if local_metas.sync:
@@ -633,7 +718,8 @@ def override_all_opts(local_opts #  mutated
                                                            ,**metas._asdict()
                                                            )
 
-    output.debug('metas == %s' % (metas,))
+    if debug_output_enabled():
+        output.debug('metas == %s' % (metas,))
 
     local_opts['metas'] = metas
 
@@ -642,14 +728,26 @@ def override_all_opts(local_opts #  mutated
                          ,override = override
                          ,metas = metas
                          )
-        output.debug('override.keys() == %s' % override.keys())
-        output.debug('local_opts.keys() == %s' % local_opts.keys())
+        if debug_output_enabled():
+            output.debug('override.keys() == %s' % override.keys())
+            output.debug('local_opts.keys() == %s' % local_opts.keys())
 
     
 
 
     #output.debug('local_opts (opts) == %s' % local_opts)
 
+    if memo is not None:
+        memo.clear()
+        if local_opts is not module_opts: # Shared opts can change elsewhere.
+            memo.update(inputs = memo_inputs
+                       ,local_opts = local_opts_before
+                       ,no_state = local_metas.no_state and not local_metas.sync
+                       ,opts = copy_of_opts(local_opts)
+                       ,in_place = local_opts is original_local_opts
+                       ,local_metas = local_metas
+                       )
+
     return local_opts, local_metas
 
 ##############################################################################
@@ -667,7 +765,7 @@ if os.path.isfile(DEFAULT_METAS.config):
                                                 ,overrides = [installation_opts]
                                                 ,params = {}  
                                                 )
-    output.debug('module_opts == %s' % module_opts)
+    output.debug('module_opts == %s' % logging_wrapper.Truncated(module_opts))
 
     output.debug("After override: opts['options'].message == %s" 
                 % module_opts['options'].message
@@ -913,7 +1011,7 @@ class sDNA_GH_Component(smart_comp.SmartComponent):
             tools = self.tools
 
 
-        self.logger.debug('Updating Params: %s ' % tools)
+        self.logger.debug('Updating Params: %s ', tools)
 
         interpolations = self.local_metas._asdict()
 
@@ -1003,12 +1101,14 @@ class sDNA_GH_Component(smart_comp.SmartComponent):
 
 
         #self.logger.debug(self.opts)
-        self.logger.debug('Tool opts == ' + '\n'.join(
-                                                 '%s : %s' % (k, v)
-                                                 for k, v in self.opts.items()
-                                                 if k not in ('options','metas')
-                                                 ) 
-                    )
+        def tool_opts():
+            # A new generator each time, as the message may be made
+            # once per handler.
+            return '\n'.join('%s : %s' % (k, v)
+                             for k, v in self.opts.items()
+                             if k not in ('options','metas')
+                            )
+        self.logger.debug('Tool opts == %s', logging_wrapper.Lazy(tool_opts))
 
 
 
@@ -1018,7 +1118,7 @@ class sDNA_GH_Component(smart_comp.SmartComponent):
             new_name = self.Attributes.Owner.NickName 
             # If this is run before __init__ has run, there is no 
             # Attributes attribute yet (ghenv.Component can be used instead).
-            self.logger.debug('new_name == %s' % new_name)
+            self.logger.debug('new_name == %s', new_name)
 
         if ( (isinstance(self.nick_name, options_manager.Sentinel)) 
               or (self.opts['metas'].cmpnts_change 
@@ -1031,7 +1131,7 @@ class sDNA_GH_Component(smart_comp.SmartComponent):
                        +self.nick_name
                        )
             return 'Name updated'
-        self.logger.debug('Old name kept == %s' % self.nick_name)
+        self.logger.debug('Old name kept == %s', self.nick_name)
 
         return 'Old name kept'
 
@@ -1042,6 +1142,7 @@ class sDNA_GH_Component(smart_comp.SmartComponent):
         self.ghdoc = ghdoc
         self.tools_default_opts = {}
         self.not_shared = set()
+        self.opts_memo = {}
         #sDNA_GH_path = sDNA_GH_path
         #sDNA_GH_package = sDNA_GH_package
         self.do_not_remove = do_not_remove
@@ -1085,7 +1186,9 @@ class sDNA_GH_Component(smart_comp.SmartComponent):
 
         gdm = smart_comp.first_item_if_seq(kwargs.get('gdm', {}))
 
-        self.logger.debug(('gdm from start of RunScript == %s' % gdm)[:80])
+        self.logger.debug('gdm from start of RunScript == %s'
+                         ,logging_wrapper.Truncated(gdm, max_len = 80)
+                         )
         
         result = self.try_to_update_nick_name()
         nick_name = self.nick_name
@@ -1122,13 +1225,14 @@ class sDNA_GH_Component(smart_comp.SmartComponent):
         self.logger.info('Tools == %s ' % self.tools)
 
         #######################################################################
-        self.logger.debug('kwargs.keys() == %s ' % kwargs.keys())
+        self.logger.debug('kwargs.keys() == %s ', kwargs.keys())
         self.opts, self.local_metas = override_all_opts(
                                  local_opts = self.opts # mutated
                                 ,overrides = [self.tools_default_opts, external_opts]
                                 ,params = kwargs
                                 ,local_metas = self.local_metas 
                                 ,not_shared = self.not_shared
+                                ,memo = self.opts_memo
                                 )
         #######################################################################
         kwargs['opts'] = self.opts
@@ -1142,6 +1246,7 @@ class sDNA_GH_Component(smart_comp.SmartComponent):
                                )
                               ):
             logging_wrapper.set_handler_level(handler, level)
+        logging_wrapper.set_logger_level_from_handlers(logger)
 
 
         self.logger.debug('Opts overridden....    ')
@@ -1231,7 +1336,7 @@ class sDNA_GH_Component(smart_comp.SmartComponent):
                 self.logger.error(msg)
                 raise ValueError(msg)
 
-            self.logger.debug('my_tools == %s' % self.tools)
+            self.logger.debug('my_tools == %s', self.tools)
 
 
 
@@ -1243,14 +1348,14 @@ class sDNA_GH_Component(smart_comp.SmartComponent):
 
 
 
-            self.logger.debug('type(geom_data_map) == %s ' % type(geom_data_map))
+            self.logger.debug('type(geom_data_map) == %s ', type(geom_data_map))
             
-            self.logger.debug('Before merge gdm[:3] == %s ' % gdm.items()[:3])
+            self.logger.debug('Before merge gdm == %s ', logging_wrapper.Truncated(gdm))
 
 
-            self.logger.debug('Before merge geom_data_map[:3] == %s ' 
-                        % geom_data_map.items()[:3]
-                        )
+            self.logger.debug('Before merge geom_data_map == %s '
+                             ,logging_wrapper.Truncated(geom_data_map)
+                             )
 
             gdm = gdm_from_GH_Datatree.override_gdm(
                                         gdm  # External one from args
@@ -1258,9 +1363,9 @@ class sDNA_GH_Component(smart_comp.SmartComponent):
                                        ,self.opts['options'].merge_subdicts
                                        )
 
-            self.logger.debug('After merge type(gdm) == %s ' % type(gdm))
+            self.logger.debug('After merge type(gdm) == %s ', type(gdm))
             
-            self.logger.debug('After merge gdm[:3] == %s ' % gdm.items()[:3])
+            self.logger.debug('After merge gdm == %s ', logging_wrapper.Truncated(gdm))
 
             kwargs['gdm'] = gdm
             kwargs['f_name'] = f_name # put back in here so it doesn't go in opts
@@ -1293,14 +1398,14 @@ class sDNA_GH_Component(smart_comp.SmartComponent):
 
 
         else:
-            self.logger.debug('go == %s ' % go)
+            self.logger.debug('go == %s ', go)
             ret_vals_dict = {}
             ret_vals_dict['OK'] = False
         ret_vals_dict['opts'] = [self.opts.copy()] # could become external_opts
                                                    # in another component
         ret_vals_dict['l_metas'] = self.local_metas #immutable
 
-        self.logger.debug('Returning from self.script. opts.keys() == %s ' % self.opts.keys() )
+        self.logger.debug('Returning from self.script. opts.keys() == %s ', self.opts.keys())
 
         all_tool_opts = {}
         for tool in self.tools:
@@ -1309,7 +1414,7 @@ class sDNA_GH_Component(smart_comp.SmartComponent):
                 tool_opts_dict = tool_opts._asdict()
                 all_tool_opts.update(tool_opts_dict)
 
-        self.logger.debug('all_tool_opts: %s '  % all_tool_opts)
+        self.logger.debug('all_tool_opts: %s ', all_tool_opts)
 
         locals_ = locals().copy()
         ret_args = self.component_Outputs( 
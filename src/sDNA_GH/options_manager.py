@@ -41,6 +41,7 @@ from logging (i.e. to stderr for >= warning, into the void otherwise).
 
 import sys
 import os
+import copy
 import logging
 import collections
 
@@ -97,6 +98,25 @@ def get_dict_of_Classes(**kwargs):
                         for key, val in kwargs.items() 
                       )
 
+namedtuple_classes = {} # (typename, field_names) -> namedtuple class
+
+
+def namedtuple_class(typename, field_names, rename = False):
+    #type(str, Iterable[str], bool) -> type[tuple]
+    """ As collections.namedtuple, but each class (for a typename and 
+        field_names in order) is only created once, and then reused.  
+    """
+    key = (typename, tuple(field_names))
+    Class = namedtuple_classes.get(key)
+    if Class is None or (not rename and Class._fields != key[1]):
+        # A class made with rename = True can't be reused if it renamed
+        # any fields and rename is False (collections.namedtuple raises 
+        # a ValueError instead).
+        Class = collections.namedtuple(typename, key[1], rename = rename)
+        namedtuple_classes[key] = Class
+    return Class
+
+
 def namedtuple_from_class(Class, name = None):
     # type: ( type[any], str) -> collections.namedtuple
     #https://www.python.org/dev/peps/pep-0484/#suggested-syntax-for-python-2-7-and-straddling-code
@@ -106,7 +126,7 @@ def namedtuple_from_class(Class, name = None):
                                 for attr in dir(Class) 
                                 if not attr.startswith('_')
                              )  
-    factory = collections.namedtuple(name, fields_dict.keys(), rename = True)   
+    factory = namedtuple_class(name, fields_dict.keys(), rename = True)   
     retval = factory(**fields_dict)
     return retval
 
@@ -159,10 +179,10 @@ def namedtuple_from_dict(d
                                          ,**kwargs
                                          )  
 
-    return collections.namedtuple(class_prefix + NT_name
-                                 ,d.keys()
-                                 ,rename=False 
-                                 )(**d)  # Don't return nt class
+    return namedtuple_class(class_prefix + NT_name
+                           ,d.keys()
+                           ,rename=False 
+                           )(**d)  # Don't return nt class
 
 def delistify_vals_if_not_list_in(d_lesser, d_greater): 
     #type(dict, dict) -> None   
@@ -247,8 +267,8 @@ def override_dict_key_val_generator(d_lesser
             #
             val = val[0]
         
-        logger.debug('isinstance(d_lesser[key], Sentinel) == %s' 
-                     % isinstance(d_lesser[key], Sentinel)
+        logger.debug('isinstance(d_lesser[key], Sentinel) == %s'
+                    ,isinstance(d_lesser[key], Sentinel)
                     )
 
         if (check_types and 
@@ -389,17 +409,39 @@ def load_toml_file(config_path = os.path.join(sys.path[0], 'config.toml')
         return toml_tools.load(f)
 
 
+def file_stamp(path):
+    #type(str) -> tuple | None
+    """ The modification time and size of the file path, or None if 
+        there is no such file. 
+    """
+    if not os.path.isfile(path):
+        return None
+    stat = os.stat(path)
+    return stat.st_mtime, stat.st_size
+
+
+toml_files_cache = {} # path -> (file_stamp(path), dict)
+
+
 def dict_from_toml_file(path):
     #type (str) -> dict
-    """ If path is an existing toml file, returns load_toml_file(path). """
+    """ If path is an existing toml file, returns load_toml_file(path). 
+    
+        The file is only read and parsed again if it has been changed 
+        since it was last loaded.  A copy of the cached dict is returned, 
+        as callers may mutate it.
+    """
     if not os.path.isfile(path) or os.path.splitext(path)[1] != '.toml':
         msg = ('config in args_dict == %s ' % path
                 +' needs to be an existing .toml file'
                 )
         logger.error(msg)
         raise ValueError(msg)
-    logger.debug('Loading .toml file: %s' % path)
-    return load_toml_file( path )
+    stamp = file_stamp(path)
+    if path not in toml_files_cache or toml_files_cache[path][0] != stamp:
+        logger.debug('Loading .toml file: %s', path)
+        toml_files_cache[path] = stamp, load_toml_file( path )
+    return copy.deepcopy(toml_files_cache[path][1])
 
 
 
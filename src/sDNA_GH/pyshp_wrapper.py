@@ -33,21 +33,28 @@ __version__ = '3.0.5'
 """
 
 import os
+import sys
 import abc
 import re
 import logging
 import warnings
 import itertools
-import locale
+izip = getattr(itertools, 'izip', zip) # lazy in Python 2 too
+import decimal
+import hashlib
+import struct
+from array import array
 from collections import OrderedDict
 from datetime import date
 import collections
 
 if hasattr(collections, 'Iterable'):
     Iterable, Callable = collections.Iterable, collections.Callable
+    Mapping, Sized = collections.Mapping, collections.Sized
 else:
     import collections.abc
     Iterable, Callable = collections.abc.Iterable, collections.abc.Callable
+    Mapping, Sized = collections.abc.Mapping, collections.abc.Sized
 
 if hasattr(abc, 'ABC'):
     ABC = abc.ABC
@@ -57,6 +64,16 @@ else:
 
 
 
+try:
+    import mmap
+except ImportError:
+    mmap = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None # e.g. IronPython 2.7
+
 
 import shapefile as shp
 
@@ -133,66 +150,101 @@ class CoerceAndGetCodeOptions(object):
     yyyy_mm_dd = False
     keep_floats = True
     use_memo = False # Use the 'M' field code in Shapefiles for un-coerced data
+    coercer_cache_size = 1024 # Number of distinct strings whose coerced
+                              # values and types are cached.  0 => none.
 
 
-def coerce_and_get_type(x, options = CoerceAndGetCodeOptions):
-    #type coercer function
+class Coercer(object):
+    """ A fast equivalent of coerce_and_get_type, for coercing many values
+        with the same options (e.g. all the values in a shapefile).  
 
-    if options.decimal:
-        import decimal as dec
-    x = str(x)  # To convert False to 'False' and 0 to '0'
-    dec.getcontext().prec = options.precision #if else options.precision    # significant figures,  >= # decimal places
-    if  x.lower() in ['true','false']:   
-        return x, bool  # i.e. 'L'
-    try:
-        y = int(x)   # if isinstance(x,int):  # Bool test needs to come before this as int(True) == 1
-        return y, int    # i.e.   'N'
-    except ValueError:
+        The date patterns, decimal context and quantize exponent are made 
+        once, instead of for every value.  ints and floats skip the
+        string parsing.  The results for up to options.coercer_cache_size 
+        distinct strings are cached.  
+    """
+
+    def __init__(self, options = CoerceAndGetCodeOptions):
+        self.options = options
+        n = options.max_dp
+        if options.decimal:
+            # Local context, instead of setting the global one's precision.
+            self.context = decimal.Context(prec = options.precision)
+            self.exponent = decimal.Decimal('.'*int( bool(n) ) + '0'*(n-1) + '1')   # e.g. '1' if n=0, else '0.000... (#n 0s) ...0001'
+            # Any float smaller than this can be quantized within precision.
+            self.max_safe_float = 10.0**(options.precision - n - 1)
+
+        year=r'([0-3]?\d{3})|\d{2}'
+        month=r'([0]?\d)|(1[0-2])'
+        day=r'([0-2]?\d)|(3[01])'
+        sep=r'([-\.,:/ \\])' # allows different seps r'(?P<sep>[-.,:\\/ ])'
+        test_patterns =  [ year + sep + month + sep + day ]   # datetime.date requires yyyy, mm, dd
+        if not options.yyyy_mm_dd:
+            test_patterns += [  day + sep + month + sep + year   # https://en.wikipedia.org/wiki/Date_format_by_country
+                               ,month + sep + day + sep + year]  # 
+        self.date_patterns = [re.compile(pattern) for pattern in test_patterns]
+
+        self.cache = {}
+        self.cache_size = getattr(options, 'coercer_cache_size', 0)
+
+    def coerce_float(self, x):
+        #type(float) -> tuple(type[any], type)
+        options = self.options
+        if (options.decimal and 
+            not (-self.max_safe_float < x < self.max_safe_float)):
+            # Too big to be sure of quantizing (or inf or nan).
+            return self.coerce_str(str(x))
+        x = str(x)
+        if options.keep_floats:
+            return x, float
+        return self.coerce_str(x)
+
+    def coerce_str(self, x):
+        #type(str) -> tuple(type[any], type)
+        options = self.options
+        if  x.lower() in ('true','false'):   
+            return x, bool  # i.e. 'L'
+        try:
+            return int(x), int    # i.e.   'N'
+        except ValueError:
+            pass
         try:
-            n = options.max_dp
             if options.decimal:
-                y = dec.Decimal(x)
-                y = y.quantize(  dec.Decimal('.'*int( bool(n) ) + '0'*(n-1) + '1')  )   # e.g. '1' if n=0, else '0.000... (#n 0s) ...0001'
+                y = decimal.Decimal(x).quantize(self.exponent, context = self.context)
             else:
-                y = float(x)   
-                
-                # float('12345' ) == 12345.0 so int test needs to come 
-                # before this if 'N' and 'F' are utilised differently
-                
-                y = round(y, n)  
+                y = round(float(x), options.max_dp)
                 #  Beware:  
-                # https://docs.python.org/2.7/tutorial/floatingpoint.html#tut-fp-issues                                                      
-                
+                # https://docs.python.org/2.7/tutorial/floatingpoint.html#tut-fp-issues
             return x if options.keep_floats else y, float
-                    # Tuple , binds to result of ternary operator
-        except (dec.InvalidOperation, ValueError):
-            if isinstance(x, date):
-                return x, date   # i.e. 'D'   
+        except (decimal.InvalidOperation, ValueError):
+            pass
+
+        if any(pattern.match(x) for pattern in self.date_patterns):
+            return x, date          # TODO, optionally, return datetime.date() object?
+        return x, str  # i.e. 'C'  
+
+    def __call__(self, x):
+        #type(type[any]) -> tuple(type[any], type)
+        if type(x) is bool:
+            return str(x), bool
+        if type(x) is int:
+            return x, int
+        if type(x) is float:
+            return self.coerce_float(x)
+
+        x = str(x)  # To convert False to 'False' and 0 to '0'
+
+        if x in self.cache:
+            return self.cache[x]
+        retval = self.coerce_str(x)
+        if len(self.cache) < self.cache_size:
+            self.cache[x] = retval
+        return retval
 
-            if isinstance(x, list) and len(x) == 3 and all(isinstance(z, int) for z in x):
-                x = ':'.join(map(str, x))
-    
-            if isinstance(x, basestring):
-                year=r'([0-3]?\d{3})|\d{2}'
-                month=r'([0]?\d)|(1[0-2])'
-                day=r'([0-2]?\d)|(3[01])'
-                sep=r'([-\.,:/ \\])' # allows different seps r'(?P<sep>[-.,:\\/ ])'
-                test_patterns =  [ year + sep + month + sep + day ]   # datetime.date requires yyyy, mm, dd
-                if not options.yyyy_mm_dd:
-                    test_patterns += [  day + sep + month + sep + year   # https://en.wikipedia.org/wiki/Date_format_by_country
-                                       ,month + sep + day + sep + year]  # 
-                if any(re.match(pattern, x) for pattern in test_patterns):
-                    return x, date          # TODO, optionally, return datetime.date() object?
-                else:
-                    return x, str  # i.e. 'C'  
-            else:
-                msg = 'Failed to coerce UserText to PyShp record data type.  '
-                if options.use_memo:
-                    logger.warning(msg + 'Using Memo.  ')
-                    return str(x), 'M'
-                else:
-                    logger.error(msg)
-                    raise TypeError(msg)
+
+def coerce_and_get_type(x, options = CoerceAndGetCodeOptions):
+    #type coercer function
+    return Coercer(options)(x)
 
 
 class LocaleOptions(object):
@@ -202,10 +254,24 @@ class LocaleOptions(object):
 
 def dec_places_req(x, options = LocaleOptions):
     #type(Number, type[any]) -> int
-    locale.setlocale(locale.LC_ALL,  options.locale)
-    radix_char = locale.localeconv()['decimal_point']
-    fractional_part = str(x).rpartition(radix_char)[2]
-    return len(fractional_part)
+    """ Number of decimal places needed to write x in full.  
+    
+        Measured from the exponent of the Decimal, without calling 
+        locale.setlocale (process global, slow and not thread safe).  
+        Python's str and repr of a number always use '.' as the radix,
+        whatever the user's locale (the locale option is for parsing 
+        strings elsewhere).
+    """
+    if not isinstance(x, decimal.Decimal):
+        try:
+            # str, as used by len_bytes for the field's size.
+            x = decimal.Decimal(str(x))
+        except (decimal.InvalidOperation, ValueError, TypeError):
+            return len(str(x).rpartition('.')[2])
+    exponent = x.as_tuple()[2]
+    if not isinstance(exponent, int):  # 'n', 'N' or 'F' (nan, inf)
+        return 0
+    return max(0, -exponent)
 
 
 class GetFileNameOptions(object):
@@ -242,6 +308,95 @@ def get_filename(f, options = GetFileNameOptions):
     return prev_f
 
 
+def possible_filenames(f, options = GetFileNameOptions):
+    #type: (str, type[any]) -> Iterator[str]
+    """ f, and the names get_filename could have chosen instead of f. """
+    yield f
+    file_name, file_extension = os.path.splitext(f)
+    for i in range(1, options.max_new_files + 1):
+        yield (file_name
+              +options.duplicate_suffix.format(number = str(i))
+              +file_extension
+              )
+
+
+DIGEST_EXT = '.shp.digest'
+
+# Options that change what write_iterable_to_shp writes for the same data.
+DIGEST_OPTIONS = ('encoding'
+                 ,'decimal'
+                 ,'precision'
+                 ,'max_dp'
+                 ,'yyyy_mm_dd'
+                 ,'keep_floats'
+                 ,'use_memo'
+                 ,'field_size'
+                 ,'uuid_field'
+                 ,'uuid_length'
+                 ,'num_dp'
+                 ,'min_sizes'
+                 )
+
+
+def shp_digest(rows, options, extra_settings = ()):
+    #type(Iterable[tuple], type[any], Iterable) -> str
+    """ A hex digest of the shapes and data for a shapefile, and of the
+        options and extra_settings (e.g. shp_type) that affect how they 
+        are written.  Each row is a tuple, e.g. (id, points, data items).
+    """
+    hasher = hashlib.sha1()
+    settings = tuple((name, getattr(options, name, None)) 
+                     for name in DIGEST_OPTIONS
+                    ) + tuple(extra_settings)
+    hasher.update(repr(settings).encode('utf-8'))
+    for row in rows:
+        hasher.update(repr(row).encode('utf-8'))
+    return hasher.hexdigest()
+
+
+def digest_file_name(shp_file_path):
+    #type(str) -> str
+    return os.path.splitext(shp_file_path)[0] + DIGEST_EXT
+
+
+def write_shp_digest(shp_file_path, digest):
+    #type(str, str) -> None
+    """ Records digest in a sidecar file next to the shapefile, 
+        so find_unchanged_shp works after Rhino is restarted. 
+    """
+    with open(digest_file_name(shp_file_path), 'w') as f:
+        f.write(digest)
+
+
+def read_shp_digest(shp_file_path):
+    #type(str) -> str
+    """ The digest recorded for the shapefile, or None if there is no 
+        digest or any of its files are missing or newer than the digest.
+    """
+    digest_path = digest_file_name(shp_file_path)
+    file_name_no_ext = os.path.splitext(shp_file_path)[0]
+    try:
+        digest_mtime = os.path.getmtime(digest_path)
+        for ext in ('.shp', '.dbf', '.shx'):
+            if os.path.getmtime(file_name_no_ext + ext) > digest_mtime:
+                return None
+        with open(digest_path, 'r') as f:
+            return f.read().strip()
+    except (OSError, IOError):
+        return None
+
+
+def find_unchanged_shp(shp_file_path, digest, options = GetFileNameOptions):
+    #type(str, str, type[any]) -> str
+    """ The path of a previously written shapefile (shp_file_path or 
+        a numbered duplicate of it) with the same digest, else None.
+    """
+    for f in possible_filenames(shp_file_path, options):
+        if read_shp_digest(f) == digest:
+            return f
+    return None
+
+
 class EnsureCorrectOptions(CoerceAndGetCodeOptions):
     # ensure_correct & write_iterable_to_shp
     encoding = 'utf-8' # also used by get_fields_recs_and_shapes
@@ -257,11 +412,17 @@ def len_bytes(x, options = EnsureCorrectOptions):
 
 
 class FieldInfo(object):
+    """ A shapefile field's type and size, and running statistics of all 
+        the values seen in it so far (updated by self.record), so that 
+        checks on the field never need to rescan previous records.  
+    """
     name = None
     size_req = 1
     longest_val = None
     fieldType = str
     decimal = 0
+    int_width = 1 # Widest integer part (with sign) of the floats seen.
+    all_binary = True # True until a value other than 0 or 1 is recorded.
 
 
     def field_kwargs_dict(self):
@@ -282,7 +443,7 @@ class FieldInfo(object):
 
         if size >= 256:
             raise ValueError('Field: %s size attempted to be increased for value: %s' % (self.name, for_val)
-                            +'to width: %s.' % for_val['size']
+                            +'to width: %s.' % size
                             +'Set min_sizes = False and field_size <= 255 or use smaller data.\n\n'
                             +'Shapefile field lengths can have a maximum width of 255 bytes. '
                             +'(note in many encodings, e.g. UTF8, more than one byte may be '
@@ -314,7 +475,12 @@ class FieldInfo(object):
         self.decimal = decimal
 
     def increase_decimal_req_for(self, value):
-        self.increase_decimal_req_to(dec_places_req(value), for_val = value)
+        # Floats are written in fixed point with self.decimal places, 
+        # e.g. 2.5e-05 as 0.000025, which can be wider than str(value).
+        decimal = max(self.decimal, dec_places_req(value))
+        self.int_width = max(self.int_width, len('%.0f' % float(value)))
+        self.increase_size_req_to(self.int_width + 1 + decimal, for_val = value)
+        self.increase_decimal_req_to(decimal, for_val = value)
 
     def update_field(self, fieldType, size = 1, decimal = 0, value = None):
         self.fieldType = fieldType
@@ -335,6 +501,11 @@ class FieldInfo(object):
             elif value is not None:
                 self.increase_decimal_req_for(value)
 
+    def record(self, value):
+        #type(type[any]) -> None
+        if self.all_binary and value not in (0, 1):
+            self.all_binary = False
+
     def __init__(self
                 ,name
                 ,value
@@ -348,16 +519,22 @@ class FieldInfo(object):
 
         self.update_field(fieldType, size, decimal, value)
 
+        if value is not None:
+            self.record(value)
+
 
 
 def ensure_correct(fields
                   ,nice_key
                   ,value
                   ,val_type
-                  ,attribute_tables
                   ,options = EnsureCorrectOptions
                   ): 
-    # type(dict, str, type[any], str, dict namedtuple) -> None
+    # type(dict, str, type[any], type, namedtuple) -> None
+    """ Adds a FieldInfo for value to fields, or updates the existing one
+        (each FieldInfo keeps the stats of its previous values, so 
+        previous records need not be rescanned).  
+    """
     if nice_key in fields:
         field_info = fields[nice_key]
         field_info.increase_size_req_for(value)
@@ -372,8 +549,7 @@ def ensure_correct(fields
                 field_info.update_field(fieldType=val_type, value = value)
             elif (val_type is bool and
                   field_info.fieldType is int and
-                  all(attribute_tables[i][nice_key] in [0,1] 
-                      for i in attribute_tables)):
+                  field_info.all_binary):
                 #
                 field_info.update_field(fieldType=bool, value = value)
                 #1s and 0s are in a Boolean field as integers or a 1 or a 0 
@@ -390,6 +566,7 @@ def ensure_correct(fields
                 #            +str(value) + ' as .shp record type ' 
                 #            + fields[nice_key]['fieldType']
                 #            )
+        field_info.record(value)
     else:
         fields[nice_key] = FieldInfo(name = nice_key
                                     ,size = len_bytes(value, options)
@@ -415,7 +592,9 @@ def ensure_correct(fields
 
 class WriteIterableToShpOptions(EnsureCorrectOptions):
     field_size = 30
-    cache_iterable= False
+    cache_iterable= False # True => never stream, always cache all records.
+    stream_above = 10000 # Stream records from my_iterable if it has more 
+                         # items than this (or if field_names is given).
     uuid_field = 'Rhino3D_' # 'object_identifier_UUID_'     
     uuid_length = 36 # 32 in 5 blocks (2 x 6 & 2 x 5) with 4 separator characters.
     num_dp = 10 # decimal places
@@ -446,8 +625,12 @@ def write_iterable_to_shp(my_iterable
     #    ,str
     #    ,namedtuple
     #    ,dict
-    #    )  -> int, str, dict, list, list
+    #    ,type
+    #    )  -> int, str, dict, dict | None
     #
+    # Returns the return code, the shapefile's path, its fields, and the
+    # coerced attribute tables of the items (or None if they were streamed, 
+    # as only one record is held at a time).
     is_iterable = isinstance(my_iterable, Iterable)
     is_str = isinstance(my_iterable, basestring)
     is_path_str = isinstance(shp_file_path, basestring)
@@ -495,56 +678,94 @@ def write_iterable_to_shp(my_iterable
     else:
         attribute_tables = AttributeTablesClass()
 
-    if True: #field_names is None or options.cache_iterable: 
+    coerce = Coercer(options)
+
+    def coerced_items(item):
+        #type(type[any]) -> Iterator[tuple(str, type[any], type)]
+        for key in key_finder(item): # e.g. rhinoscriptsyntax.GetUserText(item,None)
+            # Demangle the user text keys and values
+            nice_match = key_matcher(key)            
+            if nice_match:
+                #TODO: Support more fields, e.g. type, size
+                value, val_type = coerce(value_demangler(item, key))
+                yield nice_match.group('name'), value, val_type
+
+    def update_fields(nice_key, value, val_type):
+        # Update the shp field sizes if they aren't big enough or the field is new, and type check
+        if options.min_sizes:
+            ensure_correct(fields, nice_key, value, val_type, options)
+            # mutates fields, adding nice_key to it if not already there, else updating its val
+        else:
+            fields[nice_key] = FieldInfo(name = nice_key
+                                        ,size = options.field_size
+                                        ,value = value
+                                        ,fieldType = val_type
+                                        ,decimal = options.num_dp
+                                        ,options = options
+                                        )  
+
+    # Two passes over my_iterable (schema, then records) are needed to 
+    # stream it, unless field_names is given.  An iterator can only be 
+    # read once.
+    reiterable = iter(my_iterable) is not my_iterable
+    stream = (not options.cache_iterable 
+              and (field_names is not None
+                   or (reiterable 
+                       and isinstance(my_iterable, Sized)
+                       and len(my_iterable) > options.stream_above
+                      )
+                  )
+             )
+    schema_given = field_names is not None
+
+
+    if not stream:
         
         for item in my_iterable:    
-            keys = key_finder(item) # e.g. rhinoscriptsyntax.GetUserText(item,None)
             values = OrderedDict( {options.uuid_field : shape_IDer(item) } )   
-            for key in keys:
-                # Demangle and cache the user text keys and values
-                nice_match = key_matcher(key)            
-                if nice_match:
-                    nice_key = nice_match.group('name')
-                    #TODO: Support more fields, e.g. type, size
-                    value = value_demangler(item, key) 
-
-                    value, val_type = coerce_and_get_type(value, options)
-                    values[nice_key] = value 
-
-
-                    # Update the shp field sizes if they aren't big enough or the field is new, and type check
-                    if options.min_sizes:
-                        ensure_correct(fields, nice_key, value, val_type, attribute_tables, options)
-                        # mutates fields, adding nice_key to it if not already there, else updating its val
-                    else:
-                        fields[nice_key] = FieldInfo(name = nice_key
-                                                    ,size = options.field_size
-                                                    ,value = value
-                                                    ,fieldType = val_type
-                                                    ,decimal = options.num_dp
-                                                    ,options = options
-                                                    )  
-            attribute_tables[item] = values.copy()  # item may not be hashable so can't use dict of dicts
+            for nice_key, value, val_type in coerced_items(item):
+                values[nice_key] = value 
+                update_fields(nice_key, value, val_type)
+            attribute_tables[item] = values  # item may not be hashable so can't use dict of dicts
         
+        rows = attribute_tables.items()
+    
     else:
-        for name in field_names:
-            fields[name] = dict(size = options.field_size
-                               ,fieldType = SHP_FIELD_CODES[str]
-                               )
-        #TODO setup basic fields dict from list without looping over my_iterable        
-
-
-
-    def default_record_dict(item):
-        retval = { key_matcher(key).group('name') : 
-                         str( value_demangler(item, key) )[:options.field_size] 
-                            for key in key_finder(item) 
-                            if (key_matcher(key) and
-                                key_matcher(key).group('name') in fields
-                               )
-                 }
-        retval[options.uuid_field ] = shape_IDer(item)
-        return retval
+        if isinstance(field_names, Mapping):
+            # e.g. the fields returned by a previous call.
+            fields.update(field_names)
+        elif schema_given:
+            for name in field_names:
+                fields[name] = FieldInfo(name = name
+                                        ,value = None
+                                        ,size = options.field_size
+                                        ,fieldType = str
+                                        ,options = options
+                                        )
+        else:
+            # Schema pass.  Only the field sizes and types are kept.
+            for item in my_iterable:
+                for nice_key, value, val_type in coerced_items(item):
+                    update_fields(nice_key, value, val_type)
+
+        def records():
+            # Holds one record at a time.
+            for item in my_iterable:
+                values = {options.uuid_field : shape_IDer(item)}
+                for nice_key, value, val_type in coerced_items(item):
+                    if nice_key not in fields:
+                        continue
+                    field_info = fields[nice_key]
+                    if (schema_given and 
+                        field_info.fieldType is str and
+                        len_bytes(value, options) > field_info.size_req):
+                        #
+                        value = str(value)[:field_info.size_req]
+                    values[nice_key] = value
+                yield item, values
+
+        rows = records()
+        attribute_tables = None
 
 
     shapefile_path = get_filename(shp_file_path
@@ -577,7 +798,7 @@ def write_iterable_to_shp(my_iterable
         add_geometric_object = getattr(w,  pyshp_writer_method[shape_code])
         # e.g. add_geometric_object = w.linez
 
-        for shape, attribute_table in attribute_tables.items():
+        for shape, attribute_table in rows:
             if not is_shape(shape, shape_code):
                 msg = 'Shape: %s cannot be converted to shape_code: %s' 
                 msg %= (shape, shape_code)
@@ -661,7 +882,7 @@ def delete_shp_files_if_req(f_name
     file_name_no_ext = os.path.splitext(f_name)[0]
     logger.debug('delete == %s ' % delete)
     if (delete or name_matches(file_name_no_ext, regexes)):
-        for ext in ('.shp', '.dbf', '.shx', '.shp.names.csv'):
+        for ext in ('.shp', '.dbf', '.shx', '.shp.names.csv', DIGEST_EXT):
             path = file_name_no_ext + ext
             delete_file(path, logger)
 
@@ -695,6 +916,8 @@ class OutputFileDeletionOptions(GetFileNameOptions, FieldRecsShapesOptions):
 
 class ShapeRecordsOptions(OutputFileDeletionOptions):
     copy_dicts = False
+    memory_map = True # Read via MappedShapefile if mmap is available.
+    bulk_coordinates = True # Read polylines' vertices via PolylineCoordinates
     shp_type = 'POLYLINEZ'
 
 
@@ -739,6 +962,416 @@ class SizedIterator(object):
         return self.length
 
 
+def dbf_value_decoder(field_type, decimal, encoding = 'utf-8', errors = 'strict'):
+    #type(str, int, str, str) -> function
+    """ A function that decodes the bytes of a .dbf field of field_type,
+        in the same way as shapefile.Reader.record does.
+    """
+    if field_type in ('N', 'F'):
+        def decode(value):
+            value = value.split(b'\0')[0].replace(b'*', b'').strip() 
+            if not value:  # QGIS NULL is all '*' chars
+                return None
+            try:
+                if decimal:
+                    return float(value)
+                try:
+                    return int(value)
+                except ValueError:
+                    return int(float(value))
+            except ValueError:
+                return None
+    elif field_type == 'D':
+        def decode(value):
+            if not value.replace(b'\0', b'').replace(b' ', b'').replace(b'0', b''):
+                return None
+            try:
+                return date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+            except ValueError:
+                return value.strip().decode(encoding, errors)
+    elif field_type == 'L':
+        def decode(value):
+            if value == b' ':  # missing or not yet set
+                return None
+            if value in b'YyTt1':
+                return True
+            if value in b'NnFf0':
+                return False
+            return None
+    else:
+        def decode(value):
+            return value.decode(encoding, errors).strip().rstrip('\0')
+    return decode
+
+
+class DbfRecordDict(dict):
+    """ A record from ProjectedDbfRecords, that can be used in place
+        of a shapefile._Record.
+    """
+    def as_dict(self):
+        return self
+
+
+class ProjectedDbfRecords(object):
+    """ Iterable of the records in a shapefile.Reader's .dbf file, that 
+        only decodes the fields in field_names.  
+
+        Each record is read as one block of bytes, and only the bytes of
+        the requested fields are sliced out and decoded, using the field 
+        offsets in the .dbf header.  Much faster than 
+        record.as_dict() for every record, when a file (e.g. sDNA's 
+        output) has many more fields than are needed.  Field names 
+        not in the file are ignored.  Deleted records are skipped, as by
+        shapefile.Reader.iterRecords.
+    """
+    def __init__(self, reader, field_names):
+        #type(shp.Reader, Iterable[str]) -> None
+        self.reader = reader
+        self.dbf = reader.dbf
+        self.dbf.seek(0)
+        (self.num_records
+        ,self.header_length
+        ,self.record_length
+        ) = struct.unpack('<xxxxLHH20x', self.dbf.read(32))
+
+        encoding = getattr(reader, 'encoding', 'utf-8')
+        errors = getattr(reader, 'encodingErrors', 'strict')
+        wanted = set(field_names)
+        self.fields = []
+        offset = 1 # deletion flag
+        for name, field_type, size, decimal in reader.fields[1:]:
+            if name in wanted:
+                self.fields.append((name
+                                   ,offset
+                                   ,offset + size
+                                   ,dbf_value_decoder(field_type
+                                                     ,decimal
+                                                     ,encoding
+                                                     ,errors
+                                                     )
+                                   ))
+            offset += size
+
+    def __len__(self):
+        return self.num_records
+
+    def __iter__(self):
+        self.dbf.seek(self.header_length)
+        fields = self.fields
+        record_length = self.record_length
+        read = self.dbf.read
+        for __ in range(self.num_records):
+            record = read(record_length)
+            if record[:1] != b' ':
+                # deleted record
+                continue
+            yield DbfRecordDict((name, decode(record[start:end])) 
+                                for name, start, end, decode in fields
+                               )
+
+
+class MappedShapefile(object):
+    """ Read only memory maps of a shapefile's .shp, .shx and .dbf files.
+
+        Reading through the maps replaces pyshp's many small file 
+        read() calls with memory copies.  self.reader is a 
+        shapefile.Reader on the maps.  Records' bytes can be sliced 
+        without copying (record_view), and whole fixed width .dbf 
+        columns decoded in bulk (column).  
+
+        The maps and files must be closed (close) before the files can 
+        be deleted on Windows, and the memoryviews from record_view must
+        be released before the maps can be closed.
+    """
+    exts = ('.shp', '.shx', '.dbf')
+
+    def __init__(self, shp_file_path, encoding = 'utf-8', encoding_errors = 'strict'):
+        #type(str, str, str) -> None
+        if mmap is None:
+            msg = 'mmap could not be imported. '
+            logger.error(msg)
+            raise ImportError(msg)
+
+        self.file_path = shp_file_path
+        self.encoding = encoding
+        self.encoding_errors = encoding_errors
+        file_name_no_ext = os.path.splitext(shp_file_path)[0]
+        self.files, self.maps = [], []
+        try:
+            for ext in self.exts:
+                f = open(file_name_no_ext + ext, 'rb')
+                self.files.append(f)
+                self.maps.append(mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ))
+        except (IOError, OSError, ValueError):
+            self.close()
+            raise
+        self.shp, self.shx, self.dbf = self.maps
+
+        (self.num_records
+        ,self.header_length
+        ,self.record_length
+        ) = struct.unpack('<xxxxLHH20x', self.dbf[:32])
+
+        self.reader = shp.Reader(shp = self.shp
+                                ,shx = self.shx
+                                ,dbf = self.dbf
+                                ,encoding = encoding
+                                ,encodingErrors = encoding_errors
+                                )
+        self.fields = self.reader.fields[1:] # skip deletion flag
+        self.field_layouts = {}
+        offset = 1 # deletion flag
+        for name, field_type, size, decimal in self.fields:
+            self.field_layouts[name] = (offset, size, field_type, decimal)
+            offset += size
+
+    def __len__(self):
+        return self.num_records
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def record_start(self, i):
+        return self.header_length + i * self.record_length
+
+    def record_view(self, i):
+        #type(int) -> memoryview / bytes
+        """ The bytes of the i th .dbf record (starting with its deletion 
+            flag), without copying them if memoryview is supported.
+        """
+        start = self.record_start(i)
+        end = start + self.record_length
+        try:
+            return memoryview(self.dbf)[start:end]
+        except (NameError, TypeError):
+            return self.dbf[start:end]
+
+    def not_deleted(self):
+        #type() -> list[bool]
+        start, step = self.header_length, self.record_length
+        return [self.dbf[i:i+1] == b' ' 
+                for i in range(start, start + step * self.num_records, step)
+               ]
+
+    def raw_column(self, name):
+        #type(str) -> list[bytes]
+        """ The undecoded bytes of field name, from all undeleted records. """
+        if name not in self.field_layouts:
+            msg = 'No field: %s in %s' % (name, self.file_path)
+            logger.error(msg)
+            raise KeyError(msg)
+        offset, size = self.field_layouts[name][:2]
+        dbf, step = self.dbf, self.record_length
+        first = self.header_length + offset
+        return [dbf[start:start+size]
+                for start, not_deleted in zip(range(first
+                                                   ,first + step * self.num_records
+                                                   ,step
+                                                   )
+                                             ,self.not_deleted()
+                                             )
+                if not_deleted
+               ]
+
+    def column(self, name, use_numpy = True):
+        #type(str, bool) -> numpy.ndarray / array / list
+        """ All the values of field name (from undeleted records).  
+
+            Numeric fields are returned as a numpy.ndarray of floats if 
+            use_numpy and NumPy are available, otherwise as an array('d').
+            Missing values are nan.  Other fields are returned as a list,
+            decoded as by shapefile.Reader.
+        """
+        if name not in self.field_layouts:
+            return self.raw_column(name) # raises KeyError
+        offset, size, field_type, decimal = self.field_layouts[name]
+
+        if field_type in ('N', 'F') and use_numpy and np is not None:
+            # A strided view of the column in the map, without copying it.
+            layout = np.dtype(dict(names = ['flag', 'value']
+                                  ,formats = ['S1', 'S%s' % size]
+                                  ,offsets = [0, offset]
+                                  ,itemsize = self.record_length
+                                  )
+                             )
+            rows = np.frombuffer(self.dbf
+                                ,dtype = layout
+                                ,count = self.num_records
+                                ,offset = self.header_length
+                                )
+            values = np.char.strip(rows['value'][rows['flag'] == b' '], b' \0*')
+            del rows # release the map's buffer, so it can be closed.
+            try:
+                return np.where(values == b'', b'nan', values).astype(float)
+            except ValueError:
+                pass # Fall back to parsing each value individually
+
+        raw = self.raw_column(name)
+
+        decode = dbf_value_decoder(field_type
+                                  ,decimal
+                                  ,self.encoding
+                                  ,self.encoding_errors
+                                  )
+        if field_type not in ('N', 'F'):
+            return [decode(value) for value in raw]
+
+        nan = float('nan')
+        return array('d', (nan if value is None else value 
+                           for value in map(decode, raw)
+                          )
+                    )
+
+    def close(self):
+        for map_ in self.maps:
+            map_.close()
+        for f in self.files:
+            f.close()
+        self.maps, self.files = [], []
+
+
+def array_from_bytes(type_code, data):
+    #type(str, bytes) -> array
+    """ An array of the little endian values in data (as in .shp files). """
+    retval = array(type_code)
+    if hasattr(retval, 'frombytes'):
+        retval.frombytes(data)
+    else:
+        retval.fromstring(data) # Python 2
+    if sys.byteorder == 'big':
+        retval.byteswap()
+    return retval
+
+
+# 2D and Z (not M) polyline shape types, whose records all have the layout 
+# read by PolylineCoordinates.
+POLYLINE_SHAPE_TYPES = {shp.POLYLINE : False
+                       ,shp.POLYGON : False
+                       ,shp.POLYLINEZ : True
+                       ,shp.POLYGONZ : True
+                       }
+
+
+class PolylineCoordinates(object):
+    """ The vertices of all the (multi part) polylines in a .shp file, 
+        read in one pass into flat arrays, instead of into lists and 
+        tuples for each vertex.  
+
+        xy: array('d') of x0, y0, x1, y1, ... for all the vertices.
+        z: array('d') of z0, z1, ... (0.0 for 2D shape types).
+        parts: array('l') of the index of the first vertex of each part, 
+               then the total number of vertices.
+        shape_parts: array('l') of the index in parts of each shape's 
+                     first part, then the total number of parts.
+    """
+    def __init__(self, shp_data):
+        #type(bytes / mmap) -> None
+        self.parts, self.shape_parts = array('l'), array('l')
+        self.has_z = POLYLINE_SHAPE_TYPES[struct.unpack_from('<i', shp_data, 32)[0]]
+        
+        parts, shape_parts = self.parts, self.shape_parts
+        xy_chunks, z_chunks = [], [] # Converted to arrays all at once.
+        num_vertices = 0
+        unpack_from = struct.unpack_from
+        file_length = 2 * unpack_from('>i', shp_data, 24)[0] # in 16 bit words
+        pos = 100 # end of .shp file header
+        while pos < file_length:
+            content_length = 2 * unpack_from('>i', shp_data, pos + 4)[0]
+            content = pos + 8
+            pos = content + content_length
+            shape_parts.append(len(parts))
+            if unpack_from('<i', shp_data, content)[0] == shp.NULL:
+                continue
+            num_parts, num_points = unpack_from('<2i', shp_data, content + 36)
+            parts.extend(num_vertices + part 
+                         for part in unpack_from('<%si' % num_parts, shp_data, content + 44)
+                        )
+            start = content + 44 + 4 * num_parts
+            end = start + 16 * num_points
+            xy_chunks.append(shp_data[start:end])
+            if self.has_z:
+                start = end + 16 # skip z range
+                z_chunks.append(shp_data[start:start + 8 * num_points])
+            num_vertices += num_points
+        shape_parts.append(len(parts))
+        parts.append(num_vertices)
+
+        self.xy = array_from_bytes('d', b''.join(xy_chunks))
+        if self.has_z:
+            self.z = array_from_bytes('d', b''.join(z_chunks))
+        else:
+            self.z = array('d', itertools.repeat(0.0, num_vertices))
+
+    def __len__(self):
+        return len(self.shape_parts) - 1
+
+    def vertices(self, start, end):
+        #type(int, int) -> list[tuple]
+        """ The vertices from index start to end, as (x, y, z) tuples, or 
+            (x, y) tuples for 2D shape types.  Rhino needs an object per 
+            vertex anyway, and unlike lists, tuples can be shared (e.g. 
+            by Read_Shp's cache) without being changed (e.g. by ensure_3D).
+        """
+        xy = self.xy
+        if self.has_z:
+            return list(izip(xy[2*start:2*end:2], xy[2*start+1:2*end:2], self.z[start:end]))
+        return list(izip(xy[2*start:2*end:2], xy[2*start+1:2*end:2]))
+
+    def shape_part_indices(self, i):
+        #type(int) -> list[int]
+        return self.parts[self.shape_parts[i]:self.shape_parts[i+1]]
+
+    def shape_vertices(self, i):
+        #type(int) -> list[tuple]
+        """ All the vertices of the i th shape (from all its parts). """
+        part_indices = self.shape_part_indices(i)
+        if not part_indices:
+            return []
+        return self.vertices(part_indices[0], self.parts[self.shape_parts[i+1]])
+
+    def parts_vertices(self, i):
+        #type(int) -> Iterator[list[tuple]]
+        """ The vertices of each part of the i th shape. """
+        first, last = self.shape_parts[i], self.shape_parts[i+1]
+        for j in range(first, last):
+            yield self.vertices(self.parts[j], self.parts[j+1])
+
+
+class BufferedShape(object):
+    """ The i th shape in a PolylineCoordinates, used in place of a 
+        shapefile.Shape by TmpFileDeletingShapeRecordsIterator.
+    """
+    __slots__ = ('coordinates', 'index')
+
+    def __init__(self, coordinates, index):
+        self.coordinates = coordinates
+        self.index = index
+
+    @property
+    def parts(self):
+        return self.coordinates.shape_part_indices(self.index)
+
+    @property
+    def points(self):
+        return self.coordinates.shape_vertices(self.index)
+
+
+def deleted_after_read(file_path, options):
+    #type(str, type[any]) -> bool
+    """ Whether file_path is a temporary (e.g. sDNA output) file, that 
+        TmpFileDeletingIterator deletes after reading it.
+    """
+    return bool(options.del_after_read and 
+                not options.strict_no_del and 
+                not options.overwrite_shp and 
+                isinstance(options.OUTPUT_FILE_DELETER, ShapeFilesDeleter) and
+                file_path == options.OUTPUT_FILE_DELETER.file_name
+               )
+
+
 class TmpFileDeletingIterator(SizedIterator):
     """ Iterator wrapper for a file object that calls 
         self.close and thence self.maybe_delete_file 
@@ -751,22 +1384,32 @@ class TmpFileDeletingIterator(SizedIterator):
         clean up will not happen automatically for them.  
         https://peps.python.org/pep-0533/ 
     """
-    def __init__(self, reader, opts = None):
-        # type(shp.Reader, dict, dict) -> None
+    def __init__(self, reader, opts = None, fields = None):
+        # type(shp.Reader, dict, list) -> None
         if opts is None:
             opts = dict(options = ShapeRecordsOptions)
         self.opts = opts
+        self.fields = fields # None => all fields
         
+        self.mapped_shapefile = None
+
         if isinstance(reader, basestring) and os.path.isfile(reader):
             self.file_path = reader
             encoding = opts['options'].encoding.replace('-','')
-            reader = shp.Reader(reader, encoding = encoding)
+            if getattr(opts['options'], 'memory_map', False) and mmap is not None:
+                self.mapped_shapefile = MappedShapefile(reader, encoding)
+                reader = self.mapped_shapefile.reader
+            else:
+                reader = shp.Reader(reader, encoding = encoding)
         elif not isinstance(reader, shp.Reader):
             raise ValueError('No shapefile reader or file path supplied. ')
 
         self.reader = reader
         
-        self.file_path = reader.shp.name
+        if self.mapped_shapefile is not None:
+            self.file_path = self.mapped_shapefile.files[0].name
+        else:
+            self.file_path = reader.shp.name
 
         if reader.shapeTypeName != opts['options'].shp_type:
             msg = 'Shape type of file: %s, %s does not match '
@@ -793,6 +1436,23 @@ class TmpFileDeletingIterator(SizedIterator):
             desired iterator that yields what ever is wanted.  """
         return self.reader.iterShapes()
 
+    def records(self):
+        """ The records in the file, only decoding self.fields if 
+            it is not None.  
+        """
+        if self.fields is None:
+            return self.reader.iterRecords()
+        return iter(ProjectedDbfRecords(self.reader, self.fields))
+
+    def shape_records(self):
+        if self.fields is None:
+            return self.reader.iterShapeRecords()
+        return (shp.ShapeRecord(shape = shape, record = record)
+                for shape, record in izip(self.reader.iterShapes()
+                                        ,self.records()
+                                        )
+               )
+
     def next(self):
         try:
             retval = next(self.iterator)
@@ -806,12 +1466,7 @@ class TmpFileDeletingIterator(SizedIterator):
     def maybe_delete_file(self, *args):
         logger.debug('maybe_delete_file called.')
         options = self.opts['options']
-        if (options.del_after_read and 
-            not options.strict_no_del and 
-            not options.overwrite_shp and 
-            isinstance(options.OUTPUT_FILE_DELETER, ShapeFilesDeleter) and
-            self.file_path == options.OUTPUT_FILE_DELETER.file_name):
-            #
+        if deleted_after_read(self.file_path, options):
             options.OUTPUT_FILE_DELETER.delete_files(
                                                 delete = options.del_after_read
                                                ,opts = self.opts
@@ -823,6 +1478,9 @@ class TmpFileDeletingIterator(SizedIterator):
     def close(self):
         logger.debug('Closing reader: %s' % self.reader)
         self.reader.close()
+        if self.mapped_shapefile is not None:
+            # Windows can't delete files that are still mapped.
+            self.mapped_shapefile.close()
         logger.debug('Attempting to delete file: %s ' % self.file_path)
         self.maybe_delete_file()
 
@@ -850,7 +1508,7 @@ class TmpFileDeletingRecordsIterator(TmpFileDeletingIterator):
         delete_files method must be called directly.
     """
     def generator(self):
-        return (record.as_dict() for record in self.reader.iterRecords())
+        return (record.as_dict() for record in self.records())
 
 
 
@@ -890,14 +1548,48 @@ class TmpFileDeletingShapeRecordsIterator(TmpFileDeletingIterator):
         # z coordinate is not simply in points
         return [(x,y,z) for ((x,y), z) in zip(shape.points, shape.z)], record
 
+    def points_and_rec_buffered(self, shape, record):
+        return shape.points, record
+
+    def uses_bulk_coordinates(self):
+        return (getattr(self.opts['options'], 'bulk_coordinates', False) and
+                self.reader.shapeType in POLYLINE_SHAPE_TYPES
+               )
+
+    def shp_data(self):
+        #type() -> bytes / mmap
+        if self.mapped_shapefile is not None:
+            return self.mapped_shapefile.shp
+        self.reader.shp.seek(0)
+        return self.reader.shp.read()
+
+    def buffered_shape_records(self):
+        """ Reads the vertices of all the shapes in one pass, when first 
+            iterated over.  
+        """
+        coordinates = PolylineCoordinates(self.shp_data())
+        for i, record in izip(range(len(coordinates)), self.records()):
+            yield shp.ShapeRecord(shape = BufferedShape(coordinates, i)
+                                 ,record = record
+                                 )
+
+    def shape_records(self):
+        if self.uses_bulk_coordinates():
+            return self.buffered_shape_records()
+        return super(TmpFileDeletingShapeRecordsIterator, self).shape_records()
+
     def points_and_records(self, shapes_and_records):
         return [self.points_and_rec(shape, record) 
                 for shape, record in shapes_and_records]    
 
     def unpack_multi_shape_entry_repeat_rec_as_dict(self, multi_shape_record):
         shapes, rec = shape_and_rec_as_dict(multi_shape_record)
+        if isinstance(shapes, BufferedShape):
+            return ((points, rec) 
+                    for points in shapes.coordinates.parts_vertices(shapes.index)
+                   )
         points, _ = self.points_and_rec(shapes, rec)
-        parts = shapes.parts
+        parts = list(shapes.parts) + [len(points)] # include the last part
         return ((points[start:end], rec) for start, end in itertools.pairwise(parts))
 
     def setup_manglers(
@@ -944,8 +1636,8 @@ class TmpFileDeletingShapeRecordsIterator(TmpFileDeletingIterator):
                 raise ValueError(msg)
 
 
-    def __init__(self, reader, extra_manglers = None, opts = None):
-        #type(shp.Reader, dict, dict)
+    def __init__(self, reader, extra_manglers = None, opts = None, fields = None):
+        #type(shp.Reader, dict, dict, list)
 
         if opts is None:
             opts = dict(options = ShapeRecordsOptions)
@@ -955,15 +1647,20 @@ class TmpFileDeletingShapeRecordsIterator(TmpFileDeletingIterator):
                         ,copy_dicts = opts['options'].copy_dicts
                         )
 
-        super(TmpFileDeletingShapeRecordsIterator, self).__init__(reader, opts)
+        super(TmpFileDeletingShapeRecordsIterator, self).__init__(reader, opts, fields)
 
-        self.points_and_rec = self.points_and_rec_3D if self.is_3D_shape_type() else self.points_and_rec_2D
+        if self.uses_bulk_coordinates():
+            self.points_and_rec = self.points_and_rec_buffered
+        elif self.is_3D_shape_type():
+            self.points_and_rec = self.points_and_rec_3D
+        else:
+            self.points_and_rec = self.points_and_rec_2D
 
 
 
     def generator(self):
         return funcs.multi_item_unpacking_iterator(
-                                         items = self.reader.iterShapeRecords()
+                                         items = self.shape_records()
                                         ,is_single_item = is_single_shape
                                         ,manglers = self.manglers
                                         )
@@ -974,6 +1671,114 @@ class TmpFileDeletingShapeRecordsIterator(TmpFileDeletingIterator):
 
 
 
+def estimated_size(obj, sample = 8):
+    #type(type[any], int) -> int | None
+    """ A rough estimate of the memory (in bytes) used by obj, and by the 
+        containers, strings and numbers in it.  The size of the items in 
+        a large list, tuple or dict is extrapolated from its first 
+        sample items.  None if sys.getsizeof is not available.
+    """
+    getsizeof = getattr(sys, 'getsizeof', None)
+    if getsizeof is None:
+        return None
+    size = getsizeof(obj)
+    if isinstance(obj, Mapping):
+        num_items = len(obj)
+        items = list(itertools.islice(obj.items(), sample))
+        children = [x for item in items for x in item]
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        num_items = len(obj)
+        children = items = list(itertools.islice(obj, sample))
+    else:
+        return size
+    if not items:
+        return size
+    children_size = sum(estimated_size(child, sample) for child in children)
+    return size + children_size * num_items // len(items)
+
+
+# Options that change the values read from the same shapefile.
+CACHE_KEY_OPTIONS = ('encoding'
+                    ,'memory_map'
+                    ,'bulk_coordinates'
+                    )
+
+
+class ShapefileCache(object):
+    """ An in process, least recently used cache of values read from 
+        shapefiles.  
+        
+        Keys are the path, size and mtime of each of a shapefile's files 
+        (and any others, e.g. sDNA's names.csv), so a changed or deleted 
+        file is never read from the cache, and the options it was read 
+        with (e.g. its encoding).  The least recently used 
+        values are evicted when the total of their estimated sizes in 
+        memory exceeds max_bytes.
+    """
+    def __init__(self, max_bytes):
+        #type(int) -> None
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict() # key : (value, num_bytes)
+        self.total_bytes = 0
+
+    @staticmethod
+    def key(shp_file_path, other_paths = (), options = None):
+        #type(str, Iterable[str], type[any]) -> tuple
+        file_name_no_ext = os.path.splitext(shp_file_path)[0]
+        paths = [file_name_no_ext + ext for ext in ('.shp', '.shx', '.dbf')]
+        paths += list(other_paths)
+        file_stats = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                file_stats.append((path, None, None))
+            else:
+                file_stats.append((path, stat.st_size, stat.st_mtime))
+        settings = tuple(getattr(options, name, None) 
+                         for name in CACHE_KEY_OPTIONS
+                        )
+        return tuple(file_stats), settings
+
+    @staticmethod
+    def num_bytes(key, value):
+        #type(tuple, type[any]) -> int
+        """ The estimated size of value in memory, or if that cannot be 
+            estimated, the total size of the files in key.
+        """
+        num_bytes = estimated_size(value)
+        if num_bytes is None:
+            file_stats, __ = key
+            return sum(size for __, size, __ in file_stats if size)
+        return num_bytes
+
+    def get(self, key, default = None):
+        if key not in self.entries:
+            return default
+        value, num_bytes = self.entries.pop(key)
+        self.entries[key] = (value, num_bytes) # most recently used
+        return value
+
+    def evict(self, key):
+        __, num_bytes = self.entries.pop(key)
+        self.total_bytes -= num_bytes
+
+    def put(self, key, value):
+        if key in self.entries:
+            self.evict(key)
+        num_bytes = self.num_bytes(key, value)
+        if num_bytes > self.max_bytes:
+            return
+        self.entries[key] = (value, num_bytes)
+        self.total_bytes += num_bytes
+        while self.total_bytes > self.max_bytes:
+            self.evict(next(iter(self.entries))) # least recently used
+
+    def clear(self):
+        self.entries.clear()
+        self.total_bytes = 0
+
+
 class ShpOptions(ShapeRecordsOptions
                 ,GetFileNameOptions
                 ,WriteIterableToShpOptions
@@ -34,7 +34,19 @@ __version__ = '3.0.5'
 import sys
 import os
 import unittest
+import tempfile
+import shutil
+import json
+import time
+import threading
+import re
+import struct
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
 from time import asctime    
+from datetime import date
 from itertools import repeat, izip
 from collections import OrderedDict
 
@@ -48,6 +60,11 @@ from ...skel.tools.helpers import checkers
 
 from ... import data_cruncher
 from ... import gdm_from_GH_Datatree
+from ... import options_manager
+from ... import pyshp_wrapper
+from ...tools import sdna
+from ...tools.support import Read_Shp
+from ...tools import sdna_worker
 
 
 
@@ -139,10 +156,101 @@ class TestDataCruncher(unittest.TestCase):
         # special case interpolation points
 
     def test_class_bounds_at_max_deltas(self):
-        """ Even if correctly implemented, this is a poor classification method
-            anyway.  Low priority for testing.
+        """ Bounds are placed midway across the num_classes - 1 largest 
+            gaps (the lowest of equal gaps first), and gaps between 
+            repeated values are not used, so fewer classes may be returned.
         """
-        pass
+        f = data_cruncher.class_bounds_at_max_deltas
+        test_data = [#'expected' : 'input_'  
+                     ([], ([2,]*9, 7))
+                    ,([6.0, 15.5], ([0, 1, 2, 10, 11, 20], 3))
+                    ,([0.5, 1.5], ([0, 0, 1, 1, 2, 2], 7))
+                    ,([0.5, 3.5, 7.5], ([0, 1, 2, 5, 6, 9], 4))
+                    ]
+        for expected, input_ in test_data:
+            self.assertEqual(expected, f(*input_))
+
+    def test_fisher_jenks(self):
+        f = data_cruncher.fisher_jenks
+        test_data = [#'expected' : 'input_'  
+                     ([], ([2,]*9, 7))
+                    ,([6.0, 21.0], ([0, 1, 2, 10, 11, 12, 30, 31, 35], 3))
+                    ,([0.5, 1.5], ([0, 0, 1, 1, 2, 2], 7))
+                    ]
+        for expected, input_ in test_data:
+            self.assertEqual(expected, f(*input_))
+
+        class SamplingOptions(data_cruncher.FisherJenksOptions):
+            jenks_sample_size = 50
+        clusters = sorted(100 * (i % 4) + 0.01 * i for i in range(1000))
+        self.assertEqual(f(clusters, 4), f(clusters, 4, SamplingOptions))
+
+    def test_class_indices(self):
+        f = data_cruncher.class_indices
+        # Classes include their lower bound.
+        self.assertEqual([0, 0, 1, 1, 2, 3, 3]
+                        ,f([-5, 0.5, 1, 1.5, 2, 3, 9], [3, 1, 2])
+                        )
+        self.assertEqual([0, 0], f([4, 2], []))
+
+    def test_batch_splines_match_scalar_splines(self):
+        xs = [0, 0.3, 1, 2.5, 7, 9.99, 10]
+        test_data = [(data_cruncher.linearly_interpolate
+                     ,data_cruncher.linearly_interpolate_all
+                     ,(0, 'Not used', 10, 3, 303)
+                     )
+                    ,(data_cruncher.log_spline
+                     ,data_cruncher.log_spline_all
+                     ,(0, 7, 10, 3, 303)
+                     )
+                    ,(data_cruncher.exp_spline
+                     ,data_cruncher.exp_spline_all
+                     ,(0, 3, 10, -3, 30)
+                     )
+                    ,(data_cruncher.three_point_quad_spline
+                     ,data_cruncher.three_point_quad_spline_all
+                     ,(0, 4, 10, -35, 53, 21)
+                     )
+                    ]
+        class PurePythonOptions(object):
+            use_numpy = False
+
+        for scalar_spline, batch_spline, args in test_data:
+            expected = [scalar_spline(x, *args) for x in xs]
+            for options in (None, PurePythonOptions):
+                actual = batch_spline(xs, *args, options = options)
+                self.assertEqual(len(expected), len(actual))
+                for y_expected, y_actual in zip(expected, actual):
+                    self.assertAlmostEqual(y_expected, y_actual)
+
+    def test_colour_look_up_table(self):
+        rgb_min, rgb_mid, rgb_max = (0, 0, 125), (0, 155, 0), (155, 0, 0)
+        colours = data_cruncher.three_point_quad_spline_colours(
+                                    0, 10, rgb_min, rgb_mid, rgb_max, 5
+                                    )
+        self.assertEqual(5, len(colours))
+        self.assertEqual([rgb_min, rgb_mid, rgb_max], colours[::2])
+        for colour in colours:
+            self.assertTrue(all(0 <= channel <= 255 for channel in colour))
+        f = data_cruncher.look_up_table(colours, 0, 10)
+        self.assertEqual(colours[0], f(-3))
+        self.assertEqual(colours[0], f(1.2))
+        self.assertEqual(colours[1], f(1.3))
+        self.assertEqual(colours[2], f(5))
+        self.assertEqual(colours[4], f(99))
+
+    def test_evenly_spaced(self):
+        f = data_cruncher.evenly_spaced
+        self.assertEqual([0, 2.5, 5, 7.5, 10], f(0, 10, 5))
+        self.assertEqual([0, 10], f(0, 10, 2))
+        self.assertEqual([5], f(0, 10, 1))
+        self.assertRaises(ValueError, f, 0, 10, 0)
+        colours = data_cruncher.three_point_quad_spline_colours(
+                                    0, 10, (0, 0, 125), (0, 155, 0), (155, 0, 0), 1
+                                    )
+        self.assertEqual([(0, 155, 0)], colours)
+        f = data_cruncher.look_up_table(colours, 0, 10)
+        self.assertEqual(colours[0], f(10))
 
     def test_max_interval_lt_width_w_with_most_data_points(self):
         f = lambda *args : str(data_cruncher.max_interval_lt_width_w_with_most_data_points(*args))
@@ -173,6 +281,75 @@ class TestDataCruncher(unittest.TestCase):
                        ], 7))
                     ]
 
+    @unittest.skipIf(data_cruncher.np is None, 'NumPy is not installed. ')
+    def test_numpy_engine_matches_pure_Python(self):
+        class PurePythonOptions(data_cruncher.SpikeIsolatingQuantileOptions):
+            use_numpy = False
+        data = sorted([0,0] + [1]*9 + [2]*9 + [0.1*(i % 37) for i in range(500)])
+        for f in (data_cruncher.spike_isolating_quantile
+                 ,data_cruncher.quantile_l_to_r
+                 ):
+            for num_classes in (2, 5, 7):
+                self.assertEqual(f(data, num_classes, options = PurePythonOptions)
+                                ,f(data, num_classes)
+                                )
+
+    def test_classifiers_accept_dict_values(self):
+        # As called by Parse_Data.DataParser, with a dict's values.
+        data = sorted([0,0] + [1]*9 + [2]*9 + [0.1*(i % 37) for i in range(500)])
+        values = dict(enumerate(data)).values()
+        for f in (data_cruncher.spike_isolating_quantile
+                 ,data_cruncher.quantile_l_to_r
+                 ,data_cruncher.class_bounds_at_max_deltas
+                 ,data_cruncher.fisher_jenks
+                 ):
+            self.assertEqual(f(data, 5), f(values, 5))
+
+class TestOptionsManager(unittest.TestCase):
+
+    class Options(object):
+        pass
+    for i in range(60):
+        setattr(Options, 'field_%s' % i, float(i))
+    del i
+
+    def setUp(self):
+        self.namedtuple_classes = options_manager.namedtuple_classes.copy()
+
+    def tearDown(self):
+        options_manager.namedtuple_classes.clear()
+        options_manager.namedtuple_classes.update(self.namedtuple_classes)
+
+    def test_namedtuple_classes_reused(self):
+        nt = options_manager.namedtuple_from_class(self.Options, 'Options')
+        self.assertIs(nt.__class__
+                     ,options_manager.namedtuple_from_class(self.Options
+                                                           ,'Options'
+                                                           ).__class__
+                     )
+        overridden = options_manager.override_namedtuple_with_dict(
+                                                             nt
+                                                            ,{'field_1' : 2.0}
+                                                            ,check_types = True
+                                                            )
+        self.assertIs(overridden.__class__, nt.__class__)
+        self.assertEqual(overridden.field_1, 2.0)
+
+    def test_registry_remade_after_clearing(self):
+        options_manager.namedtuple_classes.clear()
+        nt = options_manager.namedtuple_from_class(self.Options, 'Options')
+        self.assertEqual([nt.__class__]
+                        ,list(options_manager.namedtuple_classes.values())
+                        )
+        overridden = options_manager.override_namedtuple_with_dict(
+                                              nt
+                                             ,{'field_1' : 2.0, 'field_7' : 3.0}
+                                             ,check_types = True
+                                             )
+        self.assertIs(overridden.__class__, nt.__class__)
+        self.assertEqual(1, len(options_manager.namedtuple_classes))
+
+
 GDM = gdm_from_GH_Datatree.GeomDataMapping
 
 class TestCreateGeomDataMapping(unittest.TestCase):
@@ -271,3 +448,685 @@ def test_empty_DataTree(self):
 #if GH_env_exists:
 TestCreateGeomDataMapping.test_empty_DataTree = test_empty_DataTree
 
+
+class TestColumnarGeomDataMapping(unittest.TestCase):
+
+    keys_and_vals = [('a', OrderedDict([('id', 1), ('x', 0.5), ('name', 'p')]))
+                    ,('b', OrderedDict([('id', 2), ('x', 1.5), ('name', 'q')]))
+                    ,('c', OrderedDict([('id', 3), ('x', 2.5)]))
+                    ,((), [4, 5])
+                    ]
+
+    def setUp(self):
+        self.gdm = GDM((key, val.copy()) for key, val in self.keys_and_vals)
+        self.columnar = gdm_from_GH_Datatree.ColumnarGeomDataMapping(
+                                                            self.keys_and_vals)
+
+    def test_same_as_GeomDataMapping(self):
+        self.assertEqual(self.gdm, self.columnar)
+        self.assertEqual(self.gdm.keys(), self.columnar.keys())
+        self.assertIsInstance(self.columnar['a'], dict)
+
+    def test_changes_to_rows(self):
+        for gdm in (self.gdm, self.columnar):
+            gdm['a']['x'] = 'not a float'
+            gdm['c'].update(name = 'r')
+            del gdm['b']
+            gdm_from_GH_Datatree.override_gdm(gdm, {'d' : {'id' : 6}})
+        self.assertEqual(self.gdm, self.columnar)
+
+    def test_column(self):
+        self.columnar.pop(())
+        self.assertEqual(self.columnar.column('x'), [0.5, 1.5, 2.5])
+        self.assertRaises(KeyError, self.columnar.column, 'name')
+
+    def test_dict_storage_has_the_keys(self):
+        columnar = gdm_from_GH_Datatree.ColumnarGeomDataMapping(
+                                   [('a', OrderedDict(x = 1))])
+        columnar.update({'b' : OrderedDict(x = 2)})
+        self.assertEqual({'a' : {'x' : 1}, 'b' : {'x' : 2}}
+                        ,json.loads(json.dumps(columnar))
+                        )
+        self.assertEqual({'a' : {'x' : 1}, 'b' : {'x' : 2}}, dict(columnar))
+        if hasattr(columnar, 'move_to_end'):
+            columnar.move_to_end('a')
+            self.assertEqual(['b', 'a'], columnar.keys())
+            self.assertEqual([2, 1], columnar.column('x'))
+
+    def test_many_deletions(self):
+        columnar = gdm_from_GH_Datatree.ColumnarGeomDataMapping(
+                               (i, OrderedDict([('x', 0.5 * i), ('name', str(i))]))
+                               for i in range(100)
+                              )
+        for i in range(0, 100, 3):
+            del columnar[i]
+        while len(columnar) > 10:
+            columnar.popitem(last = False)
+        remaining = [i for i in range(100) if i % 3][-10:]
+        self.assertEqual(remaining, columnar.keys())
+        self.assertEqual([0.5 * i for i in remaining], columnar.column('x'))
+        self.assertEqual(OrderedDict([('x', 49.0), ('name', '98')]), columnar[98])
+        columnar[100] = OrderedDict(x = 50.0)
+        self.assertEqual(remaining + [100], columnar.keys())
+        self.assertRaises(KeyError, columnar.column, 'name')
+
+
+class FieldsSetRecordingDict(OrderedDict):
+    """ Records each field set on it, after it is made. """
+
+    def __init__(self, *args, **kwargs):
+        super(FieldsSetRecordingDict, self).__init__(*args, **kwargs)
+        self.fields_set = []
+
+    def __setitem__(self, field, val, *args):
+        if hasattr(self, 'fields_set'):
+            self.fields_set.append(field)
+        super(FieldsSetRecordingDict, self).__setitem__(field, val, *args)
+
+    def update(self, *args, **kwargs):
+        for field, val in OrderedDict(*args, **kwargs).items():
+            self[field] = val
+
+
+class TestOverrideGdm(unittest.TestCase):
+
+    def setUp(self):
+        self.lesser = GDM([('a', OrderedDict(x = 1)), ('b', OrderedDict(x = 2))])
+        self.override = GDM([('a', OrderedDict(y = 3))])
+        gdm_from_GH_Datatree.override_gdm(self.lesser, self.override)
+
+    def test_unchanged_override_not_merged_again(self):
+        self.lesser['a'] = FieldsSetRecordingDict(self.lesser['a'])
+        gdm_from_GH_Datatree.override_gdm(self.lesser, self.override.copy())
+        self.assertEqual(self.lesser['a'].fields_set, [])
+        self.assertEqual(self.lesser['a'], OrderedDict([('x', 1), ('y', 3)]))
+
+    def test_changed_entries_merged(self):
+        override = GDM([('a', OrderedDict(y = 4)), ('c', OrderedDict(z = 5))])
+        gdm_from_GH_Datatree.override_gdm(self.lesser, override)
+        self.assertEqual(self.lesser['a'], OrderedDict([('x', 1), ('y', 4)]))
+        self.assertEqual(self.lesser['c'], OrderedDict(z = 5))
+
+    def test_changed_lesser_fully_merged(self):
+        self.lesser['a'] = OrderedDict(x = 6)
+        gdm_from_GH_Datatree.override_gdm(self.lesser, self.override)
+        self.assertEqual(self.lesser['a'], OrderedDict([('x', 6), ('y', 3)]))
+
+    def test_changes_in_place_to_lesser_undone(self):
+        self.lesser['a']['y'] = 7
+        gdm_from_GH_Datatree.override_gdm(self.lesser, self.override)
+        self.assertEqual(self.lesser['a'], OrderedDict([('x', 1), ('y', 3)]))
+
+    def test_changes_in_place_to_columns_undone(self):
+        gdm = gdm_from_GH_Datatree.ColumnarGeomDataMapping(self.lesser.items())
+        gdm_from_GH_Datatree.override_gdm(gdm, self.override)
+        self.assertEqual(gdm['a'], OrderedDict([('x', 1), ('y', 3)]))
+        gdm['a']['y'] = 7
+        gdm_from_GH_Datatree.override_gdm(gdm, self.override)
+        self.assertEqual(gdm['a'], OrderedDict([('x', 1), ('y', 3)]))
+
+    def test_row_view_changes_written_to_columns(self):
+        gdm = gdm_from_GH_Datatree.ColumnarGeomDataMapping(self.lesser.items())
+        gdm['a']['x'] = 8
+        self.assertEqual(gdm['a']['x'], 8)
+        self.assertEqual(list(gdm.column('x')), [8, 2])
+
+
+class TestFieldInfo(unittest.TestCase):
+
+    def test_small_floats_fit_field(self):
+        fields = OrderedDict()
+        values = ['0.5', '2.5e-05', '1.25e-06', '123.25', '-7.5'] # keep_floats
+        for value in values:
+            pyshp_wrapper.ensure_correct(fields, 'x', value, float)
+        field_info = fields['x']
+        self.assertEqual(8, field_info.decimal)
+        for value in values:
+            # As written by shapefile.Writer
+            written = format(float(value), '.%sf' % field_info.decimal)
+            self.assertLessEqual(len(written), field_info.size_req)
+            self.assertEqual(float(value), float(written))
+
+
+class TestWriteIterableToShp(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.items = OrderedDict((i, OrderedDict([('x', 0.5 * i), ('name', 'n%s' % i)]))
+                                 for i in range(5)
+                                )
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write(self, f_name = 'test.shp', **kwargs):
+        items = self.items
+        kwargs.setdefault('options', pyshp_wrapper.ShpOptions)
+        return pyshp_wrapper.write_iterable_to_shp(
+                     my_iterable = items
+                    ,shp_file_path = os.path.join(self.dir, f_name)
+                    ,is_shape = lambda shape, shape_code: True
+                    ,shape_mangler = lambda i: [[[0, i, 0], [1, i, 0]]]
+                    ,shape_IDer = str
+                    ,key_finder = lambda i: items[i].keys()
+                    ,key_matcher = lambda key: re.match(r'(?P<name>.*)', key)
+                    ,value_demangler = lambda i, key: items[i][key]
+                    ,shape_code = 'POLYLINEZ'
+                    ,**kwargs
+                    )
+
+    def test_streamed_attribute_tables(self):
+        __, __, fields, attribute_tables = self.write()
+        self.assertEqual(['0.0', '0.5', '1.0', '1.5', '2.0']
+                        ,[values['x'] for values in attribute_tables.values()]
+                        )
+        __, __, fields, attribute_tables = self.write(field_names = fields)
+        self.assertIsNone(attribute_tables)
+
+    def test_unchanged_shp_reused(self):
+        options = pyshp_wrapper.ShpOptions
+        f_name = os.path.join(self.dir, 'test.shp')
+        def digest():
+            return pyshp_wrapper.shp_digest(((str(i), [[[0, i, 0], [1, i, 0]]], list(values.items()))
+                                             for i, values in self.items.items()
+                                            )
+                                           ,options
+                                           )
+        self.assertIsNone(pyshp_wrapper.find_unchanged_shp(f_name, digest(), options))
+        __, written, __, __ = self.write()
+        pyshp_wrapper.write_shp_digest(written, digest())
+        mtime = os.path.getmtime(written)
+
+        self.assertEqual(written, pyshp_wrapper.find_unchanged_shp(f_name, digest(), options))
+        self.assertEqual(mtime, os.path.getmtime(written))
+
+        self.items[0]['x'] = 7
+        self.assertIsNone(pyshp_wrapper.find_unchanged_shp(f_name, digest(), options))
+
+
+TEST_FIELDS = [('id', 'N', 5, 0)
+              ,('length', 'N', 12, 3)
+              ,('name', 'C', 10, 0)
+              ,('date', 'D', 8, 0)
+              ,('flag', 'L', 1, 0)
+              ]
+TEST_RECORDS = [[1, 12.5, 'abc', date(2021, 3, 4), True]
+               ,[2, None, u'\xdf\xe9\u20ac', None, None] # NULLs and non-ASCII
+               ,[3, -0.125, '', date(1999, 12, 31), False]
+               ,[None, 1000.0, 'x y', None, True]
+               ]
+TEST_SHAPES = [[[[0, 0, 0], [1, 1, 1]]]
+              ,[[[2, 2, 2], [3, 3, 3]], [[4, 4, 4], [5, 5, 6], [7, 8, 9]]] # multi part
+              ,None # null shape
+              ,[[[-1.5, 2.25, 0.5], [10, 20, 30]]]
+              ]
+
+
+class ShapefileTestCase(unittest.TestCase):
+    """ Writes TEST_RECORDS and TEST_SHAPES to a shapefile with pyshp, 
+        to compare what pyshp_wrapper reads from it with shapefile.Reader.
+    """
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write(self, f_name = 'test.shp', shape_type = 'POLYLINEZ', deleted = ()):
+        path = os.path.join(self.dir, f_name)
+        with pyshp_wrapper.shp.Writer(path
+                                     ,getattr(pyshp_wrapper.shp, shape_type)
+                                     ,encoding = 'utf-8'
+                                     ) as w:
+            for field in TEST_FIELDS:
+                w.field(*field)
+            for record, shape in zip(TEST_RECORDS, TEST_SHAPES):
+                if shape is None:
+                    w.null()
+                elif shape_type == 'POLYLINEZ':
+                    w.linez(shape)
+                else:
+                    w.line([[point[:2] for point in part] for part in shape])
+                w.record(*record)
+        if deleted:
+            with open(os.path.splitext(path)[0] + '.dbf', 'r+b') as f:
+                header_length, record_length = struct.unpack('<8xHH', f.read(12))
+                for i in deleted:
+                    f.seek(header_length + i * record_length)
+                    f.write(b'*')
+        return path
+
+
+class TestProjectedDbfRecords(ShapefileTestCase):
+
+    def projected_and_pyshp_records(self, field_names, **kwargs):
+        with pyshp_wrapper.shp.Reader(self.write(**kwargs), encoding = 'utf-8') as r:
+            projected = list(pyshp_wrapper.ProjectedDbfRecords(r, field_names))
+            expected = [OrderedDict((name, value) 
+                                    for name, value in record.as_dict().items()
+                                    if name in field_names
+                                   )
+                        for record in r.iterRecords()
+                       ]
+        return projected, expected
+
+    def test_all_fields_match_pyshp(self):
+        projected, expected = self.projected_and_pyshp_records([field[0] for field in TEST_FIELDS])
+        self.assertEqual(len(TEST_RECORDS), len(projected))
+        self.assertEqual(expected, projected)
+        self.assertEqual(u'\xdf\xe9\u20ac', projected[1]['name'])
+        self.assertIsNone(projected[1]['length'])
+
+    def test_projected_fields(self):
+        projected, expected = self.projected_and_pyshp_records(['name', 'length', 'missing'])
+        self.assertEqual(expected, projected)
+        self.assertEqual({'name', 'length'}, set(projected[0]))
+
+    def test_deleted_records_skipped(self):
+        projected, expected = self.projected_and_pyshp_records(['id'], deleted = (1,))
+        self.assertEqual([{'id' : 1}, {'id' : 3}, {'id' : None}], projected)
+        self.assertEqual(expected, projected)
+
+
+@unittest.skipIf(pyshp_wrapper.mmap is None, 'mmap not available')
+class TestMappedShapefile(ShapefileTestCase):
+
+    def pyshp_column(self, path, name):
+        with pyshp_wrapper.shp.Reader(path, encoding = 'utf-8') as r:
+            return [record.as_dict()[name] for record in r.iterRecords()]
+
+    def assertNumbersEqual(self, expected, actual):
+        self.assertEqual(len(expected), len(actual))
+        for x, y in zip(expected, actual):
+            if x is None:
+                self.assertNotEqual(y, y) # nan
+            else:
+                self.assertEqual(x, y)
+
+    def check_numeric_columns(self, use_numpy):
+        path = self.write(deleted = (2,))
+        with pyshp_wrapper.MappedShapefile(path) as shapefile:
+            for name in ('id', 'length'):
+                column = shapefile.column(name, use_numpy = use_numpy)
+                if not use_numpy:
+                    self.assertIsInstance(column, pyshp_wrapper.array)
+                self.assertNumbersEqual(self.pyshp_column(path, name), list(column))
+                del column
+
+    def test_numeric_columns_without_numpy(self):
+        self.check_numeric_columns(use_numpy = False)
+
+    @unittest.skipIf(pyshp_wrapper.np is None, 'NumPy not available')
+    def test_numeric_columns_with_numpy(self):
+        self.check_numeric_columns(use_numpy = True)
+
+    def test_other_columns(self):
+        path = self.write(deleted = (0,))
+        with pyshp_wrapper.MappedShapefile(path) as shapefile:
+            for name in ('name', 'date', 'flag'):
+                self.assertEqual(self.pyshp_column(path, name), shapefile.column(name))
+            self.assertRaises(KeyError, shapefile.column, 'missing')
+
+    def test_raw_column_skips_deleted_records(self):
+        path = self.write(deleted = (1, 3))
+        with pyshp_wrapper.MappedShapefile(path) as shapefile:
+            self.assertEqual(4, len(shapefile))
+            self.assertEqual([True, False, True, False], shapefile.not_deleted())
+            self.assertEqual([b'1', b'3']
+                            ,[value.strip() for value in shapefile.raw_column('id')]
+                            )
+
+    def test_files_deletable_after_close(self):
+        path = self.write()
+        shapefile = pyshp_wrapper.MappedShapefile(path)
+        shapefile.column('length')
+        view = shapefile.record_view(0)
+        self.assertEqual(b' ', bytes(view[:1]))
+        del view
+        shapefile.close()
+        self.assertEqual([], shapefile.maps)
+        for ext in pyshp_wrapper.MappedShapefile.exts:
+            os.remove(os.path.splitext(path)[0] + ext)
+
+
+class TestPolylineCoordinates(ShapefileTestCase):
+
+    def check_vertices_match_pyshp(self, shape_type):
+        path = self.write(shape_type = shape_type)
+        with open(path, 'rb') as f:
+            coordinates = pyshp_wrapper.PolylineCoordinates(f.read())
+        self.assertEqual(shape_type == 'POLYLINEZ', coordinates.has_z)
+        with pyshp_wrapper.shp.Reader(path) as r:
+            shapes = list(r.iterShapes())
+        self.assertEqual(len(shapes), len(coordinates))
+        for i, shape in enumerate(shapes):
+            if coordinates.has_z:
+                expected = [(x, y, z) for (x, y), z in zip(shape.points, getattr(shape, 'z', []))]
+            else:
+                expected = [tuple(point) for point in shape.points]
+            self.assertEqual(expected, coordinates.shape_vertices(i))
+            self.assertEqual(expected, pyshp_wrapper.BufferedShape(coordinates, i).points)
+
+            parts = list(getattr(shape, 'parts', [])) + [len(expected)]
+            self.assertEqual([expected[start:end] for start, end in zip(parts, parts[1:])]
+                            ,list(coordinates.parts_vertices(i))
+                            )
+
+    def test_3D_vertices_match_pyshp(self):
+        self.check_vertices_match_pyshp('POLYLINEZ')
+
+    def test_2D_vertices_match_pyshp(self):
+        self.check_vertices_match_pyshp('POLYLINE')
+
+    def test_multi_part_shape(self):
+        with open(self.write(), 'rb') as f:
+            coordinates = pyshp_wrapper.PolylineCoordinates(f.read())
+        self.assertEqual([[(2, 2, 2), (3, 3, 3)], [(4, 4, 4), (5, 5, 6), (7, 8, 9)]]
+                        ,list(coordinates.parts_vertices(1))
+                        )
+        self.assertEqual([], coordinates.shape_vertices(2)) # null shape
+
+
+class TestShapefileCache(unittest.TestCase):
+
+    def setUp(self):
+        self.value = lambda: {'records' : [{'x' : float(i)} for i in range(10)]}
+        self.keys = [((('%s.shp' % name, 100, 0),), ()) for name in 'abcd']
+        self.size = pyshp_wrapper.ShapefileCache.num_bytes(self.keys[0], self.value())
+        self.cache = pyshp_wrapper.ShapefileCache(max_bytes = 3 * self.size)
+
+    def test_least_recently_used_evicted(self):
+        a, b, c, d = self.keys
+        for key in (a, b, c):
+            self.cache.put(key, self.value())
+        self.assertEqual(3 * self.size, self.cache.total_bytes)
+        self.assertIsNotNone(self.cache.get(a))
+        self.cache.put(d, self.value())
+        self.assertIsNone(self.cache.get(b))
+        for key in (a, c, d):
+            self.assertIsNotNone(self.cache.get(key))
+        self.assertEqual(3 * self.size, self.cache.total_bytes)
+
+    def test_too_big_not_cached(self):
+        a = self.keys[0]
+        big = {'records' : [{'x' : float(i)} for i in range(100)]}
+        self.cache.put(a, big)
+        self.assertIsNone(self.cache.get(a))
+        self.assertEqual(0, self.cache.total_bytes)
+
+    def test_put_again_replaces(self):
+        a = self.keys[0]
+        self.cache.put(a, self.value())
+        self.cache.put(a, self.value())
+        self.assertEqual(self.size, self.cache.total_bytes)
+
+    def test_key_changes_with_encoding(self):
+        dir_ = tempfile.mkdtemp()
+        try:
+            f_name = os.path.join(dir_, 'test.shp')
+            with open(f_name, 'w') as f:
+                f.write('x')
+            class Latin1Options(pyshp_wrapper.ShapeRecordsOptions):
+                encoding = 'latin-1'
+            key = pyshp_wrapper.ShapefileCache.key
+            self.assertEqual(key(f_name, options = pyshp_wrapper.ShapeRecordsOptions)
+                            ,key(f_name, options = pyshp_wrapper.ShapeRecordsOptions)
+                            )
+            self.assertNotEqual(key(f_name, options = pyshp_wrapper.ShapeRecordsOptions)
+                               ,key(f_name, options = Latin1Options)
+                               )
+        finally:
+            shutil.rmtree(dir_)
+
+    def test_temporary_files_not_cached(self):
+        class Options(pyshp_wrapper.ShpOptions):
+            overwrite_shp = False
+            OUTPUT_FILE_DELETER = pyshp_wrapper.ShapeFilesDeleter('output.shp')
+        class StrictNoDelOptions(Options):
+            strict_no_del = True
+        self.assertTrue(pyshp_wrapper.deleted_after_read('output.shp', Options))
+        self.assertFalse(pyshp_wrapper.deleted_after_read('other.shp', Options))
+        self.assertFalse(pyshp_wrapper.deleted_after_read('output.shp', StrictNoDelOptions))
+
+    @unittest.skipIf(not hasattr(sys, 'getsizeof'), 'sys.getsizeof not available')
+    def test_estimated_size_of_decoded_values(self):
+        points = [(float(i), 2.0, 3.0) for i in range(1000)]
+        expected = (sys.getsizeof(points) 
+                   +1000 * (sys.getsizeof(points[0]) + 3 * sys.getsizeof(1.0))
+                   )
+        self.assertEqual(expected, pyshp_wrapper.estimated_size(points))
+        # More than the 24 bytes per vertex in a .shp file
+        self.assertGreater(pyshp_wrapper.estimated_size(points), 24 * len(points))
+
+
+class Key(object):
+    """ Like a Rhino object's Guid, that Write_Shp writes as a str. """
+
+    def __init__(self, uuid):
+        self.uuid = uuid
+
+    def __str__(self):
+        return self.uuid
+
+
+class TestJoinRecordsToKeys(unittest.TestCase):
+
+    def setUp(self):
+        self.keys = [Key(uuid) for uuid in ('a', 'b', 'c')]
+
+    def join(self, uuids, keys = None):
+        records = [{'Rhino3D_' : uuid, 'i' : i} for i, uuid in enumerate(uuids)]
+        self.records = iter(records)
+        return [(key, record['i']) 
+                for key, record in Read_Shp.join_records_to_keys(
+                                                 self.keys if keys is None else keys
+                                                ,self.records
+                                                ,'Rhino3D_'
+                                                )
+               ]
+
+    def test_in_order(self):
+        a, b, c = self.keys
+        self.assertEqual([(a, 0), (b, 1), (c, 2)], self.join(['a', 'b', 'c']))
+
+    def test_reordered(self):
+        a, b, c = self.keys
+        self.assertEqual([(a, 0), (c, 1), (b, 2)], self.join(['a', 'c', 'b']))
+
+    def test_unmatched_skipped(self):
+        a, b, c = self.keys
+        self.assertEqual([(a, 0), (c, 2), (b, 3)], self.join(['a', 'z', 'c', 'b']))
+        self.assertEqual([], list(self.records)) # all records were read
+
+    def test_keys_duplicated_as_strings_paired_by_position(self):
+        keys = [Key('a'), Key('a'), Key('b')]
+        self.assertEqual([(keys[0], 0), (keys[1], 1), (keys[2], 2), (None, 3)]
+                        ,self.join(['a', 'b', 'a', 'c'], keys = keys)
+                        )
+
+
+DUMMY_SDNA_SCRIPT = """
+import sys
+import time
+print('argv == %s' % sys.argv[1:])
+if 'progress' in sys.argv[2:]:
+    print('Progress: 50%')
+    print('Progress: 100.0%')
+if 'sleep' in sys.argv[2:]:
+    time.sleep(30)
+sys.exit(int(sys.argv[1]))
+"""
+
+
+class FakeWorkerProcess(object):
+
+    def __init__(self, output):
+        self.stdin = StringIO()
+        self.stdout = StringIO(output)
+        self.killed = False
+
+    def poll(self):
+        return 1 if self.killed else None
+
+    def kill(self):
+        self.killed = True
+
+    def wait(self):
+        return self.poll()
+
+
+class TestsDNAWorker(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.script = os.path.join(self.dir, 'dummy_sdna_script.py')
+        with open(self.script, 'w') as f:
+            f.write(DUMMY_SDNA_SCRIPT)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_json_lines_protocol(self):
+        jobs = ''.join(json.dumps(dict(script = self.script, argv = argv)) + '\n'
+                       for argv in (['0'], ['3', 'x'])
+                      )
+        # In the worker process, the scripts' stdout is the worker's.
+        stdout, sys_stdout, sys_stderr = StringIO(), sys.stdout, sys.stderr
+        sys.stdout = stdout
+        try:
+            sdna_worker.main(StringIO(jobs), stdout)
+        finally:
+            sys.stdout, sys.stderr = sys_stdout, sys_stderr
+        self.assertEqual(stdout.getvalue().splitlines()
+                        ,["argv == ['0']"
+                         ,sdna_worker.JOB_DONE + '0'
+                         ,"argv == ['3', 'x']"
+                         ,sdna_worker.JOB_DONE + '3'
+                         ]
+                        )
+
+    def test_worker_killed_on_error(self):
+        worker = object.__new__(sdna.sDNAWorker)
+        worker.python, worker.logger = 'dummy_python', sdna.logger
+        worker.process = FakeWorkerProcess('output\n%s0\n' % sdna_worker.JOB_DONE)
+        sdna.sDNA_workers[worker.python] = worker
+
+        def on_line(line):
+            raise ValueError(line)
+
+        self.assertRaises(ValueError, worker, self.script, [], on_line = on_line)
+        self.assertTrue(worker.process.killed)
+        self.assertNotIn(worker.python, sdna.sDNA_workers)
+
+
+class UnreadableStream(object):
+
+    def __init__(self, lines):
+        self.lines = list(lines)
+
+    def readline(self):
+        if not self.lines:
+            raise UnicodeDecodeError('utf-8', b'\xff', 0, 1, 'invalid start byte')
+        return self.lines.pop(0)
+
+
+class ProgressTool(sdna.sDNA_ToolWrapper):
+
+    def __init__(self):
+        # Doesn't load sDNA.
+        self.logger = sdna.logger
+        self.cancel_event = threading.Event()
+        self.component = None
+
+
+class TestRunCommandsInParallel(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        script = os.path.join(self.dir, 'dummy_sdna_script.py')
+        with open(script, 'w') as f:
+            f.write(DUMMY_SDNA_SCRIPT)
+        opts = dict(options = options_manager.namedtuple_from_class(sdna.PythonOptions))
+        sdna.check_python(opts)
+        self.command = lambda *args: [opts['options'].python, '-u', script] + list(args)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_read_lines_reraises_read_errors(self):
+        lines = []
+        def read_all():
+            for line in sdna.read_lines(UnreadableStream(['a\n', 'b\n'])):
+                lines.append(line)
+        self.assertRaises(UnicodeDecodeError, read_all)
+        self.assertEqual(['a\n', 'b\n'], lines)
+
+    def test_run_command_kills_process_on_error(self):
+        def on_line(line):
+            raise ValueError(line)
+        start = time.time()
+        self.assertRaises(ValueError
+                         ,sdna.run_command
+                         ,self.command('0', 'sleep')
+                         ,on_line = on_line
+                         )
+        self.assertLess(time.time() - start, 20)
+
+    def test_progress_hook(self):
+        tool = ProgressTool()
+        percentages = []
+        tool.on_progress = percentages.append
+        retcode, __ = sdna.run_command(self.command('0', 'progress')
+                                      ,on_line = tool.log_sDNA_output
+                                      )
+        self.assertEqual(0, retcode)
+        self.assertEqual([50.0, 100.0], percentages)
+
+    def test_progress_hook_cancels(self):
+        tool = ProgressTool()
+        tool.on_progress = lambda percentage: tool.cancel()
+        start = time.time()
+        self.assertRaises(sdna.sDNACancelledError
+                         ,sdna.run_command
+                         ,self.command('0', 'progress', 'sleep')
+                         ,on_line = tool.log_sDNA_output
+                         ,cancel = tool.cancel_event
+                         )
+        self.assertLess(time.time() - start, 20)
+
+    def test_results_in_order(self):
+        done = []
+        results = sdna.run_commands_in_parallel([self.command('2')
+                                                ,self.command('0')
+                                                ,self.command('1')
+                                                ]
+                                               ,max_processes = 2
+                                               ,on_done = lambda i, *args: done.append(i)
+                                               )
+        self.assertEqual([2, 0, 1], [retcode for retcode, __, __ in results])
+        self.assertIn("argv == ['0']", results[1][1])
+        self.assertEqual([0, 1, 2], sorted(done))
+
+    def test_timeout(self):
+        start = time.time()
+        results = sdna.run_commands_in_parallel([self.command('0', 'sleep')
+                                                ,self.command('0')
+                                                ]
+                                               ,timeout = 2
+                                               )
+        self.assertEqual([None, 0], [retcode for retcode, __, __ in results])
+        self.assertLess(time.time() - start, 20)
+
+    def test_cancel(self):
+        cancel = threading.Event()
+        timer = threading.Timer(1, cancel.set)
+        timer.start()
+        start = time.time()
+        self.assertRaises(sdna.sDNACancelledError
+                         ,sdna.run_commands_in_parallel
+                         ,[self.command('0', 'sleep')] * 3
+                         ,max_processes = 1
+                         ,cancel = cancel
+                         )
+        self.assertLess(time.time() - start, 20)
@@ -227,7 +227,7 @@ class ConfigManager(sDNA_GH_Tool):
         check_python(opts)
         import_sDNA(opts)
 
-        self.logger.debug('options == %s ' % (opts['options'],))
+        self.logger.debug('options == %s ', opts['options'])
 
         # self.logger.debug('opts == %s' % '\n\n'.join(str(item) 
         #                                      for item in opts.items()
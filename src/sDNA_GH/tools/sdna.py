@@ -45,8 +45,18 @@ import subprocess
 import re
 import glob
 import warnings
+import shlex
+import json
+import threading
+import time
 
+try:
+    import queue
+except ImportError:
+    import Queue as queue # Python 2
 
+import rhinoscriptsyntax as rs
+import Grasshopper
 from Grasshopper.Kernel.Parameters import (Param_Arc
                                           ,Param_Colour  
                                           ,Param_Curve
@@ -71,6 +81,7 @@ from .. import options_manager
 from .. import pyshp_wrapper
 from .. import logging_wrapper
 from .. import launcher
+from . import sdna_worker
 
 
 itertools = funcs.itertools #contains pairwise recipe if Python < 3.10
@@ -333,7 +344,7 @@ def sDNA_key(opts):
 def nested_set_default_or_get(d, keys, last_default = None):
     #type(dict, Sequence(Hashable), type[any])
     
-    logger.debug('d == %s' % d)
+    logger.debug('d == %s', d)
 
     keys = list(keys)
     last_key = keys.pop()
@@ -346,7 +357,7 @@ def nested_set_default_or_get(d, keys, last_default = None):
     else:
         d = d.setdefault(last_key, last_default)
 
-    logger.debug('before return, d == %s' % (d,))
+    logger.debug('before return, d == %s', d)
 
     return d
 
@@ -529,12 +540,12 @@ def categorise_keys(d
             #logger.debug('key == %s is a node' % key)
             if is_data_key(key, **kwargs):
                 data_node_keys.append(key)
-                logger.debug('key == %s is a data_node' % key)
+                logger.debug('key == %s is a data_node', key)
             else:
                 sub_dict_keys.append(key)
-                logger.debug('key == %s is a sub_dict' % key)
+                logger.debug('key == %s is a sub_dict', key)
         else: 
-            logger.debug('key == %s is a data field' % key)
+            logger.debug('key == %s is a data field', key)
             data_field_keys.append(key)
 
     return sub_dict_keys, data_node_keys, data_field_keys
@@ -584,22 +595,22 @@ def update_opts(current_opts
     """
 
 
-    logger.debug('depth == %s' % depth)
+    logger.debug('depth == %s', depth)
     if not isinstance(current_opts, dict) or not isinstance(override, dict):
         msg = ('opts and override both need to be dictionaries. '
               +'depth == %s' % depth
               )
         logger.error(msg)
         raise TypeError(msg)
-    logger.debug('current_opts.keys() == %s ' % current_opts.keys())
-    logger.debug('override.keys() == %s ' % override.keys())
+    logger.debug('current_opts.keys() == %s ', current_opts.keys())
+    logger.debug('override.keys() == %s ', override.keys())
 
     if not kwargs:
         kwargs = {}
     metas = kwargs.setdefault('metas', current_opts.get('metas', DEFAULT_METAS_NT))
     if 'add_new_opts' in kwargs:
         metas = metas._replace(add_new_opts = kwargs['add_new_opts'])
-    logger.debug('metas == %s' % (metas,))
+    logger.debug('metas == %s', metas)
                 #,strict 
                 #,check_types
                 #,add_new_opts, for update_data_node and make_new_data_node
@@ -613,9 +624,9 @@ def update_opts(current_opts
                                                                      ,**kwargs
                                                                      )
 
-    logger.debug('sub_dicts_keys == %s' % sub_dicts_keys)
-    logger.debug('data_node_keys == %s' % data_node_keys)
-    logger.debug('data_field_keys == %s' % data_field_keys)
+    logger.debug('sub_dicts_keys == %s', sub_dicts_keys)
+    logger.debug('data_node_keys == %s', data_node_keys)
+    logger.debug('data_field_keys == %s', data_field_keys)
 
     current_data_node_keys = []
     if not sub_dicts_keys:  
@@ -655,14 +666,14 @@ def update_opts(current_opts
                    ,**kwargs
                    )
 
-    logger.debug('depth == %s' % depth)
+    logger.debug('depth == %s', depth)
 
     for key in data_node_keys + current_data_node_keys:
         override_data = override_data_fields.copy()
 
-        logger.debug('override_data == %s' % override_data)
-        logger.debug('key == %s' % key)
-        logger.debug('current_opts.keys() == %s' % current_opts.keys())
+        logger.debug('override_data == %s', override_data)
+        logger.debug('key == %s', key)
+        logger.debug('current_opts.keys() == %s', current_opts.keys())
 
         if key in current_opts:  #current_data_node_keys
             overrides = [override_data]
@@ -730,7 +741,7 @@ def import_sDNA(opts
     if requested_sDNA[0] in sys.modules and requested_sDNA[1] in sys.modules:
         sDNAUISpec = sys.modules[requested_sDNA[0]]
         run_sDNA = sys.modules[requested_sDNA[1]]
-        logger.debug('sDNA: %s, %s already imported. ' % requested_sDNA)
+        logger.debug('sDNA: %s, %s already imported. ', *requested_sDNA)
         return sDNAUISpec, run_sDNA
 
     logger.info('Attempting import of sDNA '
@@ -839,7 +850,7 @@ def build_sDNA_GH_components(
                      ,built_user_objects_location
                      )
 
-    logger.debug('README_md_path == %s' % readme_path)
+    logger.debug('README_md_path == %s', readme_path)
 
 
     launcher_path = os.path.join(package_root, 'launcher.py')
@@ -926,6 +937,326 @@ def file_name_formats(base_name, duplicate_suffix):
     return unique_name_fmt, dupe_name_fmt
 
 
+def split_command_line(command):
+    #type(str) -> list[str]
+    """ Splits a command line string into a list of args, removing
+        quotes around args (e.g. file paths containing spaces), but
+        unlike POSIX shells, treating back slashes as normal characters.
+    """
+    lexer = shlex.shlex(command, posix = True)
+    lexer.whitespace_split = True
+    lexer.escape = ''
+    return list(lexer)
+
+
+class sDNATimeoutError(Exception):
+    pass
+
+
+class sDNACancelledError(Exception):
+    pass
+
+
+PROGRESS_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*%')
+
+
+def progress_percentage(line):
+    #type(str) -> float | None
+    """ The last percentage in a line of sDNA's output, if any.  """
+    matches = PROGRESS_PATTERN.findall(line)
+    if not matches:
+        return None
+    return float(matches[-1])
+
+
+def read_lines(stream
+              ,is_last = None
+              ,timeout = None
+              ,cancel = None
+              ,poll_interval = 0.1
+              ):
+    #type(file, function, float, threading.Event, float) -> Iterator[str]
+    """ Yields each line from stream as soon as it arrives, until the end 
+        of stream, or until a line for which is_last(line) is true.  
+
+        Raises sDNATimeoutError if more than timeout seconds have passed, 
+        or sDNACancelledError when cancel is set (both are checked at least 
+        every poll_interval seconds).  The line is read in another thread, 
+        so that both are still checked, even while no output arrives.  
+        Any error reading the stream is raised again in this thread.  
+    """
+    lines = queue.Queue()
+    errors = []
+
+    def read():
+        try:
+            for line in iter(stream.readline, ''):
+                lines.put(line)
+                if is_last is not None and is_last(line):
+                    break
+        except BaseException as e: # e.g. UnicodeDecodeError
+            errors.append(e)
+        finally:
+            lines.put(None)
+
+    reader = threading.Thread(target = read)
+    reader.daemon = True
+    reader.start()
+
+    deadline = None if timeout is None else time.time() + timeout
+
+    while True:
+        if cancel is not None and cancel.is_set():
+            raise sDNACancelledError('sDNA run cancelled. ')
+        if deadline is not None and time.time() > deadline:
+            raise sDNATimeoutError('sDNA run timed out after %s s. ' % timeout)
+        try:
+            line = lines.get(timeout = poll_interval)
+        except queue.Empty:
+            continue
+        if line is None:
+            if errors:
+                raise errors[0]
+            return
+        yield line
+
+
+def run_command(command
+               ,on_line = None
+               ,timeout = None
+               ,cancel = None
+               ,max_output_lines = 200
+               ):
+    #type(str, function, float, threading.Event, int) -> tuple[int, str]
+    """ Runs command in a new process, calling on_line with each line of 
+        its output (stdout and stderr) as it arrives.  The process is 
+        killed if anything goes wrong before it exits (e.g. it times 
+        out or is cancelled, see read_lines).  
+
+        Returns its return code, and the last max_output_lines of its 
+        output.
+    """
+    process = subprocess.Popen(command
+                              ,stdout = subprocess.PIPE
+                              ,stderr = subprocess.STDOUT
+                              ,universal_newlines = True
+                              )
+    output_lines = collections.deque(maxlen = max_output_lines)
+    try:
+        for line in read_lines(process.stdout, timeout = timeout, cancel = cancel):
+            output_lines.append(line)
+            if on_line is not None:
+                on_line(line)
+    except BaseException:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        raise
+    finally:
+        process.stdout.close()
+    return process.wait(), ''.join(output_lines)
+
+
+class sDNAWorkerError(Exception):
+    pass
+
+
+class sDNAWorker(object):
+    """ A long lived Python process (running sdna_worker.py) that runs
+        sDNA's scripts one after another, so that sDNA's modules and DLL
+        are only loaded once, instead of once per sDNA tool run.
+    """
+
+    script = os.path.join(os.path.dirname(__file__), 'sdna_worker.py')
+
+    def __init__(self, python, logger = logger):
+        #type(str, logging.Logger) -> None
+        self.python = python
+        self.logger = logger
+        self.logger.info('Starting sDNA worker process with: %s' % python)
+        self.process = subprocess.Popen([python, '-u', '-E', self.script]
+                                       ,stdin = subprocess.PIPE
+                                       ,stdout = subprocess.PIPE
+                                       ,stderr = subprocess.STDOUT
+                                       ,universal_newlines = True
+                                       )
+
+    def is_alive(self):
+        return self.process.poll() is None
+
+    def __call__(self
+                ,script
+                ,argv
+                ,on_line = None
+                ,timeout = None
+                ,cancel = None
+                ,max_output_lines = 200
+                ):
+        #type(str, list[str], function, float, threading.Event, int) -> tuple[int, str]
+        """ Runs script in the worker with sys.argv == [script] + argv, 
+            calling on_line with each line of its output as it arrives.  
+            If the job does not finish (e.g. it times out or is cancelled,
+            see read_lines) the worker is killed, and removed from 
+            sDNA_workers.  
+
+            Returns the script's return code and the last 
+            max_output_lines of its output.
+        """
+        job = json.dumps(dict(script = script, argv = list(argv)))
+        try:
+            self.process.stdin.write(job + '\n')
+            self.process.stdin.flush()
+        except EnvironmentError as e: # e.g. broken pipe
+            self.kill()
+            msg = 'Could not send job to sDNA worker: %s' % e
+            self.logger.error(msg)
+            raise sDNAWorkerError(msg)
+
+        output_lines = collections.deque(maxlen = max_output_lines)
+        try:
+            for line in read_lines(self.process.stdout
+                                  ,is_last = lambda line: sdna_worker.JOB_DONE in line
+                                  ,timeout = timeout
+                                  ,cancel = cancel
+                                  ):
+                # The marker need not start the line, if the script's last 
+                # output did not end in a new line.
+                output, found, retcode = line.partition(sdna_worker.JOB_DONE)
+                if output:
+                    output_lines.append(output)
+                    if on_line is not None:
+                        on_line(output)
+                if found:
+                    return int(retcode), ''.join(output_lines)
+        except BaseException:
+            # Otherwise the next job would read the rest of this one's 
+            # output.
+            self.kill()
+            raise
+
+        self.kill()
+        msg = ('sDNA worker exited before its job finished. '
+              +'Output: %s' % ''.join(output_lines)
+              )
+        self.logger.error(msg)
+        raise sDNAWorkerError(msg)
+
+    def kill(self):
+        """ Kills the worker process, and removes it from sDNA_workers, 
+            so that get_sDNA_worker starts a new one.
+        """
+        if sDNA_workers.get(self.python, None) is self:
+            del sDNA_workers[self.python]
+        if self.is_alive():
+            self.process.kill()
+            self.process.wait()
+
+    def close(self):
+        if self.is_alive():
+            self.process.stdin.close()
+            self.process.wait()
+
+
+sDNA_workers = {}
+
+
+def get_sDNA_worker(python, logger = logger):
+    #type(str, logging.Logger) -> sDNAWorker
+    """ Returns the running sDNA worker for python, starting a new one
+        if there is none yet, or if the last one has exited.
+    """
+    worker = sDNA_workers.get(python, None)
+    if worker is None or not worker.is_alive():
+        worker = sDNA_workers[python] = sDNAWorker(python, logger = logger)
+    return worker
+
+
+
+
+def cpu_count():
+    #type() -> int
+    try:
+        import multiprocessing
+        return multiprocessing.cpu_count()
+    except (ImportError, NotImplementedError):
+        return int(os.getenv('NUMBER_OF_PROCESSORS', '1'))
+
+
+def run_commands_in_parallel(commands
+                            ,max_processes = None
+                            ,on_done = None
+                            ,logger = logger
+                            ,timeout = None
+                            ,cancel = None
+                            ):
+    #type(list[str], int, function, logging.Logger, float, threading.Event) -> list[tuple[int, str, float]]
+    """ Runs each command in its own process, with at most max_processes 
+        (by default, the number of cores) running at the same time.  
+
+        As each command finishes, its status and timing are logged,
+        and on_done(index, retcode, output, seconds) is called (from this 
+        thread).  retcode is None if the command could not be run at all,
+        or if it took longer than timeout seconds (each command has its 
+        own time limit).  
+
+        If cancel is set, running commands are killed, the rest are not 
+        started, and sDNACancelledError is raised.  
+
+        Returns a list of (retcode, output, seconds), in the same order
+        as commands.
+    """
+    if max_processes is None:
+        max_processes = cpu_count()
+
+    jobs = queue.Queue()
+    for job in enumerate(commands):
+        jobs.put(job)
+    finished = queue.Queue()
+
+    def run_jobs():
+        while True:
+            try:
+                i, command = jobs.get_nowait()
+            except queue.Empty:
+                return
+            start = time.time()
+            try:
+                if cancel is not None and cancel.is_set():
+                    raise sDNACancelledError('sDNA run cancelled. ')
+                retcode, output = run_command(command
+                                             ,timeout = timeout
+                                             ,cancel = cancel
+                                             )
+            except Exception as e:
+                # Always put a result, or the loop below waits forever.
+                output, retcode = str(e), None
+            finished.put((i, retcode, output, time.time() - start))
+
+    for __ in range(min(max(1, max_processes), len(commands))):
+        thread = threading.Thread(target = run_jobs)
+        thread.daemon = True
+        thread.start()
+
+    results = [None] * len(commands)
+    for num_done in range(1, len(commands) + 1):
+        i, retcode, output, seconds = finished.get()
+        results[i] = (retcode, output, seconds)
+        msg = ('sDNA job %s finished with return code: %s in %.2f s (%s of %s done). '
+              % (i, retcode, seconds, num_done, len(commands))
+              )
+        if retcode == 0:
+            logger.info(msg)
+        else:
+            logger.error(msg + 'Output: %s' % output)
+        if on_done is not None:
+            on_done(i, retcode, output, seconds)
+
+    if cancel is not None and cancel.is_set():
+        msg = 'sDNA batch cancelled. '
+        logger.error(msg)
+        raise sDNACancelledError(msg)
+
+    return results
 
 
 class sDNA_ToolWrapper(sDNA_GH_Tool):
@@ -992,6 +1323,16 @@ class sDNA_ToolWrapper(sDNA_GH_Tool):
         prepped_fmt = "{name}_prepped"
         output_fmt = "{name}_output"
         overwrite_shp = pyshp_wrapper.ShpOptions.overwrite_shp
+        use_sDNA_worker = False # Run sDNA in a long lived process that
+                                # only loads sDNA once (see sdna_worker.py)
+        sDNA_timeout = None # seconds.  None => no time limit.
+        sDNA_progress_bar = True # Show sDNA's progress in Rhino's status 
+                                 # bar when run from a component (and 
+                                 # cancel sDNA if Esc is pressed).
+        sDNA_batch = None # List of dicts of tool options, e.g. 
+                          # [{radii = "400"}, {radii = "800"}], to run the 
+                          # tool once for each, in parallel (see run_batch).
+        sDNA_max_processes = None # None => one per core.
         # file extensions are actually optional in PyShp, 
         # but just to be safe and future proof
 # https://sdna.cardiff.ac.uk/sdna/wp-content/downloads/documentation/manual/sDNA_manual_v4_1_0/installation_usage.html 
@@ -1107,7 +1448,7 @@ class sDNA_ToolWrapper(sDNA_GH_Tool):
         # deep copy / clone.
 
 
-        self.logger.debug('default_tool_opts == %s ' % self.default_tool_opts)
+        self.logger.debug('default_tool_opts == %s ', self.default_tool_opts)
 
         update_opts(current_opts = new_tool_opts # mutated again
                    ,override = opts # in case opts for this tool were already
@@ -1214,6 +1555,7 @@ class sDNA_ToolWrapper(sDNA_GH_Tool):
         self.nick_name = nick_name
         self.component = component
         self.import_sDNA = import_sDNA
+        self.cancel_event = threading.Event()
 
         self.default_tool_opts = OrderedDict()
         self.default_named_tuples = OrderedDict()
@@ -1256,6 +1598,110 @@ class sDNA_ToolWrapper(sDNA_GH_Tool):
 
 
 
+    on_progress = None # Optional hook, called with each percentage 
+                       # sDNA reports.  To use one from a script, set it 
+                       # on the tool, e.g. tool.on_progress = bar.update
+                       # Components otherwise use Rhino's status bar 
+                       # (see Options.sDNA_progress_bar).
+
+    def log_sDNA_output(self, line, on_progress = None):
+        #type(str, function) -> None
+        line = line.rstrip()
+        if not line:
+            return
+        self.logger.info(line)
+        if on_progress is None:
+            on_progress = self.on_progress
+        if on_progress is not None:
+            percentage = progress_percentage(line)
+            if percentage is not None:
+                on_progress(percentage)
+
+    def show_progress_in_status_bar(self, percentage):
+        #type(float) -> None
+        """ Progress hook for components.  Also cancels sDNA if Esc is 
+            pressed (checked whenever sDNA reports its progress).
+        """
+        rs.StatusBarProgressMeterUpdate(int(percentage))
+        if Grasshopper.Kernel.GH_Document.IsEscapeKeyDown():
+            self.logger.warning('Esc pressed.  Cancelling sDNA. ')
+            self.cancel()
+
+    def cancel(self):
+        """ Stops the sDNA run in progress (e.g. from another thread, or 
+            a progress hook), which then raises sDNACancelledError.
+        """
+        self.cancel_event.set()
+
+    def get_input_file(self, f_name, input = None):
+        #type(str, str) -> str
+        input_file = input # the builtin function input doesn't 
+                           # work in a GhPython component and input is a
+                           # method argument so there is no namespace issue
+
+        
+
+        if (isinstance(f_name, basestring) and os.path.isfile(f_name)
+            and os.path.splitext(f_name)[1] in ['.shp','.dbf','.shx']):  
+            input_file = f_name
+        else:
+            logger.debug('isinstance(f_name, basestring) == %s', isinstance(f_name, basestring))
+            logger.debug('os.path.isfile(f_name) == %s', os.path.isfile(f_name))
+            logger.debug('os.path.splitext(f_name)[1] == %s', os.path.splitext(f_name)[1])
+
+        self.logger.debug('input == %s, f_name == %s ', input_file, f_name)
+
+        if not input_file or not os.path.isfile(input_file):
+            msg = 'input: "%s" is not a file. To run sDNA please set file or input '
+            msg += 'to the path of a valid shape file. '
+            msg %= input_file
+            self.logger.error(msg)
+            raise ValueError(msg)
+
+        return input_file
+
+    def default_output_file(self, input_file, options, suffix = ''):
+        #type(str, type[any], str) -> str
+        if self.tool_name == 'sDNAPrepare':
+            output_file = options.prepped_fmt.format(name = os.path.splitext(input_file)[0])
+        else:
+            output_file = options.output_fmt.format(name = os.path.splitext(input_file)[0])
+        output_file += suffix + '.shp'
+
+        return pyshp_wrapper.get_filename(output_file, options)
+
+    def sDNA_command(self, tool_opts, options, sDNAUISpec, run_sDNA, get_syntax):
+        #type(dict, type[any], module, module, function) -> tuple[str, str, str]
+        """ Returns the path of the sDNA script to run, its args, and the 
+            whole command line to run it with options.python.  
+
+            Mutates: tool_opts (converts lists to comma separated strings)
+        """
+        for key, val in tool_opts.items():
+            if key in self.LIST_ARGS and isinstance(val, list) and len(val) >= 2:
+                tool_opts[key] = ','.join(str(element) for element in val)
+                self.logger.info('Converted list to str: %s' % tool_opts[key])
+
+        self.logger.debug('tool_opts: %s', tool_opts)
+
+        syntax = get_syntax(tool_opts)
+
+        script = os.path.join(os.path.dirname(sDNAUISpec.__file__)
+                             ,'bin'
+                             ,syntax['command'] + '.py'  
+                             ) 
+        args = (' --im ' + run_sDNA.map_to_string(syntax["inputs"])
+               +' --om ' + run_sDNA.map_to_string(syntax["outputs"])
+               +' ' + syntax["config"]
+               )
+        command = (options.python
+                  +' -u ' 
+                  +' -E '
+                  +'"' + script + '"'
+                  +args
+                  )
+        return script, args, command
+
     def __call__(self # the tool instance not the GH component.
                 ,f_name
                 ,opts
@@ -1276,46 +1722,20 @@ class sDNA_ToolWrapper(sDNA_GH_Tool):
 
         options = opts['options']
 
+        if options.sDNA_batch:
+            return self.call_batch(f_name, opts, input, **kwargs)
+
         sDNA = sDNA_key(opts)
 
         tool_opts_sDNA = self.get_tool_opts(opts, sDNA = sDNA)
 
-        input_file = input # the builtin function input doesn't 
-                           # work in a GhPython component and input is a
-                           # method argument so there is no namespace issue
-
-        
-
-        if (isinstance(f_name, basestring) and os.path.isfile(f_name)
-            and os.path.splitext(f_name)[1] in ['.shp','.dbf','.shx']):  
-            input_file = f_name
-        else:
-            logger.debug('isinstance(f_name, basestring) == %s' % isinstance(f_name, basestring))
-            logger.debug('os.path.isfile(f_name) == %s' % os.path.isfile(f_name))
-            logger.debug('os.path.splitext(f_name)[1] == %s' % os.path.splitext(f_name)[1])
-
-        self.logger.debug('input == %s, f_name == %s ' % (input_file, f_name))
-
-        if not os.path.isfile(input_file):
-            msg = 'input: "%s" is not a file. To run sDNA please set file or input '
-            msg += 'to the path of a valid shape file. '
-            msg %= input_file
-            self.logger.error(msg)
-            raise ValueError(msg)
-         
-
+        input_file = self.get_input_file(f_name, input)
 
         output_file = output 
         if not output_file:
-            if self.tool_name == 'sDNAPrepare':
-                output_file = options.prepped_fmt.format(name = os.path.splitext(input_file)[0])
-            else:
-                output_file = options.output_fmt.format(name = os.path.splitext(input_file)[0])
-            output_file += '.shp'
-
-            output_file = pyshp_wrapper.get_filename(output_file, options)
+            output_file = self.default_output_file(input_file, options)
 
-            self.logger.debug('Using auto generated output_file name: %s' % output_file)
+            self.logger.debug('Using auto generated output_file name: %s', output_file)
 
             if (options.del_after_read and 
                 not options.strict_no_del and
@@ -1342,12 +1762,6 @@ class sDNA_ToolWrapper(sDNA_GH_Tool):
 
 
 
-        for key, val in tool_opts.items():
-            if key in self.LIST_ARGS and isinstance(val, list) and len(val) >= 2:
-                tool_opts[key] = ','.join(str(element) for element in val)
-                self.logger.info('Converted list to str: %s' % tool_opts[key])
-
-
         if 'advanced' in tool_opts:
             self.logger.debug('Calling self._add_to_advanced_config_string')
             tool_opts = self._add_to_advanced_config_string(
@@ -1368,38 +1782,62 @@ class sDNA_ToolWrapper(sDNA_GH_Tool):
                                               )
             all_sDNA_tool_opts[sDNA] = tool_opts_sDNA._replace(advanced = tool_opts['advanced'])
 
-        self.logger.debug('tool_opts: %s' % tool_opts)
-
-        syntax = get_syntax(tool_opts)
-
-        command = (options.python
-                  +' -u ' 
-                  +' -E '
-                  +'"' 
-                  +os.path.join(os.path.dirname(sDNAUISpec.__file__)
-                               ,'bin'
-                               ,syntax['command'] + '.py'  
-                               ) 
-                  +'"'
-                  +' --im ' + run_sDNA.map_to_string(syntax["inputs"])
-                  +' --om ' + run_sDNA.map_to_string(syntax["outputs"])
-                  +' ' + syntax["config"]
-                  )
+        script, args, command = self.sDNA_command(tool_opts
+                                                 ,options
+                                                 ,sDNAUISpec
+                                                 ,run_sDNA
+                                                 ,get_syntax
+                                                 )
         self.logger.info('sDNA command run: %s' % command)
 
         output_lines = ''
+        retcode = None
+
+        on_progress = self.on_progress
+        progress_bar = (on_progress is None and 
+                        options.sDNA_progress_bar and
+                        self.component is not None
+                       )
+        if progress_bar:
+            on_progress = self.show_progress_in_status_bar
+            rs.StatusBarProgressMeterShow('sDNA', 0, 100)
+
+        self.cancel_event.clear()
+        run_kwargs = dict(on_line = lambda line: self.log_sDNA_output(line
+                                                                     ,on_progress
+                                                                     )
+                         ,timeout = options.sDNA_timeout
+                         ,cancel = self.cancel_event
+                         )
 
         try:
-            output_lines = subprocess.check_output(command)
-            retcode = 0 
-        except subprocess.CalledProcessError as e:
-            self.logger.info(output_lines)
-            self.logger.error('error.output: %s' % e.output)
-            self.logger.error('error.returncode: %s' % e.returncode)
+            if options.use_sDNA_worker:
+                try:
+                    worker = get_sDNA_worker(options.python, logger = self.logger)
+                    retcode, output_lines = worker(script
+                                                  ,split_command_line(args)
+                                                  ,**run_kwargs
+                                                  )
+                except (sDNAWorkerError, EnvironmentError) as e:
+                    self.logger.warning('sDNA worker failed: %s. ' % e
+                                       +'Running sDNA in a new process instead. '
+                                       )
+                    sDNA_workers.pop(options.python, None)
+                    retcode = None
+
+            if retcode is None:
+                retcode, output_lines = run_command(command, **run_kwargs)
+        except (sDNATimeoutError, sDNACancelledError) as e:
+            self.logger.error(str(e))
             raise e
+        finally:
+            if progress_bar:
+                rs.StatusBarProgressMeterHide()
 
-
-        self.logger.info(output_lines)
+        if retcode != 0:
+            self.logger.error('error.output: %s' % output_lines)
+            self.logger.error('error.returncode: %s' % retcode)
+            raise subprocess.CalledProcessError(retcode, command, output_lines)
 
 
         # Does not execute if subprocess raises an Exception
@@ -1430,6 +1868,124 @@ class sDNA_ToolWrapper(sDNA_GH_Tool):
         return tuple(locs[retval] for retval in self.retvals)
 
     
+    def call_batch(self, f_name, opts, input = None, **kwargs):
+        #type(str, dict, str, dict) -> tuple
+        """ Runs the sDNA tool for each dict of tool options in 
+            options.sDNA_batch (see run_batch), raising an error if any 
+            of the runs fail.  
+
+            The first run's output file is returned as f_name (e.g. for 
+            Read_Shp).  All the output files are logged.
+        """
+        options = opts['options']
+
+        input = self.get_input_file(f_name, input)
+
+        results = self.run_batch(f_name
+                                ,opts
+                                ,options.sDNA_batch
+                                ,input = input
+                                ,max_processes = options.sDNA_max_processes
+                                ,extra_inputs = kwargs
+                                )
+
+        self.logger.info('sDNA batch output files: %s' 
+                        % ', '.join(result[0] for result in results)
+                        )
+
+        for i, (output_file, retcode, output_lines, __) in enumerate(results):
+            if retcode != 0:
+                self.logger.error('error.output: %s' % output_lines)
+                self.logger.error('error.returncode: %s' % retcode)
+                raise subprocess.CalledProcessError(retcode
+                                                   ,'sDNA batch job %s' % i
+                                                   ,output_lines
+                                                   )
+
+        retcode = 0
+        f_name = results[0][0]
+        output = '' # Stops subsequent sDNA components using these names.
+        advanced = ''
+        gdm = None
+
+        locs = locals().copy()
+        return tuple(locs[retval] for retval in self.retvals)
+
+    def run_batch(self
+                 ,f_name
+                 ,opts
+                 ,variations
+                 ,input = None
+                 ,max_processes = None
+                 ,on_done = None
+                 ,extra_inputs = None
+                 ):
+        #type(str, dict, list[dict], str, int, function, dict) -> list[tuple]
+        """ Runs the sDNA tool once for each dict of tool options in 
+            variations (e.g. different radii, weights or metrics), on the 
+            same input shapefile, in a bounded pool of parallel processes.  
+
+            Each run's output shapefile is named from options.output_fmt
+            (or prepped_fmt), with the run's index as a suffix.  Input 
+            files are not deleted.  See run_commands_in_parallel for 
+            max_processes and on_done.  Each run is stopped after 
+            options.sDNA_timeout seconds, and all are stopped by 
+            self.cancel().
+
+            Returns a list of (output_file, retcode, output, seconds), 
+            in the same order as variations.
+        """
+        if opts is None:
+            opts = self.opts
+
+        sDNAUISpec, run_sDNA, get_syntax, __ = self.load_sDNA_tool(opts)
+
+        options = opts['options']
+
+        tool_opts_sDNA = self.get_tool_opts(opts)
+
+        input_file = self.get_input_file(f_name, input)
+
+        output_files, commands = [], []
+        for i, variation in enumerate(variations):
+            tool_opts = tool_opts_sDNA._asdict()
+            tool_opts.update(variation)
+            output_file = self.default_output_file(input_file
+                                                  ,options
+                                                  ,suffix = '_%s' % i
+                                                  )
+            tool_opts.update(input = input_file, output = output_file)
+
+            if 'advanced' in tool_opts:
+                tool_opts = self._add_to_advanced_config_string(
+                                     tool_opts
+                                    ,opts
+                                    ,extra_inputs = extra_inputs or {}
+                                    )
+
+            __, __, command = self.sDNA_command(tool_opts
+                                               ,options
+                                               ,sDNAUISpec
+                                               ,run_sDNA
+                                               ,get_syntax
+                                               )
+            self.logger.info('sDNA job %s command: %s' % (i, command))
+            output_files.append(output_file)
+            commands.append(command)
+
+        self.cancel_event.clear()
+        results = run_commands_in_parallel(commands
+                                          ,max_processes = max_processes
+                                          ,on_done = on_done
+                                          ,logger = self.logger
+                                          ,timeout = options.sDNA_timeout
+                                          ,cancel = self.cancel_event
+                                          )
+
+        return [(output_file,) + result 
+                for output_file, result in zip(output_files, results)
+               ]
+
     retvals = 'retcode', 'f_name', 'input', 'output', 'advanced'
     component_outputs = ('file',) # retvals[-1])
 
@@ -1471,7 +2027,7 @@ class sDNA_ToolWrapper(sDNA_GH_Tool):
             # recognise, may have been added to the component, by another
             # tool on it.
 
-            self.logger.debug('user_inputs == %s' % user_inputs)
+            self.logger.debug('user_inputs == %s', user_inputs)
             self.logger.debug('needed_inputs == %s' 
                                 % self.component.params_adder.needed_inputs
                                 )
@@ -1490,7 +2046,7 @@ class sDNA_ToolWrapper(sDNA_GH_Tool):
 
 
         else:
-            self.logger.debug('Advanced config string: %s' % tool_opts['advanced'])
+            self.logger.debug('Advanced config string: %s', tool_opts['advanced'])
 
 
         return tool_opts
\ No newline at end of file
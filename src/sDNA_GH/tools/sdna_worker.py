@@ -0,0 +1,106 @@
+#! /usr/bin/python
+# -*- coding: utf-8 -*-
+
+# MIT License
+
+# Copyright (c) [2021] [Cardiff University, a body incorporated
+# by Royal Charter and a registered charity (number:
+# 1136855) whose administrative offices are at 7th floor 30-
+# 36 Newport Road, University CF24 0DE, Wales, UK]
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+""" A long lived worker process that runs sDNA's command line scripts.
+
+    Started by sDNA_GH.tools.sdna.sDNAWorker (when use_sDNA_worker is
+    true), as a script run by the same Python interpreter as sDNA
+    (options.python), not by Grasshopper.
+
+    Each line on stdin is a JSON job: {"script" : path, "argv" : [args]}.
+    The script (e.g. sDNA's bin/sdnaintegral.py) is run in this process as
+    __main__ with sys.argv == [script] + argv, so the sDNA modules and DLL
+    it imports are only loaded by the first job, not by every job.  The
+    script's output is forwarded to stdout, followed by a line starting
+    with JOB_DONE, and then its return code.  The worker exits at the end
+    of stdin.
+"""
+
+__authors__ = {'James Parrott', 'Crispin Cooper'}
+__version__ = '3.0.5'
+
+import sys
+import os
+import json
+import runpy
+import traceback
+
+
+JOB_DONE = 'sDNA_GH worker job finished with return code: '
+
+
+def exit_code(e):
+    #type(SystemExit) -> int
+    if e.code is None:
+        return 0
+    if isinstance(e.code, int):
+        return e.code
+    print(e.code)
+    return 1
+
+
+def run_job(script, argv):
+    #type(str, list) -> int
+    """ Runs script as __main__ with sys.argv set to [script] + argv,
+        as if it had been run from the command line.
+    """
+    script_dir = os.path.dirname(os.path.abspath(script))
+    if script_dir not in sys.path:
+        sys.path.insert(0, script_dir)
+
+    old_argv = sys.argv
+    sys.argv = [script] + list(argv)
+    try:
+        runpy.run_path(script, run_name = '__main__')
+        return 0
+    except SystemExit as e:
+        return exit_code(e)
+    except BaseException:
+        traceback.print_exc(file = sys.stdout)
+        return 1
+    finally:
+        sys.argv = old_argv
+        sys.stdout.flush()
+
+
+def main(stdin = sys.stdin, stdout = sys.stdout):
+    # Forward anything the scripts write to stderr too, in order.
+    sys.stderr = stdout
+
+    for line in iter(stdin.readline, ''):
+        if not line.strip():
+            continue
+        job = json.loads(line)
+        retcode = run_job(job['script'], job.get('argv', []))
+        stdout.write('%s%s\n' % (JOB_DONE, retcode))
+        stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
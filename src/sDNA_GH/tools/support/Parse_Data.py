@@ -128,6 +128,7 @@ ClassLogger = logging_wrapper.class_logger_factory(logger = logger
 
 QUANTILE_METHODS = {'simple' : data_cruncher.simple_quantile
                    ,'max_deltas' : data_cruncher.class_bounds_at_max_deltas
+                   ,'Largest Gaps (Natural Breaks lite)' : data_cruncher.class_bounds_at_max_deltas
                    ,'Equal Count (Quantile)' : data_cruncher.quantile_l_to_r
                    ,'quantile' : data_cruncher.spike_isolating_quantile
                    ,'geometric' : data_cruncher.geometric
@@ -164,7 +165,9 @@ def search_for_field(fields, prefix):
 
 class DataParser(sDNA_GH_Tool):
 
-    class Options(data_cruncher.SpikeIsolatingQuantileOptions):
+    class Options(data_cruncher.SpikeIsolatingQuantileOptions
+                 ,data_cruncher.FisherJenksOptions
+                 ):
         field = None
         field_prefix = 'Bt'
         plot_min = options_manager.Sentinel('plot_min is automatically '
@@ -302,6 +305,13 @@ class DataParser(sDNA_GH_Tool):
                             ,Description = ('Mid-points of the classes in the '
                                            +'legend. '
                                            )
+                            ))
+                  ,('class_indices', add_params.ParamInfo(
+                             param_Class = Param_Integer
+                            ,Description = ('Index of the class of each '
+                                           +'object in Geom (including the '
+                                           +'legend tags), starting from 0. '
+                                           )
                             ))
                                                )
 
@@ -351,9 +361,31 @@ class DataParser(sDNA_GH_Tool):
     # objects.
     #
 
+    def objs_and_selected_vals(self, gdm, select):
+        #type(list, function) -> Iterator
+        # Slices the column of the field from columnar gdms.
+        for sub_gdm in gdm:
+            if (sub_gdm and 
+                isinstance(sub_gdm, gdm_from_GH_Datatree.ColumnarGeomDataMapping)):
+                #
+                select(sub_gdm[next(iter(sub_gdm))]) # May set self.field
+                try:
+                    column = sub_gdm.column(self.field)
+                except KeyError:
+                    pass # select raises the error for the object missing it.
+                else:
+                    for obj_and_val in zip(sub_gdm.keys(), column):
+                        yield obj_and_val
+                    continue
+
+            for obj, val in sub_gdm.items():
+                yield obj, select(val)
+
+
     def filter_or_bound_data_from_selected_field(self, gdm, options):
         # This method may set self.field.  
         select_data_pt_or_field = self.make_field_selector(gdm, options)
+        objs_and_vals = self.objs_and_selected_vals(gdm, select_data_pt_or_field)
 
         user_min, user_max = options.plot_min, options.plot_max
         if data_cruncher.max_and_min_are_valid(user_max, user_min):
@@ -362,25 +394,20 @@ class DataParser(sDNA_GH_Tool):
             #
             x_min, x_max = user_min, user_max
             if options.exclude:
-                data = OrderedDict( (obj, select_data_pt_or_field(val)) 
-                                    for sub_gdm in gdm
-                                    for obj, val in sub_gdm.items()                                    
-                                    if x_min <= select_data_pt_or_field(val) <= x_max
+                data = OrderedDict( (obj, val) 
+                                    for obj, val in objs_and_vals
+                                    if x_min <= val <= x_max
                                   )
             else: # exclude == False => enforce bounds, cap and collar
-                data = OrderedDict( (obj, min(x_max, max(x_min, select_data_pt_or_field(val)))) 
-                                    for sub_gdm in gdm
-                                    for obj, val in sub_gdm.items()                                    
+                data = OrderedDict( (obj, min(x_max, max(x_min, val))) 
+                                    for obj, val in objs_and_vals
                                   )
 
         else:
             self.logger.debug('Manually calculating max and min. '
                              +'No valid override found. '
                              )
-            data = OrderedDict( (obj, select_data_pt_or_field(val)) 
-                                for sub_gdm in gdm
-                                for obj, val in sub_gdm.items()                                    
-                              )
+            data = OrderedDict(objs_and_vals)
             x_min, x_max = min(data.values()), max(data.values())
             self.logger.debug('x_min == %s, x_max == %s' % (x_min, x_max))
         # bool(0) is False so in case x_min==0 we can't use if options.plot_min
@@ -391,10 +418,7 @@ class DataParser(sDNA_GH_Tool):
         # overridden, the user must set them to an invalid override 
         # (e.g. max <= min) to go back to auto-calculation.
 
-        self.logger.debug('data.values() == %s, ... ,%s' % (tuple(data.values()[:3])
-                                                           ,tuple(data.values()[-3:])
-                                                           )
-                         ) 
+        self.logger.debug('data == %s', logging_wrapper.Truncated(data)) 
 
         self.logger.debug('len(data)== %s ' % len(data.values()))
 
@@ -434,7 +458,7 @@ class DataParser(sDNA_GH_Tool):
         elif options.class_spacing in QUANTILE_METHODS:
             self.logger.debug('Using: %s class calculation method.' % options.class_spacing)
             inter_class_bounds = QUANTILE_METHODS[options.class_spacing](
-                                                                     data = data.values()
+                                                                     data = list(data.values())
                                                                     ,num_classes = m
                                                                     ,options = options
                                                                     )
@@ -612,39 +636,28 @@ class DataParser(sDNA_GH_Tool):
                                       ,key = lambda tupl : tupl[1]
                                       ) 
                               )
-            self.logger.debug('data.values() == %s, ... ,%s' % (tuple(data.values()[:3])
-                                                               ,tuple(data.values()[-3:])
-                                                               )
-                             ) 
+            self.logger.debug('data == %s', logging_wrapper.Truncated(data)) 
 
 
         inter_class_bounds = self.classify_data(data, x_min, x_max, options)
 
 
-        
+        class_indices = data_cruncher.class_indices(data.values()
+                                                   ,inter_class_bounds
+                                                   ,options
+                                                   )
 
 
         if options.colour_as_class:
 
-        
-            def class_mid_point(x): 
-                highest_lower_bound = x_min if x < inter_class_bounds[0] else max(
-                                                y 
-                                                for y in [x_min] + inter_class_bounds
-                                                if y <= x                  
-                                                )
-                #Classes include their lower bound
-                least_upper_bound = x_max if x >= inter_class_bounds[-1] else min(
-                                                y 
-                                                for y in inter_class_bounds + [x_max] 
-                                                if y > x
-                                                )
+            #Classes include their lower bound
+            class_mid_points = self.mid_points(sorted(inter_class_bounds)
+                                              ,x_min
+                                              ,x_max
+                                              )
 
-                return 0.5*(least_upper_bound + highest_lower_bound)
-
-
-            for obj, data_val in data.items():
-                data[obj] = class_mid_point(data_val)
+            for obj, class_index in zip(data.keys(), class_indices):
+                data[obj] = class_mid_points[class_index]
 
 
 
@@ -657,28 +670,30 @@ class DataParser(sDNA_GH_Tool):
             param={}
             param['exponential'] = param['logarithmic'] = options.base
 
-            spline = data_cruncher.splines[options.re_normaliser]
+            spline = data_cruncher.batch_splines[options.re_normaliser]
             p = param.get(options.re_normaliser, 'Not used')
 
-            y_min = x_min if options.y_min is None else options.y_min 
+            y_min = x_min if options.y_min is None else options.y_min
             y_max = x_max if options.y_max is None else options.y_max
 
 
-            def renormalise(x):
+            def renormalise(xs):
                 return spline(
-                         x
+                         xs
                         ,x_min
                         ,p   # base or x_mid.  Can't be a kwarg.
                         ,x_max
                         ,y_min = y_min
                         ,y_max = y_max
+                        ,options = options
                         )
 
-            for i, inter_class_bound in enumerate(inter_class_bounds):
-                inter_class_bounds[i] = renormalise(inter_class_bound)
+            # Rebinds (instead of mutating) inter_class_bounds, which
+            # may be the user's list in options.
+            inter_class_bounds = renormalise(inter_class_bounds)
 
-            for obj, data_val in data.items():
-                data[obj] = renormalise(data_val)
+            for obj, data_val in zip(data.keys(), renormalise(data.values())):
+                data[obj] = data_val
 
             x_max, x_min = y_max, y_min
 
@@ -699,6 +714,9 @@ class DataParser(sDNA_GH_Tool):
 
         gen_exp = itertools.chain(data.items(), zip(legend_tags, mid_points))
 
+        # Each legend tag is in its own class.
+        class_indices += list(range(len(legend_tags)))
+
         gdm = gdm_from_GH_Datatree.GeomDataMapping(gen_exp)
 
         # rename for retvals
@@ -707,6 +725,8 @@ class DataParser(sDNA_GH_Tool):
         locs = locals().copy()
         return tuple(locs[retval] for retval in self.retvals)
 
-    retvals = 'plot_min', 'plot_max', 'gdm', 'field', 'mid_points', 'inter_class_bounds'
-    component_outputs = retvals[:2] + ('Data', 'Geom') + retvals[-3:]
+    retvals = ('plot_min', 'plot_max', 'gdm', 'field', 'mid_points'
+              ,'inter_class_bounds', 'class_indices'
+              )
+    component_outputs = retvals[:2] + ('Data', 'Geom') + retvals[-4:]
 
@@ -246,11 +246,7 @@ class RhinoObjectsReader(sDNA_GH_Tool):
 
 
 
-        self.logger.debug('First objects read: \n' 
-                         +'\n'.join( str(x) 
-                                     for x in gdm.keys()[:3]
-                                   )
-                         )
+        self.logger.debug('First objects read: %s', logging_wrapper.Truncated(gdm))
         if gdm:
             self.logger.debug('type(gdm[0]) == ' + type(gdm.keys()[0]).__name__ )
 
@@ -281,10 +277,8 @@ class RhinoObjectsReader(sDNA_GH_Tool):
             self.logger.error(msg)
             raise ValueError(msg)
 
-        self.logger.debug('after override ....Last objects read: \n'
-                         +'\n'.join( str(x) 
-                                     for x in gdm.keys()[-3:]
-                                   )
+        self.logger.debug('after override .... objects read: %s'
+                         ,logging_wrapper.Truncated(gdm)
                          )
 
         sc.doc = ghdoc 
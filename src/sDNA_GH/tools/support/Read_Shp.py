@@ -127,6 +127,56 @@ class ShapefileReaderAddShapeError(Exception):
     pass
 
 
+def join_records_to_keys(keys, records, uuid_field, logger = logger):
+    #type(Iterable, Iterable[dict], str, logging.Logger) -> Iterator[tuple]
+    """ Pairs each record with the key in keys (e.g. an existing Rhino 
+        object) whose str is the record's value of uuid_field, as written
+        by Write_Shp.  
+
+        Pairs by position while the order of keys and records matches. 
+        Only if it doesn't is a hash index of the keys built, to pair the
+        remaining records.  Records with no matching key are skipped.  
+        All the records are always iterated over (so a 
+        TmpFileDeletingRecordsIterator can delete its file).
+    """
+    keys = list(keys)
+    in_order = True
+    index = None # {str(key) : key}, built only if needed
+    unmatched = 0
+    for i, record in enumerate(records):
+        uuid = record.get(uuid_field)
+        if in_order and i < len(keys) and str(keys[i]) == uuid:
+            yield keys[i], record
+            continue
+        if in_order:
+            in_order = False
+            msg = 'Order of keys and records differs at record: %s. Joining on: %s'
+            logger.debug(msg % (i, uuid_field))
+            index = dict((str(key), key) for key in keys)
+            if len(index) < len(keys):
+                msg = ('Keys are not unique as strings, so cannot be joined '
+                      +'on: %s.  Pairing by position instead. ' % uuid_field
+                      )
+                logger.warning(msg)
+                index = None
+        if index is None:
+            yield (keys[i] if i < len(keys) else None), record
+        elif uuid in index:
+            yield index[uuid], record
+        else:
+            unmatched += 1
+    if unmatched:
+        logger.warning('%s records had no object with a matching %s. '
+                      % (unmatched, uuid_field)
+                      )
+
+
+# Decoded shapefiles, so re-reading an unchanged file (e.g. to plot a
+# different field) doesn't parse it again.  max_bytes is set from 
+# ShapefileReader's options.
+shapefile_cache = pyshp_wrapper.ShapefileCache(max_bytes = 0)
+
+
 
 
 class ShapefileReader(sDNA_GH_Tool):
@@ -140,6 +190,12 @@ class ShapefileReader(sDNA_GH_Tool):
         output_fmt = '{name}_output'
         ensure_3D = True
         ignore_invalid = False
+        read_field_only = False # True => only read field and uuid_field 
+                                # from the .dbf (faster).
+        cache_max_bytes = 256 * 1024**2 # Estimated memory used by the 
+                                        # cache.  0 => no cache.
+        columnar_gdm = False # True => store the records' data in columns 
+                             # (uses less memory).
                         
     component_inputs = ('file', 'Geom', 'bake', 'ignore_invalid') 
                                                 # existing 'Geom', otherwise new 
@@ -159,11 +215,37 @@ class ShapefileReader(sDNA_GH_Tool):
             raise ValueError(msg)
 
 
-        self.logger.debug('Reading shapefile meta data... ')
-        shp_fields, bbox, shape_type, num_entries = pyshp_wrapper.shp_meta_data(
-                                                                         f_name
-                                                                        ,options
-                                                                        )
+        file_name = os.path.splitext(f_name)[0]
+        csv_f_name = options.sDNA_names_fmt.format(name = file_name)
+
+        shapefile_cache.max_bytes = options.cache_max_bytes
+        cache_key = pyshp_wrapper.ShapefileCache.key(f_name
+                                                    ,other_paths = [csv_f_name]
+                                                    ,options = options
+                                                    )
+        # A temporary file is not worth holding all of in memory, as it 
+        # can't be read again.
+        use_cache = (options.cache_max_bytes and 
+                     not pyshp_wrapper.deleted_after_read(f_name, options)
+                    )
+        if use_cache:
+            cached = shapefile_cache.get(cache_key, {})
+        else:
+            cached = {}
+
+        if options.columnar_gdm:
+            GeomDataMapping = gdm_from_GH_Datatree.ColumnarGeomDataMapping
+        else:
+            GeomDataMapping = gdm_from_GH_Datatree.GeomDataMapping
+
+        def copies_of(recs):
+            # The cached dicts must not be changed by later tools.
+            return (rec.copy() for rec in recs)
+
+        if 'meta' not in cached:
+            self.logger.debug('Reading shapefile meta data... ')
+            cached['meta'] = pyshp_wrapper.shp_meta_data(f_name, options)
+        shp_fields, bbox, shape_type, num_entries = cached['meta']
 
         self.logger.debug('bbox == %s' % bbox)
 
@@ -203,6 +285,13 @@ class ShapefileReader(sDNA_GH_Tool):
             self.logger.warning(msg)
             warnings.warn(msg)
 
+        read_fields = None # all fields
+        if options.read_field_only and getattr(options, 'field', None) in fields:
+            read_fields = [fld for fld in (options.uuid_field, options.field)
+                           if fld in fields
+                          ]
+            self.logger.debug('Only reading fields: %s' % read_fields)
+
 
    
         def get_prefix(field):
@@ -234,7 +323,7 @@ class ShapefileReader(sDNA_GH_Tool):
 
         if isinstance(gdm, gdm_from_GH_Datatree.GeomDataMapping):
 
-            self.logger.debug('gdm == %s, ..., %s ' % (gdm.items()[:2], gdm.items()[-2:]))
+            self.logger.debug('gdm == %s ', logging_wrapper.Truncated(gdm, 2))
 
             existing_geom_compatible = len(gdm) == num_entries
         else:
@@ -295,17 +384,31 @@ class ShapefileReader(sDNA_GH_Tool):
 
 
             def gdm_of_new_geom_from_group(group):
-                return gdm_from_GH_Datatree.GeomDataMapping(
-                                                added_geom_generator(group))
+                return GeomDataMapping(added_geom_generator(group))
 
 
 
-            gdm_iterator = (gdm_of_new_geom_from_group(group) 
-                            for group in pyshp_wrapper
-                                          .TmpFileDeletingShapeRecordsIterator(
+            groups_key = ('groups', read_fields and tuple(read_fields))
+            if groups_key in cached:
+                self.logger.debug('Using cached shapes and records. ')
+            else:
+                groups = pyshp_wrapper.TmpFileDeletingShapeRecordsIterator(
                                                                  reader = f_name
                                                                 ,opts = opts
+                                                                ,fields = read_fields
                                                                 )
+                if use_cache:
+                    cached[groups_key] = [list(group) for group in groups]
+
+            if groups_key in cached:
+                groups = (list(zip((points for points, __ in group)
+                                  ,copies_of(rec for __, rec in group)
+                                  ))
+                          for group in cached[groups_key]
+                         )
+
+            gdm_iterator = (gdm_of_new_geom_from_group(group) 
+                            for group in groups
                             )
 
             gdm_partial = functools.partial(list, gdm_iterator)
@@ -320,16 +423,35 @@ class ShapefileReader(sDNA_GH_Tool):
 
             self.logger.warning('Geom data map matches shapefile. Using existing Geom. ')
 
-            gdm_iterator = itertools.zip_longest( # instead of izip to raise 
-                                                  # StopIteration in
-                                                  # TmpFileDeletingRecordsIterator
-                     gdm.keys()
-                    ,pyshp_wrapper.TmpFileDeletingRecordsIterator(reader = f_name
-                                                                 ,opts = opts
-                                                                 )
-                    )
+            records_key = ('records', read_fields and tuple(read_fields))
+            if records_key in cached:
+                self.logger.debug('Using cached records. ')
+            else:
+                records = pyshp_wrapper.TmpFileDeletingRecordsIterator(reader = f_name
+                                                                      ,opts = opts
+                                                                      ,fields = read_fields
+                                                                      )
+                if use_cache:
+                    cached[records_key] = list(records)
+
+            if records_key in cached:
+                records = copies_of(cached[records_key])
+
+            if options.uuid_field in fields:
+                gdm_iterator = join_records_to_keys(gdm.keys()
+                                                   ,records
+                                                   ,options.uuid_field
+                                                   ,self.logger
+                                                   )
+            else:
+                gdm_iterator = itertools.zip_longest( # instead of izip to raise 
+                                                      # StopIteration in
+                                                      # TmpFileDeletingRecordsIterator
+                         gdm.keys()
+                        ,records
+                        )
             
-            gdm_partial = functools.partial(gdm_from_GH_Datatree.GeomDataMapping
+            gdm_partial = functools.partial(GeomDataMapping
                                            ,gdm_iterator
                                            )
             #                  dict.keys() is a dict view in Python 3
@@ -355,12 +477,12 @@ class ShapefileReader(sDNA_GH_Tool):
 
         self.logger.debug('gdm defined.  sc.doc == ghdoc.  ')
 
-        file_name = os.path.splitext(f_name)[0]
-        csv_f_name = options.sDNA_names_fmt.format(name = file_name)
         self.logger.debug('Looking for csv_f_name == %s ' % csv_f_name)
 
         #sDNA_fields = {}
-        if os.path.isfile(csv_f_name):
+        if 'abbrevs' in cached:
+            abbrevs = cached['abbrevs']
+        elif os.path.isfile(csv_f_name):
 # sDNA writes this file in simple 'w' mode, 
 # Line 469
 # https://github.com/fiftysevendegreesofrad/sdna_open/blob/master/arcscripts/sdna_environment.py
@@ -375,6 +497,10 @@ class ShapefileReader(sDNA_GH_Tool):
             abbrevs = [msg]
             self.logger.info(msg)
 
+        cached['abbrevs'] = abbrevs
+
+        if use_cache and os.path.isfile(f_name):
+            shapefile_cache.put(cache_key, cached)
 
 
         retcode = 0
@@ -158,7 +158,7 @@ class UsertextReader(sDNA_GH_Tool):
             raise ValueError(msg)
 
         if isinstance(gdm, gdm_from_GH_Datatree.GeomDataMapping):
-            self.logger.debug('gdm[:3] == %s ' % {key : gdm[key] for key in gdm.keys()[:3]} )
+            self.logger.debug('gdm == %s ', logging_wrapper.Truncated(gdm))
             gdm = [gdm]
         
         gdm = [sub_gdm.copy() for sub_gdm in gdm]
@@ -121,6 +121,8 @@ class ObjectsRecolourer(sDNA_GH_Tool):
         rgb_min = (0, 0, 125) #3333cc
         rgb_mid = (0, 155, 0) # guessed
         line_width = 4 # millimetres? 
+        num_colours = None # Size of the colour look up table.  None => 
+                           # calculate every object's colour exactly.
         leg_extent = options_manager.Sentinel('leg_extent is automatically '
                                              +'calculated by sDNA_GH unless '
                                              +'overridden.  '
@@ -225,16 +227,16 @@ class ObjectsRecolourer(sDNA_GH_Tool):
                                         )
 
 
-        self.logger.debug('Objects to parse & fields == %s, ... , %s'
-                         %(objs_to_parse.items()[:2], objs_to_parse.items()[-2:])
+        self.logger.debug('Objects to parse & fields == %s'
+                         ,logging_wrapper.Truncated(objs_to_parse, 2)
                          )
 
-        self.logger.debug('Objects already parsed & parsed vals == %s, ... , %s'
-                         %(objs_with_numbers.items()[:5], objs_with_numbers.items()[-5:])
+        self.logger.debug('Objects already parsed & parsed vals == %s'
+                         ,logging_wrapper.Truncated(objs_with_numbers, 5)
                          )
 
-        self.logger.debug('Objects that already have colours == %s, ... , %s'
-                         %(objs_to_recolour.items()[:5], objs_to_recolour.items()[-5:])
+        self.logger.debug('Objects that already have colours == %s'
+                         ,logging_wrapper.Truncated(objs_to_recolour, 5)
                          )
         
         if data_cruncher.max_and_min_are_valid(plot_max, plot_min):
@@ -263,30 +265,42 @@ class ObjectsRecolourer(sDNA_GH_Tool):
         if objs_to_parse:
             #
             self.info('Raw data in ObjectsRecolourer.  Calling DataParser...')
-            self.debug('Raw data: %s' % objs_to_parse.items()[:4])
-            x_min, x_max, gdm_in, field, mid_points, class_bounds = self.parse_data(
-                                                   gdm = objs_to_parse
-                                                  ,opts = opts 
-                                                  #includes plot_min, plot_max
-                                                  )
+            self.debug('Raw data: %s', logging_wrapper.Truncated(objs_to_parse, 4))
+            (x_min
+            ,x_max
+            ,gdm_in
+            ,field
+            ,mid_points
+            ,class_bounds
+            ,class_indices) = self.parse_data(gdm = objs_to_parse
+                                             ,opts = opts 
+                                             #includes plot_min, plot_max
+                                             )
                                                                             
         else:
             self.logger.debug('Skipping parsing')
             gdm_in = {}
+            class_indices = []
             x_min, x_max = plot_min, plot_max
 
         self.logger.debug('x_min == %s ' % x_min)
         self.logger.debug('x_max == %s ' % x_max)
 
 
-        objs_to_get_colour.update(gdm_in)  # no key clashes possible unless for 
-                                           # some x both isinstance(x, dict) 
-                                           # and isinstance(x, Number)
-        logger.debug('Objects to get colours & vals == %s, ... , %s'
-                    %(objs_to_get_colour.items()[:5], objs_to_get_colour.items()[-5:])
+        if options.colour_as_class and class_indices:
+            # All parsed objects in the same class have the same value, 
+            # so look up their colours by class index instead.
+            objs_in_classes = gdm_in
+        else:
+            objs_in_classes = OrderedDict()
+            objs_to_get_colour.update(gdm_in)  # no key clashes possible unless for 
+                                               # some x both isinstance(x, dict) 
+                                               # and isinstance(x, Number)
+        logger.debug('Objects to get colours & vals == %s'
+                    ,logging_wrapper.Truncated(objs_to_get_colour, 5)
                     )
 
-        if not objs_to_get_colour:
+        if not objs_to_get_colour and not objs_in_classes:
             self.logger.debug('No objects need colours to be created. ')
         elif (isinstance(x_max, Number) and 
               isinstance(x_min, Number) and
@@ -301,26 +315,55 @@ class ObjectsRecolourer(sDNA_GH_Tool):
             self.logger.error(msg)
             raise NotImplementedError(msg)
         elif options.Col_Grad:
-            grad = getattr( GH_Gradient()
-                          ,self.GH_Gradient_preset_names[options.Col_Grad_num]
-                          )
+            gradient = getattr(GH_Gradient()
+                              ,self.GH_Gradient_preset_names[options.Col_Grad_num]
+                              )()
+            linearly_interpolate = data_cruncher.enforce_bounds(
+                                        data_cruncher.linearly_interpolate)
             def get_colour(x):
                 # Number-> Tuple(Number, Number, Number)
                 # May need either rhinoscriptsyntax.CreateColor
                 # or System.Drawing.Color.FromArgb and even 
                 # Grasshopper.Kernel.Types.GH_Colour calling on the result to work
                 # in Grasshopper
-                linearly_interpolate = data_cruncher.enforce_bounds(
-                                            data_cruncher.linearly_interpolate)
-                return grad().ColourAt( linearly_interpolate(x
-                                                            ,x_min
-                                                            ,None
-                                                            ,x_max
-                                                            ,0 #0.18
-                                                            ,1 #0.82
-                                                            )
-                                      )
-        #elif not 
+                return gradient.ColourAt( linearly_interpolate(x
+                                                              ,x_min
+                                                              ,None
+                                                              ,x_max
+                                                              ,0 #0.18
+                                                              ,1 #0.82
+                                                              )
+                                        )
+            if options.num_colours:
+                get_colour = data_cruncher.look_up_table(
+                                     [get_colour(x)
+                                      for x in data_cruncher.evenly_spaced(
+                                                                 x_min
+                                                                ,x_max
+                                                                ,options.num_colours
+                                                                )
+                                     ]
+                                    ,x_min
+                                    ,x_max
+                                    )
+        elif options.num_colours:
+            # Colours are calculated once, then shared between all objects
+            # whose values are nearest to the same point of the table.  
+            get_colour = data_cruncher.look_up_table(
+                                 [rs.CreateColor(rgb)
+                                  for rgb in data_cruncher.three_point_quad_spline_colours(
+                                                                     x_min
+                                                                    ,x_max
+                                                                    ,tuple(options.rgb_min)
+                                                                    ,tuple(options.rgb_mid)
+                                                                    ,tuple(options.rgb_max)
+                                                                    ,options.num_colours
+                                                                    ,options = options
+                                                                    )
+                                 ]
+                                ,x_min
+                                ,x_max
+                                )
         else:
             def get_colour(x):
                 # Number-> Tuple(Number, Number, Number)
@@ -344,7 +387,7 @@ class ObjectsRecolourer(sDNA_GH_Tool):
                 return rs.CreateColor(bounded_colour)
 
 
-        if not objs_to_get_colour and not objs_to_recolour:
+        if not objs_to_get_colour and not objs_to_recolour and not objs_in_classes:
             msg = 'No objects to recolour have been found. '
             msg += 'objs_to_parse == %s, ' % objs_to_parse
             msg += 'objs_to_get_colour == %s, ' % objs_to_get_colour
@@ -356,8 +399,16 @@ class ObjectsRecolourer(sDNA_GH_Tool):
                                  for key, val in objs_to_get_colour.items()
                                )
 
-        logger.debug('Objects to recolour & colours == %s, ... , %s'
-                    %(objs_to_recolour.items()[:5], objs_to_recolour.items()[-5:])
+        # Legend tags come after the objects, so are given the same colour as 
+        # the objects in their class.
+        palette = {}
+        for (key, val), class_index in zip(objs_in_classes.items(), class_indices):
+            if class_index not in palette:
+                palette[class_index] = get_colour(val)
+            objs_to_recolour[key] = palette[class_index]
+
+        logger.debug('Objects to recolour & colours == %s'
+                    ,logging_wrapper.Truncated(objs_to_recolour, 5)
                     )
 
         legend_tags = OrderedDict()
@@ -413,7 +464,9 @@ class ObjectsRecolourer(sDNA_GH_Tool):
                     
         sc.doc = ghdoc
             
-        self.logger.debug('recoloured_Rhino_objs: %s' % recoloured_Rhino_objs)
+        self.logger.debug('recoloured_Rhino_objs: %s'
+                         ,logging_wrapper.Truncated(recoloured_Rhino_objs)
+                         )
 
         if recoloured_Rhino_objs:
             sc.doc = Rhino.RhinoDoc.ActiveDoc
@@ -505,7 +558,7 @@ class ObjectsRecolourer(sDNA_GH_Tool):
         gdm = GH_objs_to_recolour
         leg_cols = list(legend_tags.values())
         leg_tags = list(legend_tags.keys())  #both are used by smart component
-        self.logger.debug('gdm == %s' % gdm)
+        self.logger.debug('gdm == %s', logging_wrapper.Truncated(gdm))
 
         sc.doc =  ghdoc 
         sc.doc.Views.Redraw()
@@ -134,6 +134,9 @@ class ShapefileWriter(sDNA_GH_Tool):
         path = __file__
         output_shp = '' 
         prj = ''
+        reuse_unchanged_shp = False # Skip rewriting a shapefile if the 
+                                    # geometry, data and options are 
+                                    # unchanged (keeping auto-named ones).
 
 
     param_infos = sDNA_GH_Tool.param_infos + (
@@ -185,7 +188,7 @@ class ShapefileWriter(sDNA_GH_Tool):
         options = opts['options']
         self.debug('Creating Class Logger.  ')
 
-        self.logger.debug('gdm == %s' % gdm)
+        self.logger.debug('gdm == %s', logging_wrapper.Truncated(gdm))
         shp_type = options.shp_type            
 
 
@@ -290,9 +293,11 @@ class ShapefileWriter(sDNA_GH_Tool):
 
             raise TypeError(msg)
         else:
-            self.logger.debug('Points for obj 0: %s ' 
-                                % get_list_of_list_of_pts_from_obj(gdm.keys()[0]) 
-                                )
+            self.logger.debug('Points for obj 0: %s '
+                             ,logging_wrapper.Lazy(get_list_of_list_of_pts_from_obj
+                                                  ,next(iter(gdm))
+                                                  )
+                             )
 
         def shape_IDer(obj):
             return obj #tupl[0].ToString() # uuid
@@ -306,21 +311,55 @@ class ShapefileWriter(sDNA_GH_Tool):
         if not f_name:  
             f_name = options.output_shp
 
-        if (not isinstance(f_name, basestring) or 
-            not os.path.isdir(os.path.dirname(f_name))):
-            
+        auto_named = (not isinstance(f_name, basestring) or 
+                      not os.path.isdir(os.path.dirname(f_name))
+                     )
+        if auto_named:
             f_name = os.path.splitext(options.path)[0] + '.shp'
             # Copy RhinoDoc or GH definition name without .3dm or .gh
 
-            f_name = pyshp_wrapper.get_filename(f_name, options)
+
+        digest, unchanged_shp = None, None
+        if options.reuse_unchanged_shp:
+            def rows():
+                # Each object's points are hashed and dropped, so only
+                # one object's are held at a time (they are extracted 
+                # again if the shapefile is written).
+                for obj in gdm:
+                    data = [(key, get_data_item(obj, key)) 
+                            for key in find_keys(obj)
+                            if pattern_match_key_names(key)
+                           ]
+                    yield (str(shape_IDer(obj))
+                          ,get_list_of_list_of_pts_from_obj(obj)
+                          ,data
+                          )
+
+            digest = pyshp_wrapper.shp_digest(rows()
+                                             ,options
+                                             ,extra_settings = (shp_type
+                                                               ,format_string
+                                                               ,options.prj
+                                                               )
+                                             )
+            unchanged_shp = pyshp_wrapper.find_unchanged_shp(f_name
+                                                            ,digest
+                                                            ,options
+                                                            )
+
+        if auto_named:
+
+            f_name = unchanged_shp or pyshp_wrapper.get_filename(f_name, options)
             
             logger.info('Using automatically generated file name: %s' % f_name)
 
             if (options.del_after_sDNA and 
                 not options.strict_no_del and 
-                not options.overwrite_shp):
+                not options.overwrite_shp and
+                digest is None):
                 # Don't delete a shapefile that only just overwrote 
-                # another pre-existing shapefile.
+                # another pre-existing shapefile, or one kept (with its
+                # digest) to be reused.
                 maybe_delete = pyshp_wrapper.ShapeFilesDeleter(f_name)
                 opts['options'] = opts['options']._replace(
                                             INPUT_FILE_DELETER = maybe_delete
@@ -341,21 +380,30 @@ class ShapefileWriter(sDNA_GH_Tool):
         self.logger.debug('f_name == %s' % f_name)
 
 
-
-        retcode, f_name, fields, gdm = pyshp_wrapper.write_iterable_to_shp(
-                                             my_iterable = gdm
-                                            ,shp_file_path = f_name
-                                            ,is_shape = rhino_gh_geom.is_shape
-                                            ,shape_mangler = get_list_of_list_of_pts_from_obj 
-                                            ,shape_IDer = shape_IDer
-                                            ,key_finder = find_keys 
-                                            ,key_matcher = pattern_match_key_names 
-                                            ,value_demangler = get_data_item 
-                                            ,shape_code = shp_type 
-                                            ,options = options
-                                            ,field_names = None
-                                            ,AttributeTablesClass = gdm_from_GH_Datatree.GeomDataMapping
-                                            )
+        if unchanged_shp:
+            self.logger.info('Geometry, data and options unchanged.  '
+                            +'Reusing shapefile: %s' % unchanged_shp
+                            )
+            retcode, f_name = 0, unchanged_shp
+        else:
+            retcode, f_name, fields, attribute_tables = pyshp_wrapper.write_iterable_to_shp(
+                                                 my_iterable = gdm
+                                                ,shp_file_path = f_name
+                                                ,is_shape = rhino_gh_geom.is_shape
+                                                ,shape_mangler = get_list_of_list_of_pts_from_obj
+                                                ,shape_IDer = shape_IDer
+                                                ,key_finder = find_keys 
+                                                ,key_matcher = pattern_match_key_names 
+                                                ,value_demangler = get_data_item 
+                                                ,shape_code = shp_type 
+                                                ,options = options
+                                                ,field_names = None
+                                                ,AttributeTablesClass = gdm_from_GH_Datatree.GeomDataMapping
+                                                )
+            if attribute_tables is not None: # None if streamed.
+                gdm = attribute_tables
+            if digest is not None:
+                pyshp_wrapper.write_shp_digest(f_name, digest)
         
         prj = options.prj
 